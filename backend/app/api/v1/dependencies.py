@@ -8,6 +8,11 @@ import app.core.repositories as repositories
 import app.core.services as services
 from app.core.dto.admin import BaseAdminSchema
 from app.core import clients
+from app.infrastructure.cache.catalog_cache import CatalogCache
+from app.infrastructure.cache.catalog_index import CatalogIndex
+from app.infrastructure.cache.suggest_index import SuggestIndex
+from app.infrastructure.cache.view_counter import ViewCounterBuffer
+from app.utils.http_cache import ConditionalHeaders
 
 
 token_scheme = HTTPBearer(auto_error=False)
@@ -36,17 +41,76 @@ async def get_yandex_pay_client() -> clients.YandexPayClient:
     return clients.YandexPayClient()
 
 
-async def get_image_service() -> services.ImageService:
-    return services.ImageService()
+async def get_image_service(request: Request) -> services.ImageService:
+    return services.ImageService(
+        encoder_pool=request.app.state.image_encoder_pool,
+        resize_pool=request.app.state.image_resize_pool,
+        resize_cache=request.app.state.image_resize_cache,
+    )
+
+
+async def get_conditional_headers(request: Request) -> ConditionalHeaders:
+    return ConditionalHeaders.from_request(request)
+
+
+async def get_catalog_cache(request: Request) -> CatalogCache:
+    return request.app.state.catalog_cache
+
+
+async def get_detail_cache(request: Request) -> CatalogCache:
+    return request.app.state.detail_cache
+
+
+async def get_view_counter(request: Request) -> ViewCounterBuffer:
+    return request.app.state.view_counter
+
+
+async def get_catalog_index(request: Request) -> CatalogIndex:
+    return request.app.state.catalog_index
+
+
+async def get_suggest_index(request: Request) -> SuggestIndex:
+    return request.app.state.suggest_index
+
+
+async def get_suggest_service(
+    suggest_index: SuggestIndex = Depends(get_suggest_index)
+) -> services.SuggestService:
+    # Без сессии базы: подсказки отдаются только из памяти
+    return services.SuggestService(index=suggest_index)
 
 
 async def get_bouquet_service(
     session=Depends(get_db_session),
-    image_service: services.ImageService = Depends(get_image_service)
+    image_service: services.ImageService = Depends(get_image_service),
+    catalog_cache: CatalogCache = Depends(get_catalog_cache),
+    view_counter: ViewCounterBuffer = Depends(get_view_counter),
+    detail_cache: CatalogCache = Depends(get_detail_cache),
+    suggest_index: SuggestIndex = Depends(get_suggest_index),
+    catalog_index: CatalogIndex = Depends(get_catalog_index)
 ) -> services.BouquetService:
+    repository = repositories.BouquetRepository(session=session)
     return services.BouquetService(
-        repository=repositories.BouquetRepository(session=session),
-        image_service=image_service
+        repository=repository,
+        image_service=image_service,
+        catalog_cache=catalog_cache,
+        view_counter=view_counter,
+        detail_cache=detail_cache,
+        recommendation_service=services.RecommendationService(repository=repository),
+        suggest_index=suggest_index,
+        catalog_index=catalog_index
+    )
+
+
+async def get_feed_service(session=Depends(get_db_session)) -> services.FeedService:
+    return services.FeedService(
+        repository=repositories.BouquetRepository(session=session)
+    )
+
+
+async def get_sitemap_service(session=Depends(get_db_session)) -> services.SitemapService:
+    return services.SitemapService(
+        repository=repositories.BouquetRepository(session=session)
     )
 
 
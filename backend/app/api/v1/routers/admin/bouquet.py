@@ -19,8 +19,10 @@ from app.infrastructure.errors.image_errors import (
     InvalidImageType,
     InvalidImageFormat,
     ImageTooLarge,
+    ImageTooManyPixels,
     EmptyImageFile,
-    ImageProcessingError
+    ImageProcessingError,
+    ImageEncoderBusy
 )
 from app.utils.error_extra import error_response
 from app.core.services.flower_service import FlowerService
@@ -51,8 +53,10 @@ async def get_all_bouquets(
         **error_response(InvalidImageType),
         **error_response(InvalidImageFormat),
         **error_response(ImageTooLarge),
+        **error_response(ImageTooManyPixels),
         **error_response(EmptyImageFile),
         **error_response(ImageProcessingError),
+        **error_response(ImageEncoderBusy),
     }
 )
 async def create_bouquet(
@@ -122,8 +126,10 @@ async def archive_bouquet(
         **error_response(InvalidImageType),
         **error_response(InvalidImageFormat),
         **error_response(ImageTooLarge),
+        **error_response(ImageTooManyPixels),
         **error_response(EmptyImageFile),
         **error_response(ImageProcessingError),
+        **error_response(ImageEncoderBusy),
     }
 )
 async def upload_images(
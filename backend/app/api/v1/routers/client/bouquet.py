@@ -1,54 +1,142 @@
 from typing import Annotated
 from uuid import UUID
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 
-from app.api.v1.dependencies import get_bouquet_service
-from app.core.dto.bouquet import BaseBouquetSchema, BouquetDetailSchema, BouquetFilterSchema, BouquetTypeSchema, PriceRangeSchema
+from app.api.v1.dependencies import (
+    get_bouquet_service,
+    get_conditional_headers,
+    get_suggest_service,
+)
+from app.core.dto.bouquet import (
+    BaseBouquetSchema,
+    BouquetBatchQuerySchema,
+    BouquetCardSchema,
+    BouquetDetailSchema,
+    BouquetFacetFilterSchema,
+    BouquetFacetsSchema,
+    BouquetFilterSchema,
+    BouquetTypeSchema,
+    BouquetUpsellQuerySchema,
+    PriceRangeSchema,
+    SuggestionSchema,
+    SuggestQuerySchema,
+)
 from app.core.services.bouquet_service import BouquetService
+from app.core.services.suggest_service import SuggestService
+from app.infrastructure.config.config import APP_CONFIG
 from app.infrastructure.errors.base import NotFoundException
 from app.utils.error_extra import error_response
+from app.utils.http_cache import ConditionalHeaders
 
 
 router = APIRouter()
 
 
-@router.get("/search")
+@router.get("/search", response_model=list[BaseBouquetSchema])
 async def search_bouquets(
     bouquet_service: Annotated[BouquetService, Depends(get_bouquet_service)],
+    conditions: Annotated[ConditionalHeaders, Depends(get_conditional_headers)],
     filters: BouquetFilterSchema = Query(),
-) -> list[BaseBouquetSchema]:
-    return await bouquet_service.search_bouquets(filters)
+) -> Response:
+    cached = await bouquet_service.search_bouquets(filters, conditions)
+    return cached.to_response(conditions)
+
 
+@router.get("/suggest", response_model=list[SuggestionSchema])
+async def suggest(
+    service: Annotated[SuggestService, Depends(get_suggest_service)],
+    query: SuggestQuerySchema = Query(),
+) -> Response:
+    return Response(
+        content=service.suggest(query.q, query.limit),
+        media_type="application/json",
+    )
+
+
+@router.get("/search/facets", response_model=BouquetFacetsSchema)
+async def get_search_facets(
+    bouquet_service: Annotated[BouquetService, Depends(get_bouquet_service)],
+    conditions: Annotated[ConditionalHeaders, Depends(get_conditional_headers)],
+    filters: BouquetFacetFilterSchema = Query(),
+) -> Response:
+    cached = await bouquet_service.get_search_facets(filters, conditions)
+    return cached.to_response(conditions)
 
-@router.get("/types", responses={**error_response(NotFoundException)})
+
+@router.get(
+    "/types",
+    response_model=list[BouquetTypeSchema],
+    responses={**error_response(NotFoundException)},
+)
 async def get_all_bouquet_types(
-    service: Annotated[BouquetService, Depends(get_bouquet_service)]
-) -> list[BouquetTypeSchema]:
-    return await service.get_bouquet_types_from_client()
+    service: Annotated[BouquetService, Depends(get_bouquet_service)],
+    conditions: Annotated[ConditionalHeaders, Depends(get_conditional_headers)],
+) -> Response:
+    cached = await service.get_bouquet_types_from_client(conditions)
+    return cached.to_response(conditions)
 
 
-@router.get("/popular")
+@router.get("/popular", response_model=list[BaseBouquetSchema])
 async def get_popular_bouquets(
     bouquet_service: Annotated[BouquetService, Depends(get_bouquet_service)],
+    conditions: Annotated[ConditionalHeaders, Depends(get_conditional_headers)],
     limit: int = 10,
     offset: int = 0,
-) -> list[BaseBouquetSchema]:
-    return await bouquet_service.get_popular_bouquets(limit, offset)
+    cursor: str | None = None,
+) -> Response:
+    cached = await bouquet_service.get_popular_bouquets(limit, offset, cursor, conditions)
+    return cached.to_response(conditions)
 
 
-@router.get("/price-range")
+@router.get("/price-range", response_model=PriceRangeSchema)
 async def get_price_range(
-    bouquet_service: Annotated[BouquetService, Depends(get_bouquet_service)]
-) -> PriceRangeSchema:
-    return await bouquet_service.get_price_range()
+    bouquet_service: Annotated[BouquetService, Depends(get_bouquet_service)],
+    conditions: Annotated[ConditionalHeaders, Depends(get_conditional_headers)],
+) -> Response:
+    cached = await bouquet_service.get_price_range(conditions)
+    return cached.to_response(conditions)
+
+
+@router.get("/batch", response_model=list[BouquetCardSchema])
+async def get_bouquets_batch(
+    bouquet_service: Annotated[BouquetService, Depends(get_bouquet_service)],
+    conditions: Annotated[ConditionalHeaders, Depends(get_conditional_headers)],
+    query: BouquetBatchQuerySchema = Query(),
+) -> Response:
+    cached = await bouquet_service.get_bouquets_batch(query.ids, conditions)
+    return cached.to_response(conditions)
+
+
+@router.get("/bought-together", response_model=list[BaseBouquetSchema])
+async def get_bought_together(
+    bouquet_service: Annotated[BouquetService, Depends(get_bouquet_service)],
+    conditions: Annotated[ConditionalHeaders, Depends(get_conditional_headers)],
+    query: BouquetUpsellQuerySchema = Query(),
+) -> Response:
+    cached = await bouquet_service.get_bought_together(query.ids, query.limit, conditions)
+    return cached.to_response(conditions)
 
 
 @router.get(
     "/{bouquet_id}",
+    response_model=BouquetDetailSchema,
     responses={**error_response(NotFoundException)},
 )
 async def get_bouquet_detail(
     bouquet_id: UUID,
-    bouquet_service: Annotated[BouquetService, Depends(get_bouquet_service)]
-) -> BouquetDetailSchema:
-    return await bouquet_service.get_bouquet_detail(bouquet_id)
\ No newline at end of file
+    bouquet_service: Annotated[BouquetService, Depends(get_bouquet_service)],
+    conditions: Annotated[ConditionalHeaders, Depends(get_conditional_headers)],
+) -> Response:
+    cached = await bouquet_service.get_bouquet_detail_from_client(bouquet_id)
+    return cached.to_response(conditions)
+
+
+@router.get("/{bouquet_id}/similar", response_model=list[BaseBouquetSchema])
+async def get_similar_bouquets(
+    bouquet_id: UUID,
+    bouquet_service: Annotated[BouquetService, Depends(get_bouquet_service)],
+    conditions: Annotated[ConditionalHeaders, Depends(get_conditional_headers)],
+    limit: int = Query(default=8, ge=1, le=APP_CONFIG.SIMILAR_BOUQUETS_TOP_K),
+) -> Response:
+    cached = await bouquet_service.get_similar_bouquets(bouquet_id, limit, conditions)
+    return cached.to_response(conditions)
\ No newline at end of file
@@ -0,0 +1,19 @@
+from typing import Annotated
+from fastapi import APIRouter, Depends
+from fastapi.responses import FileResponse
+
+from app.api.v1.dependencies import get_feed_service
+from app.core.services.feed_service import FEED_MEDIA_TYPES, FeedService
+from app.utils.enums import FeedFormat
+
+
+router = APIRouter()
+
+
+@router.get("/{feed_format}", response_class=FileResponse)
+async def get_catalog_feed(
+    feed_format: FeedFormat,
+    service: Annotated[FeedService, Depends(get_feed_service)],
+) -> FileResponse:
+    path = await service.get_feed(feed_format)
+    return FileResponse(path, media_type=FEED_MEDIA_TYPES[feed_format])
@@ -1,16 +1,19 @@
 from typing import Annotated
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 
-from app.api.v1.dependencies import get_flower_service
+from app.api.v1.dependencies import get_conditional_headers, get_flower_service
 from app.core.services.flower_service import FlowerService
 from app.core.dto.bouquet import BouquetFlowerTypeSchema
+from app.utils.http_cache import ConditionalHeaders
 
 
 router = APIRouter()
 
 
-@router.get("/")
+@router.get("/", response_model=list[BouquetFlowerTypeSchema])
 async def get_all_flowers(
     service: Annotated[FlowerService, Depends(get_flower_service)],
-) -> list[BouquetFlowerTypeSchema]:
-    return await service.get_all_from_client()
\ No newline at end of file
+    conditions: Annotated[ConditionalHeaders, Depends(get_conditional_headers)],
+) -> Response:
+    cached = await service.get_all_from_client(conditions)
+    return cached.to_response(conditions)
\ No newline at end of file
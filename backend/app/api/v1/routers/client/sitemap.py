@@ -0,0 +1,24 @@
+import secrets
+from typing import Annotated
+from fastapi import APIRouter, Depends, Header
+
+from app.api.v1.dependencies import get_sitemap_service
+from app.core.services.sitemap_service import SitemapService
+from app.infrastructure.config.config import APP_CONFIG
+from app.infrastructure.errors.sitemap_errors import InvalidSitemapPassword
+
+
+router = APIRouter()
+
+
+@router.post("/rebuild")
+async def rebuild_sitemap(
+    service: Annotated[SitemapService, Depends(get_sitemap_service)],
+    x_sitemap_password: Annotated[str | None, Header()] = None,
+) -> dict[str, int]:
+    expected = APP_CONFIG.SITEMAP_PASSWORD
+    if not expected or not secrets.compare_digest(
+        (x_sitemap_password or "").encode(), expected.encode()
+    ):
+        raise InvalidSitemapPassword()
+    return await service.rebuild()
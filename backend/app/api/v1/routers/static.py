@@ -0,0 +1,39 @@
+from typing import Annotated
+from fastapi import APIRouter, Depends
+from fastapi.responses import FileResponse
+
+from app.api.v1.dependencies import get_image_service
+from app.core.services.image_service import ImageService
+from app.infrastructure.config.config import APP_CONFIG
+from app.infrastructure.errors.image_errors import (
+    ImageEncoderBusy,
+    ImageNotFound,
+)
+from app.utils.error_extra import error_response
+
+
+# Подключается до монтирования /static, иначе запрос перехватит StaticFiles
+router = APIRouter(prefix="/static/images", tags=["images"])
+
+
+@router.get(
+    "/{width:int}x{height:int}/{image_path:path}",
+    response_class=FileResponse,
+    responses={
+        **error_response(ImageNotFound),
+        **error_response(ImageEncoderBusy),
+    },
+)
+async def get_resized_image(
+    width: int,
+    height: int,
+    image_path: str,
+    image_service: Annotated[ImageService, Depends(get_image_service)],
+) -> FileResponse:
+    path = await image_service.resize(image_path, width, height)
+    # Оригиналы не меняются по тому же пути, поэтому копию можно кэшировать навсегда
+    return FileResponse(
+        path,
+        media_type="image/webp",
+        headers={"Cache-Control": APP_CONFIG.IMAGE_RESIZE_CACHE_CONTROL},
+    )
@@ -1,20 +1,38 @@
 from uuid import UUID
 from fastapi import Form, UploadFile
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, computed_field, field_validator, model_validator
 
-from app.utils.url_helper import get_absolute_url
-from app.utils.enums import BouquetSort
+from app.utils.url_helper import get_absolute_url, get_image_variant_path
+from app.utils.enums import BouquetSort, SuggestionKind
 
 
 class BouquetImageSchema(BaseModel):
     id: UUID
     image_path: str
     order: int
+    widths: list[int] = Field(default_factory=list, exclude=True)
 
     @field_validator("image_path", mode="before")
     def validate_image_path(cls, v: str) -> str:
         return get_absolute_url(v)
 
+    @field_validator("widths", mode="before")
+    def validate_widths(cls, v: list[int] | None) -> list[int]:
+        return v or []
+
+    @computed_field
+    @property
+    def srcset(self) -> dict[int, str]:
+        """Ширина уменьшенной копии -> URL, для srcset с дескрипторами w. Оригинал - image_path."""
+        return {width: get_image_variant_path(self.image_path, width) for width in self.widths}
+
+
+class UploadedImageSchema(BaseModel):
+    image_path: str
+    widths: list[int] = Field(default_factory=list)
+    # Файл уже был сохранён раньше и может использоваться другими изображениями
+    reused: bool = False
+
 
 class BouquetFlowerTypeSchema(BaseModel):
     id: UUID
@@ -40,6 +58,48 @@ class BaseBouquetSchema(BaseModel):
     is_active: bool
 
 
+class BouquetCardSchema(BaseBouquetSchema):
+    quantity: int
+
+
+BOUQUET_BATCH_MAX_IDS = 100
+BOUQUET_UPSELL_MAX_LIMIT = 24
+
+
+class BouquetBatchQuerySchema(BaseModel):
+    ids: list[UUID] = Field(
+        ...,
+        min_length=1,
+        max_length=BOUQUET_BATCH_MAX_IDS,
+        description="ID букетов: повторяющийся параметр или список через запятую",
+    )
+
+    @field_validator("ids", mode="before")
+    def split_ids(cls, v: list[str] | str) -> list[str]:
+        values = [v] if isinstance(v, str) else v
+        ids = [part.strip() for value in values for part in str(value).split(",") if part.strip()]
+        # Сохраняем порядок, дубликаты не нужны
+        return list(dict.fromkeys(ids))
+
+
+class BouquetUpsellQuerySchema(BouquetBatchQuerySchema):
+    limit: int = Field(default=8, ge=1, le=BOUQUET_UPSELL_MAX_LIMIT, description="Количество рекомендаций")
+
+
+SUGGEST_MAX_LIMIT = 20
+
+
+class SuggestQuerySchema(BaseModel):
+    q: str = Field(..., min_length=1, max_length=100, description="Начало названия")
+    limit: int = Field(default=8, ge=1, le=SUGGEST_MAX_LIMIT, description="Количество подсказок")
+
+
+class SuggestionSchema(BaseModel):
+    kind: SuggestionKind
+    id: UUID
+    name: str
+
+
 class BouquetDetailSchema(BaseModel):
     id: UUID
     name: str
@@ -54,14 +114,57 @@ class BouquetDetailSchema(BaseModel):
     images: list[BouquetImageSchema]
 
 
-class BouquetFilterSchema(BaseModel):
+class BouquetCatalogFilterSchema(BaseModel):
     bouquet_type_ids: list[UUID] | None = Field(default=None, description="Список ID типов букетов")
     flower_type_ids: list[UUID] | None = Field(default=None, description="Список ID типов цветов")
     price_min: int | None = Field(default=None, ge=0, description="Минимальная цена")
     price_max: int | None = Field(default=None, ge=0, description="Максимальная цена")
+    q: str | None = Field(default=None, max_length=200, description="Полнотекстовый поиск по названию и описанию")
+
+    @field_validator("q", mode="before")
+    def validate_q(cls, v: str | None) -> str | None:
+        if v is None:
+            return None
+        v = " ".join(str(v).split())
+        return v or None
+
+    def filter_key(self) -> tuple:
+        return (
+            tuple(sorted(set(map(str, self.bouquet_type_ids or [])))),
+            tuple(sorted(set(map(str, self.flower_type_ids or [])))),
+            self.price_min,
+            self.price_max,
+            self.q.lower() if self.q else None,
+        )
+
+
+class BouquetFilterSchema(BouquetCatalogFilterSchema):
     limit: int = Field(default=20, ge=1, le=100, description="Количество результатов")
     offset: int = Field(default=0, ge=0, description="Смещение для пагинации")
-    sort: BouquetSort = Field(default=BouquetSort.POPULAR, description="Сортировка: popular - по популярности, price_asc - по возрастанию цены, price_desc - по убыванию цены")
+    cursor: str | None = Field(default=None, description="Курсор следующей страницы из заголовка X-Next-Cursor, при нём offset игнорируется")
+    sort: BouquetSort = Field(default=BouquetSort.POPULAR, description="Сортировка: popular - по популярности, price_asc - по возрастанию цены, price_desc - по убыванию цены, newest - сначала новые, most_viewed - по просмотрам, trending - по популярности за последние дни, relevance - по релевантности запросу q")
+
+    @model_validator(mode="after")
+    def validate_sort(self):
+        # С поисковым запросом по умолчанию сортируем по релевантности
+        if self.q and "sort" not in self.model_fields_set:
+            self.sort = BouquetSort.RELEVANCE
+        elif not self.q and self.sort == BouquetSort.RELEVANCE:
+            self.sort = BouquetSort.POPULAR
+        return self
+
+    def cache_key(self) -> tuple:
+        return (
+            *self.filter_key(),
+            self.limit,
+            self.offset,
+            self.cursor,
+            self.sort.value,
+        )
+
+
+class BouquetFacetFilterSchema(BouquetCatalogFilterSchema):
+    buckets: int = Field(default=10, ge=1, le=50, description="Количество корзин гистограммы цен")
 
 
 class BouquetCreateSchema(BaseModel):
@@ -90,3 +193,24 @@ class ImageOrderUpdateSchema(BaseModel):
 class PriceRangeSchema(BaseModel):
     min_price: int
     max_price: int
+
+
+class FacetCountSchema(BaseModel):
+    id: UUID
+    name: str
+    count: int
+
+
+class PriceBucketSchema(BaseModel):
+    price_from: int
+    price_to: int
+    count: int
+
+
+class BouquetFacetsSchema(BaseModel):
+    total: int
+    min_price: int
+    max_price: int
+    bouquet_types: list[FacetCountSchema]
+    flower_types: list[FacetCountSchema]
+    price_histogram: list[PriceBucketSchema]
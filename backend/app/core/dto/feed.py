@@ -0,0 +1,21 @@
+from uuid import UUID
+from pydantic import BaseModel
+
+
+class FeedCategorySchema(BaseModel):
+    id: UUID
+    name: str
+
+
+class FeedOfferSchema(BaseModel):
+    id: UUID
+    name: str
+    description: str
+    url: str
+    price: int
+    currency: str
+    quantity: int
+    available: bool
+    category_id: UUID
+    flower_types: list[str]
+    images: list[str]
@@ -0,0 +1,18 @@
+from app.core.jobs.catalog import (
+    flush_view_counts,
+    rebuild_similar_bouquets,
+    rebuild_sitemap,
+    recompute_popularity,
+    refresh_catalog_index,
+    refresh_suggest_index,
+)
+
+
+__all__ = [
+    "flush_view_counts",
+    "rebuild_similar_bouquets",
+    "rebuild_sitemap",
+    "recompute_popularity",
+    "refresh_catalog_index",
+    "refresh_suggest_index",
+]
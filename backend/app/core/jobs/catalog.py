@@ -0,0 +1,144 @@
+import asyncio
+
+from app.core.repositories.bouquet_repository import BouquetRepository
+from app.core.repositories.flower_repository import FlowerRepository
+from app.core.services.recommendation_service import RecommendationService
+from app.core.services.sitemap_service import SitemapService
+from app.infrastructure.cache.catalog_cache import CatalogCache, SessionFactory
+from app.infrastructure.cache.catalog_index import CatalogIndex, CatalogIndexEntry
+from app.infrastructure.cache.suggest_index import SuggestIndex, Suggestion
+from app.infrastructure.cache.view_counter import ViewCounterBuffer
+from app.infrastructure.config.config import APP_CONFIG
+from app.infrastructure.logging.logger import get_logger
+from app.utils.enums import SuggestionKind
+
+
+logger = get_logger(__name__)
+
+
+async def recompute_popularity(
+    session_factory: SessionFactory,
+    catalog_cache: CatalogCache | None = None,
+    catalog_index: CatalogIndex | None = None,
+) -> None:
+    session = await session_factory()
+    async with session:
+        updated = await BouquetRepository(session).recompute_popularity(
+            half_life_days=APP_CONFIG.POPULARITY_HALF_LIFE_DAYS,
+            view_weight=APP_CONFIG.POPULARITY_VIEW_WEIGHT,
+            trending_half_life_days=APP_CONFIG.TRENDING_HALF_LIFE_DAYS,
+            # Все воркеры запускают задачу почти одновременно, пересчитывает первый
+            min_interval=APP_CONFIG.POPULARITY_REFRESH_INTERVAL / 2,
+        )
+    if updated is None:
+        logger.debug("popularity_recompute_skipped")
+        return
+    if not updated:
+        # Новых покупок и просмотров не было, порядок не изменился
+        return
+
+    # Порядок сортировки POPULAR поменялся
+    if catalog_index is not None:
+        await refresh_catalog_index(session_factory, catalog_index)
+    if catalog_cache is not None:
+        catalog_cache.invalidate()
+    logger.info("popularity_recomputed", bouquets=updated)
+
+
+async def refresh_catalog_index(
+    session_factory: SessionFactory, catalog_index: CatalogIndex
+) -> None:
+    # Изменения из админки во время чтения и сборки повторяются после подмены
+    log = catalog_index.record()
+    try:
+        session = await session_factory()
+        async with session:
+            rows = await BouquetRepository(session).get_bouquet_features()
+
+        entries = [
+            CatalogIndexEntry(
+                id=row.id,
+                bouquet_type_id=row.bouquet_type_id,
+                price=row.price,
+                popularity_score=row.popularity_score,
+                flower_type_ids=row.flower_type_ids,
+            )
+            for row in rows
+        ]
+        fresh = CatalogIndex()
+        await asyncio.to_thread(fresh.replace, entries)
+        catalog_index.swap(fresh, log)
+    finally:
+        catalog_index.stop_recording(log)
+
+    logger.debug("catalog_index_refreshed", bouquets=len(fresh))
+
+
+async def flush_view_counts(
+    session_factory: SessionFactory, view_counter: ViewCounterBuffer
+) -> None:
+    counts = view_counter.drain()
+    if not counts:
+        return
+
+    try:
+        session = await session_factory()
+        async with session:
+            await BouquetRepository(session).add_view_counts(counts)
+    except BaseException:
+        # В том числе отмена при остановке: финальный сброс подхватит эти счётчики
+        view_counter.restore(counts)
+        raise
+
+    logger.debug("view_counts_flushed", bouquets=len(counts), views=sum(counts.values()))
+
+
+async def rebuild_similar_bouquets(
+    session_factory: SessionFactory, catalog_cache: CatalogCache | None = None
+) -> None:
+    session = await session_factory()
+    async with session:
+        rebuilt = await RecommendationService(BouquetRepository(session)).rebuild(
+            # Задача стартует во всех воркерах, пересчитывает первый
+            min_interval=APP_CONFIG.SIMILAR_BOUQUETS_REFRESH_INTERVAL / 2
+        )
+    if rebuilt is not None and catalog_cache is not None:
+        catalog_cache.invalidate()
+
+
+async def rebuild_sitemap(session_factory: SessionFactory) -> None:
+    session = await session_factory()
+    async with session:
+        await SitemapService(BouquetRepository(session)).rebuild()
+
+
+async def refresh_suggest_index(
+    session_factory: SessionFactory, suggest_index: SuggestIndex
+) -> None:
+    session = await session_factory()
+    async with session:
+        bouquet_repository = BouquetRepository(session)
+        bouquets = await bouquet_repository.get_suggest_entries()
+        bouquet_types = await bouquet_repository.get_bouquet_types()
+        flower_types = await FlowerRepository(session).get_all_items()
+
+    suggest_index.replace(
+        [
+            Suggestion(
+                kind=SuggestionKind.BOUQUET,
+                id=row.id,
+                name=row.name,
+                weight=row.popularity_score,
+            )
+            for row in bouquets
+        ]
+        + [
+            Suggestion(kind=SuggestionKind.BOUQUET_TYPE, id=item.id, name=item.name)
+            for item in bouquet_types
+        ]
+        + [
+            Suggestion(kind=SuggestionKind.FLOWER_TYPE, id=item.id, name=item.name)
+            for item in flower_types
+        ]
+    )
+    logger.debug("suggest_index_refreshed", entries=len(suggest_index))
@@ -1,24 +1,352 @@
+import math
+import zlib
+from datetime import datetime, timedelta, timezone
 from uuid import UUID
-from typing import Any
-from sqlalchemy import select, and_, update, func, desc, asc
+from typing import Any, AsyncIterator
+from sqlalchemy import (
+    ColumnElement,
+    DateTime,
+    JSON,
+    Integer,
+    Row,
+    RowMapping,
+    Select,
+    String,
+    and_,
+    asc,
+    case,
+    cast,
+    column,
+    delete,
+    desc,
+    func,
+    literal,
+    literal_column,
+    null,
+    or_,
+    select,
+    true,
+    tuple_,
+    union_all,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, aggregate_order_by, insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, joinedload
 
+from app.core.dto.bouquet import UploadedImageSchema
 from app.core.repositories.base import SqlAlchemyRepository
 from app.infrastructure.database.models.bouquet import (
     Bouquet,
     BouquetFlowerType,
+    BouquetCoPurchase,
     BouquetImage,
+    BouquetSimilarity,
     BouquetType,
+    CatalogListing,
     FlowerType,
 )
-from app.utils.enums import BouquetSort
+from app.infrastructure.database.models.order import Order, OrderItem
+from app.infrastructure.errors.base import BadRequestException
+from app.utils.enums import BouquetSort, OrderStatus
+
+
+# Ключ сортировки всегда заканчивается на id, чтобы порядок был однозначным
+SORT_COLUMNS = {
+    BouquetSort.POPULAR: (CatalogListing.popularity_score, CatalogListing.id),
+    BouquetSort.PRICE_ASC: (CatalogListing.price, CatalogListing.id),
+    BouquetSort.PRICE_DESC: (CatalogListing.price, CatalogListing.id),
+    BouquetSort.NEWEST: (CatalogListing.created_at, CatalogListing.id),
+    BouquetSort.MOST_VIEWED: (CatalogListing.view_count, CatalogListing.id),
+    BouquetSort.TRENDING: (CatalogListing.trending_score, CatalogListing.id),
+}
+DESCENDING_SORTS = {
+    BouquetSort.POPULAR,
+    BouquetSort.PRICE_DESC,
+    BouquetSort.NEWEST,
+    BouquetSort.MOST_VIEWED,
+    BouquetSort.TRENDING,
+    BouquetSort.RELEVANCE,
+}
+
+SIMILARITY_SAVE_BATCH = 1000
+
+# Ключи pg_try_advisory_xact_lock: фоновый пересчёт выполняет один воркер из всех
+POPULARITY_LOCK_KEY = 0x666C0001
+SIMILARITY_LOCK_KEY = 0x666C0002
+# Пространство двухключевых локов файлов изображений: второй ключ - crc32 пути.
+# Двухключевые и одноключевые локи в Postgres не пересекаются
+IMAGE_PATH_LOCK_SPACE = 0x666C
+
+EMPTY_JSON_ARRAY = literal_column("'[]'::json", JSON)
+
+SEARCH_CONFIG = "russian"
+# Вес популярности в ранжировании полнотекстового поиска
+SEARCH_POPULARITY_WEIGHT = 0.2
+
+# Статусы заказов, позиции которых считаются покупками
+PURCHASED_ORDER_STATUSES = (
+    OrderStatus.PAID,
+    OrderStatus.PROCESSING,
+    OrderStatus.COMPLETED,
+)
+
+# Таблицы, из которых собирается витрина: от них зависит версия каталога
+CATALOG_TABLES = (Bouquet, BouquetImage, BouquetType, FlowerType, BouquetFlowerType)
+
+# Начало отсчёта растущей шкалы популярности. Раз в POPULARITY_RESCALE_DAYS
+# оно сдвигается, а оценки делятся на накопленный рост, чтобы не выйти за float
+POPULARITY_EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+POPULARITY_RESCALE_DAYS = 128
+# Оценки ниже 2^-1000 обнуляются: на underflow float Postgres бросает ошибку
+MIN_SCORE_EXPONENT = -1000
+
+
+def popularity_epoch(moment: datetime) -> datetime:
+    period = timedelta(days=POPULARITY_RESCALE_DAYS)
+    return POPULARITY_EPOCH + (moment - POPULARITY_EPOCH) // period * period
+
+
+def popularity_growth(moment: datetime, half_life_days: float) -> float:
+    """Во сколько раз событие в момент moment весит больше, чем в начале текущего периода."""
+    days = (moment - popularity_epoch(moment)) / timedelta(days=1)
+    return 2 ** (days / half_life_days)
 
 
 class BouquetRepository(SqlAlchemyRepository[Bouquet]):
     def __init__(self, session: AsyncSession):
         super().__init__(session, Bouquet)
 
+    @staticmethod
+    def sort_key(bouquet: Row | Bouquet, sort: BouquetSort) -> list[Any]:
+        if sort == BouquetSort.RELEVANCE:
+            return [bouquet.search_rank, bouquet.id]
+        return [getattr(bouquet, column.key) for column in SORT_COLUMNS[sort]]
+
+    @staticmethod
+    def _card_query() -> Select:
+        """
+        Проекция карточки букета для списков из витрины catalog_listing:
+        одна таблица без JOIN, в ней только активные букеты.
+        Колонки ключей сортировки тоже входят в проекцию для курсора.
+        """
+        return select(
+            CatalogListing.id,
+            CatalogListing.name,
+            CatalogListing.price,
+            true().label("is_active"),
+            CatalogListing.popularity_score,
+            CatalogListing.trending_score,
+            CatalogListing.view_count,
+            CatalogListing.created_at,
+            CatalogListing.updated_at,
+            CatalogListing.main_image_id,
+            CatalogListing.main_image_path,
+            CatalogListing.main_image_order,
+            CatalogListing.main_image_widths,
+        )
+
+    @staticmethod
+    def _search_query(q: str) -> ColumnElement:
+        return func.websearch_to_tsquery(SEARCH_CONFIG, q)
+
+    @classmethod
+    def _search_rank(cls, q: str, popularity_decay: float) -> ColumnElement[float]:
+        # popularity_score в растущей шкале, popularity_decay возвращает его к числу покупок
+        text_rank = func.ts_rank_cd(CatalogListing.search_vector, cls._search_query(q))
+        return text_rank * (
+            1
+            + SEARCH_POPULARITY_WEIGHT
+            * func.ln(1 + CatalogListing.popularity_score * popularity_decay)
+        )
+
+    @classmethod
+    def _apply_sort(
+        cls,
+        query: Select,
+        sort: BouquetSort,
+        after: list[Any] | None = None,
+        q: str | None = None,
+        popularity_decay: float = 1.0,
+    ) -> Select:
+        if sort == BouquetSort.RELEVANCE:
+            columns = (cls._search_rank(q, popularity_decay), CatalogListing.id)
+        else:
+            columns = SORT_COLUMNS[sort]
+        descending = sort in DESCENDING_SORTS
+
+        if after is not None:
+            if len(after) != len(columns):
+                raise BadRequestException("Курсор не соответствует сортировке")
+            after = [cls._cursor_value(column, value) for column, value in zip(columns, after)]
+            key = tuple_(*columns)
+            query = query.where(key < tuple(after) if descending else key > tuple(after))
+
+        direction = desc if descending else asc
+        return query.order_by(*(direction(column) for column in columns))
+
+    @staticmethod
+    def _cursor_value(column: ColumnElement, value: Any) -> Any:
+        # В курсоре даты хранятся строкой ISO 8601
+        if isinstance(column.type, DateTime) and isinstance(value, str):
+            try:
+                return datetime.fromisoformat(value)
+            except ValueError:
+                raise BadRequestException("Некорректный курсор пагинации")
+        return value
+
+    async def _refresh_main_image(self, bouquet_id: UUID) -> None:
+        first_image_id = (
+            select(BouquetImage.id)
+            .where(BouquetImage.bouquet_id == bouquet_id)
+            .order_by(BouquetImage.order, BouquetImage.id)
+            .limit(1)
+            .scalar_subquery()
+        )
+        await self.session.flush()
+        await self.session.execute(
+            update(Bouquet)
+            .where(Bouquet.id == bouquet_id)
+            .values(main_image_id=first_image_id)
+        )
+
+    async def recompute_popularity(
+        self,
+        half_life_days: float,
+        view_weight: float,
+        trending_half_life_days: float,
+        min_interval: float = 0.0,
+    ) -> int | None:
+        """
+        Добавляет к popularity_score и trending_score новые покупки и просмотры
+        одним UPDATE.
+
+        Оценки хранятся в растущей шкале, как вес совместных покупок: событие
+        в момент t весит 2^((t - начало периода) / период полураспада). Порядок
+        по такой сумме совпадает с порядком по сумме с затуханием, поэтому
+        букеты без новых событий не обновляются и не запускают триггер
+        catalog_listing. Покупки берутся только из оплаченных заказов, ещё
+        не отмеченных popularity_scored_at, просмотры - сверх scored_view_count.
+        Раз в POPULARITY_RESCALE_DAYS начало периода сдвигается и ненулевые
+        оценки переводятся в новую шкалу. updated_at при этом не меняется.
+
+        Пересчёт идёт под advisory-локом и пропускается, если другой воркер
+        уже сделал его меньше `min_interval` секунд назад: тогда возвращается
+        None.
+        """
+        if not await self._try_advisory_lock(POPULARITY_LOCK_KEY):
+            await self.session.rollback()
+            return None
+        last_run = await self.session.scalar(select(func.max(Bouquet.popularity_updated_at)))
+        now = datetime.now(timezone.utc)
+        if last_run is not None and last_run > now - timedelta(seconds=min_interval):
+            await self.session.rollback()
+            return None
+
+        epoch = popularity_epoch(now)
+        rescaled = 0
+        if last_run is not None and popularity_epoch(last_run) < epoch:
+            shift_days = (epoch - popularity_epoch(last_run)) / timedelta(days=1)
+            result = await self.session.execute(
+                update(Bouquet)
+                .where(or_(Bouquet.popularity_score != 0, Bouquet.trending_score != 0))
+                .values(
+                    popularity_score=self._rescaled(
+                        Bouquet.popularity_score, shift_days / half_life_days
+                    ),
+                    trending_score=self._rescaled(
+                        Bouquet.trending_score, shift_days / trending_half_life_days
+                    ),
+                    popularity_updated_at=func.now(),
+                    updated_at=Bouquet.updated_at,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            rescaled = result.rowcount
+
+        # Отметка и выборка новых заказов одним запросом: заказ, оплаченный
+        # во время пересчёта, попадёт в следующий
+        new_orders = (
+            update(Order)
+            .where(
+                Order.popularity_scored_at.is_(None),
+                Order.status.in_(PURCHASED_ORDER_STATUSES),
+            )
+            .values(popularity_scored_at=func.now(), updated_at=Order.updated_at)
+            .returning(Order.id, Order.created_at)
+            .cte("new_orders")
+        )
+        age_days = func.extract("epoch", new_orders.c.created_at - epoch) / 86400
+
+        def purchase_weight(half_life: float) -> ColumnElement[float]:
+            return OrderItem.quantity * func.power(
+                2.0, func.greatest(age_days / half_life, MIN_SCORE_EXPONENT)
+            )
+
+        purchases = (
+            select(
+                OrderItem.bouquet_id,
+                func.sum(purchase_weight(half_life_days)).label("score"),
+                func.sum(purchase_weight(trending_half_life_days)).label("trending"),
+            )
+            .join(new_orders, new_orders.c.id == OrderItem.order_id)
+            .group_by(OrderItem.bouquet_id)
+            .subquery("purchases")
+        )
+        scored = aliased(Bouquet)
+        scores = (
+            select(
+                scored.id,
+                func.coalesce(purchases.c.score, 0.0).label("purchase_score"),
+                func.coalesce(purchases.c.trending, 0.0).label("trending_purchase_score"),
+            )
+            .outerjoin(purchases, purchases.c.bouquet_id == scored.id)
+            .where(
+                or_(
+                    purchases.c.bouquet_id.is_not(None),
+                    scored.view_count != scored.scored_view_count,
+                )
+            )
+            .subquery("scores")
+        )
+
+        new_views = view_weight * func.greatest(
+            Bouquet.view_count - Bouquet.scored_view_count, 0
+        )
+        result = await self.session.execute(
+            update(Bouquet)
+            .where(Bouquet.id == scores.c.id)
+            .values(
+                popularity_score=Bouquet.popularity_score
+                + scores.c.purchase_score
+                + new_views * popularity_growth(now, half_life_days),
+                trending_score=Bouquet.trending_score
+                + scores.c.trending_purchase_score
+                + new_views * popularity_growth(now, trending_half_life_days),
+                scored_view_count=Bouquet.view_count,
+                popularity_updated_at=func.now(),
+                updated_at=Bouquet.updated_at,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+        return rescaled + result.rowcount
+
+    @staticmethod
+    def _rescaled(column: ColumnElement[float], exponent: float) -> ColumnElement[float]:
+        # Умножение на 2^-exponent без underflow: слишком малые оценки обнуляются
+        if exponent > -MIN_SCORE_EXPONENT:
+            return literal(0.0)
+        return case(
+            (column > 2.0 ** (exponent + MIN_SCORE_EXPONENT), column * 2.0 ** -exponent),
+            else_=0.0,
+        )
+
+    async def _try_advisory_lock(self, key: int) -> bool:
+        # Лок транзакции: снимается при commit или rollback
+        return await self.session.scalar(select(func.pg_try_advisory_xact_lock(key)))
+
     async def get_bouquet_types_with_bouquet_count(
         self,
     ) -> list[tuple[BouquetType, int]]:
@@ -78,39 +406,182 @@ class BouquetRepository(SqlAlchemyRepository[Bouquet]):
         await self.session.refresh(bouquet)
         return bouquet
 
-    async def get_popular_bouquets(self, limit: int, offset: int) -> list[Bouquet]:
+    @classmethod
+    def _filter_conditions(
+        cls,
+        bouquet_type_ids: list[UUID] | None = None,
+        flower_type_ids: list[UUID] | None = None,
+        price_min: int | None = None,
+        price_max: int | None = None,
+        q: str | None = None,
+    ) -> dict[str, ColumnElement[bool]]:
+        conditions = {}
+
+        if q:
+            conditions["q"] = CatalogListing.search_vector.bool_op("@@")(cls._search_query(q))
+
+        if bouquet_type_ids:
+            conditions["bouquet_type"] = CatalogListing.bouquet_type_id.in_(bouquet_type_ids)
+
+        if flower_type_ids:
+            # && по массиву видов цветов идёт через GIN-индекс витрины
+            conditions["flower_type"] = CatalogListing.flower_type_ids.overlap(
+                flower_type_ids
+            )
+
+        price_conditions = []
+        if price_min is not None:
+            price_conditions.append(CatalogListing.price >= price_min)
+        if price_max is not None:
+            price_conditions.append(CatalogListing.price <= price_max)
+        if price_conditions:
+            conditions["price"] = and_(*price_conditions)
+
+        return conditions
+
+    async def get_popular_bouquets(
+        self, limit: int, offset: int, after: list[Any] | None = None
+    ) -> list[Row]:
+        query = self._apply_sort(self._card_query(), BouquetSort.POPULAR, after)
+        query = query.limit(limit)
+        if after is None:
+            query = query.offset(offset)
+
+        result = await self.session.execute(query)
+        return list(result.all())
+
+    async def get_bouquet_cards(self, bouquet_ids: list[UUID]) -> list[Bouquet]:
+        """Букеты с главным изображением одним запросом: для карточек корзины и избранного."""
         query = (
             select(Bouquet)
-            .where(Bouquet.is_active == True)
-            .order_by(Bouquet.purchase_count.desc(), Bouquet.view_count.desc())
-            .options(selectinload(Bouquet.images))
-            .limit(limit)
-            .offset(offset)
+            .where(Bouquet.id.in_(bouquet_ids))
+            .options(joinedload(Bouquet.main_image))
+        )
+        return list((await self.session.execute(query)).scalars().all())
+
+    async def load_main_image(self, bouquet: Bouquet) -> Bouquet:
+        """Подгружает главное изображение букета для ответа админки."""
+        await self.session.refresh(bouquet, attribute_names=["main_image"])
+        return bouquet
+
+    async def get_bouquet_detail(self, bouquet_id: UUID | str) -> RowMapping | None:
+        """
+        Карточка букета одним запросом: изображения и цвета собираются в JSON
+        на стороне Postgres через LATERAL-подзапросы.
+
+        Кроме полей карточки возвращает версию: время изменения букета, его
+        типа, изображений и цветов (*_updated_at) и количество связанных строк
+        (*_count), которое учитывает удаления, не оставляющие updated_at.
+        """
+        images = (
+            select(
+                func.coalesce(
+                    func.json_agg(
+                        aggregate_order_by(
+                            func.json_build_object(
+                                "id", BouquetImage.id,
+                                "image_path", BouquetImage.image_path,
+                                "order", BouquetImage.order,
+                                "widths", BouquetImage.widths,
+                            ),
+                            BouquetImage.order,
+                            BouquetImage.id,
+                        )
+                    ),
+                    EMPTY_JSON_ARRAY,
+                    type_=JSON,
+                ).label("data"),
+                func.max(BouquetImage.updated_at).label("updated_at"),
+                func.count().label("total"),
+            )
+            .where(BouquetImage.bouquet_id == Bouquet.id)
+            .lateral("image_agg")
+        )
+        flower_types = (
+            select(
+                func.coalesce(
+                    func.json_agg(
+                        aggregate_order_by(
+                            func.json_build_object(
+                                "id", FlowerType.id,
+                                "name", FlowerType.name,
+                            ),
+                            FlowerType.name,
+                        )
+                    ),
+                    EMPTY_JSON_ARRAY,
+                    type_=JSON,
+                ).label("data"),
+                func.max(
+                    func.greatest(BouquetFlowerType.updated_at, FlowerType.updated_at)
+                ).label("updated_at"),
+                func.count().label("total"),
+            )
+            .join(FlowerType, FlowerType.id == BouquetFlowerType.flower_type_id)
+            .where(BouquetFlowerType.bouquet_id == Bouquet.id)
+            .lateral("flower_type_agg")
         )
-        result = await self.session.execute(query)
-        return list(result.scalars().all())
 
-    async def get_bouquet_detail(self, bouquet_id: str) -> Bouquet | None:
         query = (
-            select(Bouquet)
-            .where(Bouquet.id == bouquet_id)
-            .options(
-                selectinload(Bouquet.images),
-                selectinload(Bouquet.bouquet_type),
-                selectinload(Bouquet.flower_types),
+            select(
+                Bouquet.id,
+                Bouquet.name,
+                Bouquet.description,
+                Bouquet.price,
+                Bouquet.quantity,
+                Bouquet.purchase_count,
+                Bouquet.is_active,
+                Bouquet.view_count,
+                func.json_build_object(
+                    "id", BouquetType.id,
+                    "name", BouquetType.name,
+                    type_=JSON,
+                ).label("bouquet_type"),
+                flower_types.c.data.label("flower_types"),
+                images.c.data.label("images"),
+                Bouquet.updated_at,
+                BouquetType.updated_at.label("bouquet_type_updated_at"),
+                images.c.updated_at.label("images_updated_at"),
+                images.c.total.label("images_count"),
+                flower_types.c.updated_at.label("flower_types_updated_at"),
+                flower_types.c.total.label("flower_types_count"),
             )
+            .join(BouquetType, BouquetType.id == Bouquet.bouquet_type_id)
+            .join(images, true())
+            .join(flower_types, true())
+            .where(Bouquet.id == bouquet_id)
         )
         result = await self.session.execute(query)
-        return result.scalars().one_or_none()
+        return result.mappings().one_or_none()
 
     async def increment_view_count(self, bouquet_id: str) -> None:
-        query = select(Bouquet).where(Bouquet.id == bouquet_id)
-        result = await self.session.execute(query)
-        bouquet = result.scalars().one_or_none()
-        if bouquet:
-            bouquet.view_count += 1
-            await self.session.commit()
-            await self.session.refresh(bouquet)
+        await self.add_view_counts({UUID(bouquet_id): 1})
+
+    async def add_view_counts(self, counts: dict[UUID, int]) -> None:
+        """
+        Прибавляет накопленные просмотры одним UPDATE ... FROM (VALUES ...).
+        Строки обновляются в порядке id, чтобы параллельные сбросы из разных
+        воркеров не взаимоблокировались. updated_at не меняется.
+        """
+        if not counts:
+            return
+
+        views = values(
+            column("bouquet_id", PG_UUID(as_uuid=True)),
+            column("views", Integer),
+            name="views",
+        ).data(sorted(counts.items()))
+
+        await self.session.execute(
+            update(Bouquet)
+            .where(Bouquet.id == views.c.bouquet_id)
+            .values(
+                view_count=Bouquet.view_count + views.c.views,
+                updated_at=Bouquet.updated_at,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
 
     async def search_bouquets(
         self,
@@ -121,49 +592,34 @@ class BouquetRepository(SqlAlchemyRepository[Bouquet]):
         limit: int = 20,
         offset: int = 0,
         sort: BouquetSort = BouquetSort.POPULAR,
-    ) -> list[Bouquet]:
-
-        query = (
-            select(Bouquet)
-            .where(Bouquet.is_active == True)
-            .options(selectinload(Bouquet.images))
-        )
-
-        conditions = []
-
-        if bouquet_type_ids:
-            conditions.append(Bouquet.bouquet_type_id.in_(bouquet_type_ids))
-
-        if price_min is not None:
-            conditions.append(Bouquet.price >= price_min)
+        after: list[Any] | None = None,
+        q: str | None = None,
+        popularity_decay: float = 1.0,
+    ) -> list[Row]:
+        if sort == BouquetSort.RELEVANCE and not q:
+            sort = BouquetSort.POPULAR
 
-        if price_max is not None:
-            conditions.append(Bouquet.price <= price_max)
-
-        if flower_type_ids:
-            subquery = (
-                select(BouquetFlowerType.bouquet_id)
-                .where(BouquetFlowerType.flower_type_id.in_(flower_type_ids))
-                .distinct()
-            )
-            conditions.append(Bouquet.id.in_(subquery))
+        query = self._card_query()
 
+        conditions = self._filter_conditions(
+            bouquet_type_ids, flower_type_ids, price_min, price_max, q
+        )
         if conditions:
-            query = query.where(and_(*conditions))
+            query = query.where(and_(*conditions.values()))
 
-        if sort == BouquetSort.POPULAR:
-            query = query.order_by(
-                desc(Bouquet.purchase_count), desc(Bouquet.view_count)
-            )
-        elif sort == BouquetSort.PRICE_ASC:
-            query = query.order_by(asc(Bouquet.price))
-        elif sort == BouquetSort.PRICE_DESC:
-            query = query.order_by(desc(Bouquet.price))
+        # При переданном курсоре offset игнорируется: страница - это диапазон по индексу
+        query = self._apply_sort(query, sort, after, q, popularity_decay)
+        query = query.limit(limit)
+        if after is None:
+            query = query.offset(offset)
 
-        query = query.limit(limit).offset(offset)
+        if sort == BouquetSort.RELEVANCE:
+            query = query.add_columns(
+                self._search_rank(q, popularity_decay).label("search_rank")
+            )
 
         result = await self.session.execute(query)
-        return list(result.scalars().all())
+        return list(result.all())
 
     async def update_image_order(
         self, bouquet_id: UUID, image_id: UUID, new_order: int
@@ -196,6 +652,7 @@ class BouquetRepository(SqlAlchemyRepository[Bouquet]):
         for index, image in enumerate(images_without_current):
             image.order = index
 
+        await self._refresh_main_image(bouquet_id)
         await self.session.commit()
 
         for image in images_without_current:
@@ -204,7 +661,7 @@ class BouquetRepository(SqlAlchemyRepository[Bouquet]):
         return images_without_current
 
     async def add_images(
-        self, bouquet_id: UUID, image_paths: list[str]
+        self, bouquet_id: UUID, images: list[UploadedImageSchema]
     ) -> list[BouquetImage]:
         max_order_query = (
             select(BouquetImage.order)
@@ -217,13 +674,17 @@ class BouquetRepository(SqlAlchemyRepository[Bouquet]):
         start_order = (max_order_row + 1) if max_order_row is not None else 0
 
         new_images = []
-        for index, image_path in enumerate(image_paths):
+        for index, uploaded in enumerate(images):
             image = BouquetImage(
-                bouquet_id=bouquet_id, image_path=image_path, order=start_order + index
+                bouquet_id=bouquet_id,
+                image_path=uploaded.image_path,
+                widths=uploaded.widths,
+                order=start_order + index,
             )
             self.session.add(image)
             new_images.append(image)
 
+        await self._refresh_main_image(bouquet_id)
         await self.session.commit()
 
         for image in new_images:
@@ -277,6 +738,27 @@ class BouquetRepository(SqlAlchemyRepository[Bouquet]):
 
         return bouquet
 
+    async def get_unreferenced_image_paths(self, image_paths: list[str]) -> list[str]:
+        """Пути из списка, на которые больше не ссылается ни одно изображение букета."""
+        if not image_paths:
+            return []
+        query = select(BouquetImage.image_path).where(BouquetImage.image_path.in_(image_paths)).distinct()
+        referenced = set((await self.session.execute(query)).scalars().all())
+        return [path for path in dict.fromkeys(image_paths) if path not in referenced]
+
+    async def lock_image_paths(self, image_paths: list[str]) -> None:
+        """
+        Блокирует файлы изображений до конца транзакции. Загрузка держит лок
+        от проверки файла до записи ссылки на него, удаление - от проверки
+        ссылок до удаления файла, поэтому они не пересекаются на одном файле.
+        """
+        # Ключи берутся по возрастанию: два запроса не ждут друг друга по кругу
+        keys = sorted({zlib.crc32(path.encode()) for path in image_paths})
+        for key in keys:
+            await self.session.execute(
+                select(func.pg_advisory_xact_lock(IMAGE_PATH_LOCK_SPACE, key - 2**31))
+            )
+
     async def delete_image(self, bouquet_id: UUID, image_id: UUID) -> str | None:
         image = await self.session.get(BouquetImage, image_id)
         if not image or image.bouquet_id != bouquet_id:
@@ -284,6 +766,7 @@ class BouquetRepository(SqlAlchemyRepository[Bouquet]):
 
         image_path = image.image_path
         await self.session.delete(image)
+        await self._refresh_main_image(bouquet_id)
         await self.session.commit()
 
         return image_path
@@ -313,11 +796,132 @@ class BouquetRepository(SqlAlchemyRepository[Bouquet]):
 
         await self.session.commit()
 
+    async def get_search_facets(
+        self,
+        bouquet_type_ids: list[UUID] | None = None,
+        flower_type_ids: list[UUID] | None = None,
+        price_min: int | None = None,
+        price_max: int | None = None,
+        q: str | None = None,
+        buckets: int = 10,
+    ) -> list[dict[str, Any]]:
+        """
+        Фасеты поиска одним запросом. Каждый фасет считается по всем фильтрам,
+        кроме своего собственного, чтобы счётчики были дизъюнктивными.
+        Текстовый запрос q сужает выборку для всех фасетов.
+        """
+        conditions = self._filter_conditions(
+            bouquet_type_ids, flower_type_ids, price_min, price_max, q
+        )
+        base = (
+            select(
+                CatalogListing.id,
+                CatalogListing.bouquet_type_id,
+                CatalogListing.flower_type_ids,
+                CatalogListing.price,
+                conditions.get("bouquet_type", true()).label("by_type"),
+                conditions.get("flower_type", true()).label("by_flower"),
+                conditions.get("price", true()).label("by_price"),
+            )
+            .where(conditions.get("q", true()))
+            .cte("base")
+        )
+        bounds = (
+            select(
+                func.min(base.c.price).label("low"),
+                func.max(base.c.price).label("high"),
+            )
+            .where(base.c.by_type, base.c.by_flower)
+            .cte("bounds")
+        )
+
+        total_query = select(
+            literal("total").label("facet"),
+            cast(null(), String).label("key"),
+            cast(null(), String).label("name"),
+            cast(null(), Integer).label("bucket"),
+            (
+                select(func.count())
+                .select_from(base)
+                .where(base.c.by_type, base.c.by_flower, base.c.by_price)
+                .scalar_subquery()
+            ).label("hits"),
+            bounds.c.low,
+            bounds.c.high,
+        )
+        bouquet_type_query = (
+            select(
+                literal("bouquet_type"),
+                cast(BouquetType.id, String),
+                BouquetType.name,
+                cast(null(), Integer),
+                func.count(base.c.id),
+                cast(null(), Integer),
+                cast(null(), Integer),
+            )
+            .select_from(BouquetType)
+            .outerjoin(
+                base,
+                and_(
+                    base.c.bouquet_type_id == BouquetType.id,
+                    base.c.by_flower,
+                    base.c.by_price,
+                ),
+            )
+            .group_by(BouquetType.id, BouquetType.name)
+        )
+        flower_hits = (
+            select(func.unnest(base.c.flower_type_ids).label("flower_type_id"))
+            .where(base.c.by_type, base.c.by_price)
+            .subquery("flower_hits")
+        )
+        flower_type_query = (
+            select(
+                literal("flower_type"),
+                cast(FlowerType.id, String),
+                FlowerType.name,
+                cast(null(), Integer),
+                func.count(flower_hits.c.flower_type_id),
+                cast(null(), Integer),
+                cast(null(), Integer),
+            )
+            .select_from(FlowerType)
+            .outerjoin(flower_hits, flower_hits.c.flower_type_id == FlowerType.id)
+            .group_by(FlowerType.id, FlowerType.name)
+        )
+        # Без bind-параметров: выражение должно совпадать в SELECT и GROUP BY
+        bucket = func.width_bucket(
+            base.c.price,
+            bounds.c.low,
+            bounds.c.high + literal_column("1"),
+            literal_column(str(int(buckets))),
+        )
+        histogram_query = (
+            select(
+                literal("price"),
+                cast(null(), String),
+                cast(null(), String),
+                bucket,
+                func.count(),
+                cast(null(), Integer),
+                cast(null(), Integer),
+            )
+            .select_from(base.join(bounds, true()))
+            .where(base.c.by_type, base.c.by_flower)
+            .group_by(bucket)
+        )
+
+        query = union_all(
+            total_query, bouquet_type_query, flower_type_query, histogram_query
+        )
+        result = await self.session.execute(query)
+        return [dict(row) for row in result.mappings().all()]
+
     async def get_price_range(self) -> dict[str, int | None]:
         query = select(
-            func.min(Bouquet.price).label("min_price"),
-            func.max(Bouquet.price).label("max_price"),
-        ).where(Bouquet.is_active == True)
+            func.min(CatalogListing.price).label("min_price"),
+            func.max(CatalogListing.price).label("max_price"),
+        )
 
         result = await self.session.execute(query)
         row = result.first()
@@ -329,3 +933,283 @@ class BouquetRepository(SqlAlchemyRepository[Bouquet]):
             }
 
         return {"min_price": 0, "max_price": 10000}
+
+    async def get_catalog_version(self) -> tuple:
+        """
+        Версия каталога одним запросом: max(updated_at) и количество строк
+        по всем таблицам, из которых собирается витрина.
+        """
+        result = await self.session.execute(select(*self._version_columns(*CATALOG_TABLES)))
+        return tuple(result.one())
+
+    async def get_listing_version(self) -> tuple:
+        """
+        Версия клиентских списков: версия каталога, время последнего пересчёта
+        популярности и версии похожих и совместных покупок. Пересчёты меняют
+        порядок и состав списков, не трогая updated_at букетов.
+        """
+        columns = self._version_columns(*CATALOG_TABLES, BouquetSimilarity, BouquetCoPurchase)
+        columns.append(select(func.max(Bouquet.popularity_updated_at)).scalar_subquery())
+        result = await self.session.execute(select(*columns))
+        return tuple(result.one())
+
+    @staticmethod
+    def _version_columns(*models) -> list:
+        columns = []
+        for model in models:
+            columns.append(select(func.max(model.updated_at)).scalar_subquery())
+            columns.append(select(func.count()).select_from(model).scalar_subquery())
+        return columns
+
+    async def stream_active_bouquets(
+        self, batch_size: int = 500
+    ) -> AsyncIterator[list[Row]]:
+        """
+        Активные букеты пачками через серверный курсор. Изображения и цвета
+        собираются в массивы в том же запросе, ORM-объекты не создаются,
+        поэтому память не растёт с размером каталога.
+        """
+        image_paths = (
+            select(BouquetImage.image_path)
+            .where(BouquetImage.bouquet_id == Bouquet.id)
+            .order_by(BouquetImage.order, BouquetImage.id)
+            .scalar_subquery()
+        )
+        flower_type_names = (
+            select(FlowerType.name)
+            .join(BouquetFlowerType, BouquetFlowerType.flower_type_id == FlowerType.id)
+            .where(BouquetFlowerType.bouquet_id == Bouquet.id)
+            .order_by(FlowerType.name)
+            .scalar_subquery()
+        )
+        query = (
+            select(
+                Bouquet.id,
+                Bouquet.name,
+                Bouquet.description,
+                Bouquet.price,
+                Bouquet.quantity,
+                Bouquet.bouquet_type_id,
+                Bouquet.updated_at,
+                func.array(image_paths, type_=ARRAY(String)).label("image_paths"),
+                func.array(flower_type_names, type_=ARRAY(String)).label("flower_type_names"),
+            )
+            .where(Bouquet.is_active == True)
+            .order_by(Bouquet.id)
+            .execution_options(yield_per=batch_size)
+        )
+
+        result = await self.session.stream(query)
+        async for partition in result.partitions():
+            yield partition
+
+    @staticmethod
+    def _sitemap_bucketed(bucket_bits: int):
+        # Чанк определяется старшими битами id (uuid4 распределены равномерно),
+        # поэтому добавление или архивация букета меняет только его собственный чанк
+        raw_id = func.uuid_send(Bouquet.id)
+        prefix = func.get_byte(raw_id, 0, type_=Integer) * 256 + func.get_byte(
+            raw_id, 1, type_=Integer
+        )
+        return (
+            select(
+                Bouquet.id,
+                Bouquet.created_at,
+                Bouquet.updated_at,
+                cast(prefix // (1 << (16 - bucket_bits)), Integer).label("chunk"),
+            )
+            .where(Bouquet.is_active == True)
+            .subquery("bucketed")
+        )
+
+    async def count_sitemap_bouquets(self) -> int:
+        query = select(func.count()).select_from(Bouquet).where(Bouquet.is_active == True)
+        return await self.session.scalar(query) or 0
+
+    async def get_sitemap_chunks(self, bucket_bits: int) -> list[Row]:
+        """
+        Сводка по чанкам sitemap: число URL, последний updated_at и подпись
+        состава чанка (md5 по id и updated_at), по которой видно,
+        какие файлы надо пересобрать.
+        """
+        bucketed = self._sitemap_bucketed(bucket_bits)
+        entry = cast(bucketed.c.id, String) + ":" + cast(bucketed.c.updated_at, String)
+        query = (
+            select(
+                bucketed.c.chunk,
+                func.count().label("urls"),
+                func.max(bucketed.c.updated_at).label("lastmod"),
+                func.md5(
+                    func.string_agg(
+                        entry,
+                        aggregate_order_by(
+                            literal_column("','"), bucketed.c.created_at, bucketed.c.id
+                        ),
+                    )
+                ).label("signature"),
+            )
+            .group_by(bucketed.c.chunk)
+            .order_by(bucketed.c.chunk)
+        )
+        result = await self.session.execute(query)
+        return list(result.all())
+
+    async def get_sitemap_chunk(self, chunk: int, bucket_bits: int) -> list[Row]:
+        bucketed = self._sitemap_bucketed(bucket_bits)
+        query = (
+            select(bucketed.c.id, bucketed.c.updated_at)
+            .where(bucketed.c.chunk == chunk)
+            .order_by(bucketed.c.created_at, bucketed.c.id)
+        )
+        result = await self.session.execute(query)
+        return list(result.all())
+
+    async def get_bouquet_type_lastmods(self) -> list[Row]:
+        """Типы букетов, у которых есть активные букеты, с датой последнего изменения."""
+        query = (
+            select(
+                BouquetType.id,
+                func.greatest(BouquetType.updated_at, func.max(Bouquet.updated_at)).label(
+                    "lastmod"
+                ),
+            )
+            .join(
+                Bouquet,
+                and_(Bouquet.bouquet_type_id == BouquetType.id, Bouquet.is_active == True),
+            )
+            .group_by(BouquetType.id, BouquetType.updated_at)
+            .order_by(BouquetType.id)
+        )
+        result = await self.session.execute(query)
+        return list(result.all())
+
+    async def get_bouquet_features(self) -> list[Row]:
+        """
+        Активные букеты с типом, ценой, популярностью и массивом видов цветов:
+        для расчёта сходства и индекса каталога в памяти.
+        """
+        query = select(
+            CatalogListing.id,
+            CatalogListing.bouquet_type_id,
+            CatalogListing.price,
+            CatalogListing.popularity_score,
+            CatalogListing.flower_type_ids,
+        ).order_by(CatalogListing.id)
+        result = await self.session.execute(query)
+        return list(result.all())
+
+    async def get_cards_by_ids(self, bouquet_ids: list[UUID]) -> list[Row]:
+        """Карточки активных букетов в порядке bouquet_ids, отсутствующие пропускаются."""
+        query = self._card_query().where(CatalogListing.id.in_(bouquet_ids))
+        result = await self.session.execute(query)
+        rows = {row.id: row for row in result}
+        return [rows[bouquet_id] for bouquet_id in bouquet_ids if bouquet_id in rows]
+
+    async def lock_similarity_rebuild(self, min_interval: float) -> bool:
+        """
+        Берёт advisory-лок полного пересчёта похожих до commit в save_similarity_lists.
+        False, если пересчёт уже идёт в другом воркере или закончился меньше
+        `min_interval` секунд назад.
+        """
+        if await self._try_advisory_lock(SIMILARITY_LOCK_KEY):
+            recently = await self.session.scalar(
+                select(
+                    func.max(BouquetSimilarity.updated_at)
+                    > func.now() - timedelta(seconds=min_interval)
+                )
+            )
+            if not recently:
+                return True
+        await self.session.rollback()
+        return False
+
+    async def get_similarity_owners(self, bouquet_id: UUID) -> list[UUID]:
+        """Букеты, в списке похожих которых есть bouquet_id (GIN-индекс по similar_ids)."""
+        query = select(BouquetSimilarity.bouquet_id).where(
+            BouquetSimilarity.similar_ids.contains([bouquet_id])
+        )
+        return list(await self.session.scalars(query))
+
+    async def get_similarity_thresholds(self, top_k: int) -> dict[UUID, float]:
+        """Последняя оценка заполненных списков: порог, выше которого букет входит в top-K."""
+        length = func.array_length(BouquetSimilarity.scores, 1)
+        query = select(
+            BouquetSimilarity.bouquet_id, BouquetSimilarity.scores[length].label("threshold")
+        ).where(length >= top_k)
+        result = await self.session.execute(query)
+        return {row.bouquet_id: row.threshold for row in result}
+
+    async def save_similarity_lists(
+        self,
+        lists: dict[UUID, tuple[list[UUID], list[float]]],
+        replace_all: bool = False,
+    ) -> None:
+        items = list(lists.items())
+        # Пачками, чтобы не упереться в лимит параметров запроса asyncpg
+        for start in range(0, len(items), SIMILARITY_SAVE_BATCH):
+            query = insert(BouquetSimilarity).values(
+                [
+                    {"bouquet_id": bouquet_id, "similar_ids": similar_ids, "scores": scores}
+                    for bouquet_id, (similar_ids, scores) in items[start:start + SIMILARITY_SAVE_BATCH]
+                ]
+            )
+            query = query.on_conflict_do_update(
+                index_elements=[BouquetSimilarity.bouquet_id],
+                set_={
+                    "similar_ids": query.excluded.similar_ids,
+                    "scores": query.excluded.scores,
+                    "updated_at": func.now(),
+                },
+            )
+            await self.session.execute(query)
+
+        if replace_all:
+            # Строки архивных букетов больше не пересчитываются
+            await self.session.execute(
+                delete(BouquetSimilarity).where(
+                    BouquetSimilarity.bouquet_id.in_(
+                        select(Bouquet.id).where(Bouquet.is_active == False)
+                    )
+                )
+            )
+        await self.session.commit()
+
+    async def get_similar_bouquets(self, bouquet_id: UUID, limit: int) -> list[Row]:
+        """Карточки похожих букетов: поиск строки по bouquet_id и выборка по первичному ключу."""
+        similar_ids = await self.session.scalar(
+            select(BouquetSimilarity.similar_ids).where(
+                BouquetSimilarity.bouquet_id == bouquet_id
+            )
+        )
+        if not similar_ids:
+            return []
+
+        return (await self.get_cards_by_ids(similar_ids))[:limit]
+
+    async def get_bought_together(self, bouquet_ids: list[UUID], limit: int) -> list[Row]:
+        """Карточки букетов, которые чаще всего покупали вместе с букетами корзины."""
+        score = func.sum(BouquetCoPurchase.weight).label("score")
+        ranked = (
+            select(BouquetCoPurchase.related_bouquet_id.label("id"), score)
+            .where(
+                BouquetCoPurchase.bouquet_id.in_(bouquet_ids),
+                BouquetCoPurchase.related_bouquet_id.not_in(bouquet_ids),
+            )
+            .group_by(BouquetCoPurchase.related_bouquet_id)
+            .subquery("ranked")
+        )
+        query = (
+            self._card_query()
+            .join(ranked, ranked.c.id == CatalogListing.id)
+            .order_by(ranked.c.score.desc(), CatalogListing.id)
+            .limit(limit)
+        )
+        result = await self.session.execute(query)
+        return list(result.all())
+
+    async def get_suggest_entries(self) -> list[Row]:
+        query = select(
+            CatalogListing.id, CatalogListing.name, CatalogListing.popularity_score
+        )
+        result = await self.session.execute(query)
+        return list(result.all())
@@ -27,6 +27,11 @@ class FlowerRepository(SqlAlchemyRepository[FlowerType]):
             flower_types.append(flower_type)
         return flower_types
 
+    async def get_version(self) -> tuple:
+        query = select(func.max(FlowerType.updated_at), func.count(FlowerType.id))
+        result = await self.session.execute(query)
+        return tuple(result.one())
+
     async def validate_flower_types(self, flower_type_ids: list[UUID]) -> None:
         flower_types = await self.get_by_ids(flower_type_ids)
         if not flower_types:
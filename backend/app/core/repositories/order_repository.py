@@ -1,11 +1,13 @@
 from uuid import UUID
 from datetime import datetime
 from attr import attr
-from sqlalchemy import select
+from sqlalchemy import Float, and_, func, literal, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, selectinload
 
 from app.core.repositories.base import SqlAlchemyRepository
+from app.infrastructure.database.models.bouquet import BouquetCoPurchase
 from app.infrastructure.database.models.order import Order, OrderItem, Payment
 from app.utils.enums import OrderStatus, PaymentStatus
 from app.core.dto.yandex_pay import CartItem
@@ -66,10 +68,13 @@ class OrderRepository(SqlAlchemyRepository[Order]):
         new_payment_status: PaymentStatus
     ) -> str | None:
         old_order_status, old_payment_status = None, None
+        # Строка заказа блокируется до commit: параллельный вебхук того же заказа
+        # ждёт и читает уже новый статус, переход в оплату учитывается один раз
         order = await self.session.get(
             self.model, 
             order_id, 
-            options=[selectinload(self.model.payment)]
+            options=[selectinload(self.model.payment)],
+            with_for_update=True,
         )
         if not order:
             return None, None
@@ -83,3 +88,40 @@ class OrderRepository(SqlAlchemyRepository[Order]):
         await self.session.commit()
         
         return old_order_status, old_payment_status
+
+    async def add_co_purchases(self, order_id: UUID, weight: float) -> int:
+        """
+        Добавляет вес заказа ко всем парам его букетов. Читаются только позиции
+        этого заказа, история заказов не пересканируется.
+        """
+        item = aliased(OrderItem)
+        related = aliased(OrderItem)
+        pairs = (
+            select(
+                func.gen_random_uuid(),
+                item.bouquet_id,
+                related.bouquet_id,
+                literal(weight, Float),
+                literal(1),
+            )
+            .join(
+                related,
+                and_(related.order_id == item.order_id, related.bouquet_id != item.bouquet_id),
+            )
+            .where(item.order_id == order_id)
+            .group_by(item.bouquet_id, related.bouquet_id)
+        )
+        query = insert(BouquetCoPurchase).from_select(
+            ["id", "bouquet_id", "related_bouquet_id", "weight", "orders_count"], pairs
+        )
+        query = query.on_conflict_do_update(
+            index_elements=[BouquetCoPurchase.bouquet_id, BouquetCoPurchase.related_bouquet_id],
+            set_={
+                "weight": BouquetCoPurchase.weight + query.excluded.weight,
+                "orders_count": BouquetCoPurchase.orders_count + 1,
+                "updated_at": func.now(),
+            },
+        )
+        result = await self.session.execute(query)
+        await self.session.commit()
+        return result.rowcount
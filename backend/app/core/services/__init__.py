@@ -3,4 +3,8 @@ from app.core.services.order_service import OrderService
 from app.core.services.customer_service import CustomerService
 from app.core.services.auth_service import AuthService
 from app.core.services.image_service import ImageService
-from app.core.services.flower_service import FlowerService
\ No newline at end of file
+from app.core.services.flower_service import FlowerService
+from app.core.services.feed_service import FeedService
+from app.core.services.sitemap_service import SitemapService
+from app.core.services.recommendation_service import RecommendationService
+from app.core.services.suggest_service import SuggestService
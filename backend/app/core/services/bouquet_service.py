@@ -1,31 +1,207 @@
+import math
+from datetime import datetime, timezone
 from uuid import UUID
 from fastapi import UploadFile
+from pydantic import TypeAdapter
+from sqlalchemy import Row, RowMapping
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.dto.bouquet import (
     BaseBouquetSchema,
+    BouquetCardSchema,
     BouquetDetailSchema,
     BouquetFilterSchema,
     BouquetCreateSchema,
     AdminBouquetTypeSchema,
     BouquetUpdateSchema,
     BouquetImageSchema,
+    BouquetFacetFilterSchema,
+    BouquetFacetsSchema,
+    FacetCountSchema,
+    PriceBucketSchema,
     PriceRangeSchema,
 )
-from app.core.repositories.bouquet_repository import BouquetRepository
+from app.core.repositories.bouquet_repository import BouquetRepository, popularity_growth
 from app.core.services.base import BaseDbModelService
 from app.core.services.image_service import ImageService
+from app.core.services.recommendation_service import RecommendationService
+from app.infrastructure.cache.catalog_cache import CachedResponse, CacheLoader, CatalogCache
+from app.infrastructure.cache.catalog_index import INDEXED_SORTS, CatalogIndex
+from app.infrastructure.cache.suggest_index import SuggestIndex
+from app.infrastructure.cache.view_counter import ViewCounterBuffer
+from app.infrastructure.config.config import APP_CONFIG
 from app.infrastructure.database.models.bouquet import Bouquet
 from app.infrastructure.errors.base import NotFoundException
+from app.infrastructure.logging.logger import get_logger
 from app.core.dto.order import OrderItemCreateSchema
 from app.core.dto.yandex_pay import CartItem, CartItemQuantity
 from app.core.dto.flower import FlowerTypeSchema
 from app.core.dto.bouquet import BouquetTypeSchema
+from app.utils.cursor import decode_cursor, encode_cursor
+from app.utils.enums import BouquetSort, SuggestionKind
+from app.utils.http_cache import ConditionalHeaders, make_etag
+
+
+logger = get_logger(__name__)
+
+
+BOUQUET_LIST_ADAPTER = TypeAdapter(list[BaseBouquetSchema])
+BOUQUET_TYPE_LIST_ADAPTER = TypeAdapter(list[BouquetTypeSchema])
+BOUQUET_CARD_LIST_ADAPTER = TypeAdapter(list[BouquetCardSchema])
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+# Поля букета, от которых зависит список похожих
+SIMILARITY_FIELDS = {"bouquet_type_id", "price", "is_active"}
+# Колонки версии карточки из BouquetRepository.get_bouquet_detail, из них строится ETag
+DETAIL_VERSION_COLUMNS = (
+    "updated_at",
+    "bouquet_type_updated_at",
+    "images_updated_at",
+    "images_count",
+    "flower_types_updated_at",
+    "flower_types_count",
+)
 
 
 class BouquetService(BaseDbModelService[Bouquet]):
-    def __init__(self, repository: BouquetRepository, image_service: ImageService):
+    def __init__(
+        self,
+        repository: BouquetRepository,
+        image_service: ImageService,
+        catalog_cache: CatalogCache | None = None,
+        view_counter: ViewCounterBuffer | None = None,
+        detail_cache: CatalogCache | None = None,
+        recommendation_service: RecommendationService | None = None,
+        suggest_index: SuggestIndex | None = None,
+        catalog_index: CatalogIndex | None = None,
+    ):
         self.repository = repository
         self.image_service = image_service
+        self.catalog_cache = catalog_cache
+        self.view_counter = view_counter
+        self.detail_cache = detail_cache
+        self.recommendation_service = recommendation_service
+        self.suggest_index = suggest_index
+        self.catalog_index = catalog_index
+
+    async def _cached(self, key: tuple, loader: CacheLoader) -> CachedResponse:
+        if self.catalog_cache is None:
+            return await loader(self.repository.session)
+        return await self.catalog_cache.get_or_load(key, loader, self.repository.session)
+
+    async def _cached_listing(
+        self, key: tuple, loader: CacheLoader, conditions: ConditionalHeaders | None
+    ) -> CachedResponse:
+        """
+        Список с ETag от версии каталога. Версия читается до загрузки,
+        поэтому 304 отдаётся без выборки строк и сериализации. Last-Modified
+        у списков нет: max(updated_at) строк страницы не отражает ни выпадение
+        строки, ни смену порядка после пересчёта популярности.
+        """
+        version = await self.repository.get_listing_version()
+        etag = make_etag(*key, *version)
+        if conditions is not None and conditions.is_not_modified(etag, None):
+            return CachedResponse(body=b"", headers={"ETag": etag})
+
+        async def load(session: AsyncSession) -> CachedResponse:
+            response = await loader(session)
+            response.headers["ETag"] = etag
+            return response
+
+        # Записи прошлых версий вытесняются из LRU сами
+        return await self._cached((*key, etag), load)
+
+    def _invalidate_catalog(self) -> None:
+        if self.catalog_cache is not None:
+            self.catalog_cache.invalidate()
+
+    def _invalidate_bouquet(self, bouquet_id: UUID) -> None:
+        # Карточки других букетов не затронуты, сбрасываем только эту
+        if self.detail_cache is not None:
+            self.detail_cache.invalidate(bouquet_id)
+        self._invalidate_catalog()
+
+    async def _refresh_similar(self, bouquet_id: UUID) -> None:
+        if self.recommendation_service is None:
+            return
+        # Букет уже сохранён: ошибка пересчёта не должна превращать ответ в 500,
+        # списки поправит ближайший полный пересчёт
+        try:
+            await self.recommendation_service.refresh(bouquet_id)
+        except Exception as e:
+            await self.repository.session.rollback()
+            logger.error(
+                "similar_bouquets_refresh_failed", bouquet_id=str(bouquet_id), error=str(e)
+            )
+
+    def _update_suggestions(self, bouquet: Bouquet) -> None:
+        if self.suggest_index is None:
+            return
+        if bouquet.is_active:
+            self.suggest_index.upsert(
+                SuggestionKind.BOUQUET, bouquet.id, bouquet.name, bouquet.popularity_score
+            )
+        else:
+            self.suggest_index.remove(SuggestionKind.BOUQUET, bouquet.id)
+
+    def _update_catalog_index(
+        self, bouquet: Bouquet, flower_type_ids: list[UUID] | None = None
+    ) -> None:
+        if self.catalog_index is None:
+            return
+        if bouquet.is_active:
+            self.catalog_index.upsert(
+                bouquet.id,
+                bouquet_type_id=bouquet.bouquet_type_id,
+                price=bouquet.price,
+                popularity_score=bouquet.popularity_score,
+                flower_type_ids=flower_type_ids,
+            )
+        else:
+            self.catalog_index.remove(bouquet.id)
+
+    @staticmethod
+    def _popularity_decay() -> float:
+        # Множитель меняется раз в час, чтобы ранг поиска в курсоре совпадал между страницами
+        hour = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        return 1 / popularity_growth(hour, APP_CONFIG.POPULARITY_HALF_LIFE_DAYS)
+
+    @staticmethod
+    def _validate_bouquet_cards(rows: list[Row]) -> list[BaseBouquetSchema]:
+        # Весь список валидируется одним вызовом TypeAdapter из словарей, без from_attributes
+        return BOUQUET_LIST_ADAPTER.validate_python(
+            [
+                {
+                    "id": row.id,
+                    "name": row.name,
+                    "price": row.price,
+                    "is_active": row.is_active,
+                    "main_image": {
+                        "id": row.main_image_id,
+                        "image_path": row.main_image_path,
+                        "order": row.main_image_order,
+                        "widths": row.main_image_widths,
+                    }
+                    if row.main_image_id is not None
+                    else None,
+                }
+                for row in rows
+            ]
+        )
+
+    @classmethod
+    def _dump_bouquet_list(cls, rows: list[Row]) -> CachedResponse:
+        return CachedResponse(
+            body=BOUQUET_LIST_ADAPTER.dump_json(cls._validate_bouquet_cards(rows))
+        )
+
+    def _dump_bouquet_page(
+        self, rows: list[Row], sort: BouquetSort, limit: int
+    ) -> CachedResponse:
+        response = self._dump_bouquet_list(rows)
+        if rows and len(rows) == limit:
+            last_key = BouquetRepository.sort_key(rows[-1], sort)
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(sort.value, last_key)
+        return response
 
     async def get_bouquet_types(self) -> list[AdminBouquetTypeSchema]:
         bouquet_types = await self.repository.get_bouquet_types_with_bouquet_count()
@@ -34,62 +210,230 @@ class BouquetService(BaseDbModelService[Bouquet]):
             for bouquet_type in bouquet_types
         ]
 
-    async def get_bouquet_types_from_client(self) -> list[BouquetTypeSchema]:
-        bouquet_types = await self.repository.get_bouquet_types()
-        return [
-            BouquetTypeSchema.model_validate(bouquet_type, from_attributes=True)
-            for bouquet_type in bouquet_types
-        ]
+    async def get_bouquet_types_from_client(
+        self, conditions: ConditionalHeaders | None = None
+    ) -> CachedResponse:
+        async def load(session: AsyncSession) -> CachedResponse:
+            bouquet_types = await BouquetRepository(session).get_bouquet_types()
+            items = [
+                BouquetTypeSchema.model_validate(bouquet_type, from_attributes=True)
+                for bouquet_type in bouquet_types
+            ]
+            return CachedResponse(body=BOUQUET_TYPE_LIST_ADAPTER.dump_json(items))
 
-    async def get_popular_bouquets(
-        self, limit: int, offset: int
-    ) -> list[BaseBouquetSchema]:
-        bouquets = await self.repository.get_popular_bouquets(limit, offset)
+        return await self._cached_listing(("types",), load, conditions)
 
-        for bouquet in bouquets:
-            if bouquet.images:
-                bouquet.main_image = sorted(bouquet.images, key=lambda x: x.order)[0]
+    async def get_popular_bouquets(
+        self,
+        limit: int,
+        offset: int,
+        cursor: str | None = None,
+        conditions: ConditionalHeaders | None = None,
+    ) -> CachedResponse:
+        after = decode_cursor(cursor, BouquetSort.POPULAR.value) if cursor else None
+
+        async def load(session: AsyncSession) -> CachedResponse:
+            rows = await BouquetRepository(session).get_popular_bouquets(
+                limit, offset, after=after
+            )
+            return self._dump_bouquet_page(rows, BouquetSort.POPULAR, limit)
 
-        return [
-            BaseBouquetSchema.model_validate(bouquet, from_attributes=True)
-            for bouquet in bouquets
-        ]
+        return await self._cached_listing(("popular", limit, offset, cursor), load, conditions)
 
     async def get_bouquet_detail(self, bouquet_id: UUID) -> BouquetDetailSchema:
-        bouquet = await self.repository.get_bouquet_detail(str(bouquet_id))
+        row = await self.repository.get_bouquet_detail(bouquet_id)
 
-        if not bouquet:
+        if not row:
             raise NotFoundException(f"Букет с ID {bouquet_id} не найден")
 
-        await self.repository.increment_view_count(str(bouquet_id))
-        return BouquetDetailSchema.model_validate(bouquet, from_attributes=True)
+        return BouquetDetailSchema.model_validate(row)
+
+    @staticmethod
+    def _dump_bouquet_detail(row: RowMapping) -> CachedResponse:
+        version = [row[column] for column in DETAIL_VERSION_COLUMNS]
+        detail = BouquetDetailSchema.model_validate(row)
+        return CachedResponse(
+            body=detail.model_dump_json().encode(),
+            # view_count меняется без updated_at, но попадает в тело ответа
+            headers={"ETag": make_etag(row["id"], *version, row["view_count"])},
+            last_modified=max(value for value in version if isinstance(value, datetime)),
+        )
 
-    async def search_bouquets(
-        self, filters: BouquetFilterSchema
-    ) -> list[BaseBouquetSchema]:
-        bouquets = await self.repository.search_bouquets(**filters.model_dump())
+    async def get_bouquet_detail_from_client(self, bouquet_id: UUID) -> CachedResponse:
+        async def load(session: AsyncSession) -> CachedResponse:
+            row = await BouquetRepository(session).get_bouquet_detail(bouquet_id)
+            if not row:
+                raise NotFoundException(f"Букет с ID {bouquet_id} не найден")
+            return self._dump_bouquet_detail(row)
+
+        if self.detail_cache is None:
+            cached = await load(self.repository.session)
+        else:
+            cached = await self.detail_cache.get_or_load(
+                bouquet_id, load, self.repository.session
+            )
 
-        for bouquet in bouquets:
-            if bouquet.images:
-                bouquet.main_image = sorted(bouquet.images, key=lambda x: x.order)[0]
+        if self.view_counter is not None:
+            self.view_counter.add(bouquet_id)
+        else:
+            await self.repository.increment_view_count(str(bouquet_id))
+        return cached
+
+    async def get_similar_bouquets(
+        self, bouquet_id: UUID, limit: int, conditions: ConditionalHeaders | None = None
+    ) -> CachedResponse:
+        async def load(session: AsyncSession) -> CachedResponse:
+            rows = await BouquetRepository(session).get_similar_bouquets(bouquet_id, limit)
+            return self._dump_bouquet_list(rows)
+
+        return await self._cached_listing(("similar", bouquet_id, limit), load, conditions)
+
+    async def get_bought_together(
+        self,
+        bouquet_ids: list[UUID],
+        limit: int,
+        conditions: ConditionalHeaders | None = None,
+    ) -> CachedResponse:
+        async def load(session: AsyncSession) -> CachedResponse:
+            rows = await BouquetRepository(session).get_bought_together(bouquet_ids, limit)
+            return self._dump_bouquet_list(rows)
+
+        # Рекомендации не зависят от порядка товаров в корзине
+        return await self._cached_listing(
+            ("bought_together", tuple(sorted(bouquet_ids)), limit), load, conditions
+        )
 
-        return [
-            BaseBouquetSchema.model_validate(bouquet, from_attributes=True)
-            for bouquet in bouquets
+    async def get_bouquets_batch(
+        self, bouquet_ids: list[UUID], conditions: ConditionalHeaders | None = None
+    ) -> CachedResponse:
+        version = await self.repository.get_listing_version()
+        etag = make_etag("batch", *bouquet_ids, *version)
+        if conditions is not None and conditions.is_not_modified(etag, None):
+            return CachedResponse(body=b"", headers={"ETag": etag})
+
+        bouquets = await self.repository.get_bouquet_cards(bouquet_ids)
+        bouquets_map = {bouquet.id: bouquet for bouquet in bouquets}
+        # Порядок как в запросе, отсутствующие id пропускаются
+        items = [
+            BouquetCardSchema.model_validate(bouquets_map[bouquet_id], from_attributes=True)
+            for bouquet_id in bouquet_ids
+            if bouquet_id in bouquets_map
         ]
+        return CachedResponse(
+            body=BOUQUET_CARD_LIST_ADAPTER.dump_json(items), headers={"ETag": etag}
+        )
+
+    async def search_bouquets(
+        self, filters: BouquetFilterSchema, conditions: ConditionalHeaders | None = None
+    ) -> CachedResponse:
+        after = decode_cursor(filters.cursor, filters.sort.value) if filters.cursor else None
+
+        # Полнотекстовый поиск и сортировки по дате, просмотрам и трендам индекс
+        # не покрывает, как и первые секунды до его сборки
+        if (
+            self.catalog_index is not None
+            and self.catalog_index.ready
+            and not filters.q
+            and filters.sort in INDEXED_SORTS
+        ):
+            return await self._search_in_index(filters, after, conditions)
+
+        async def load(session: AsyncSession) -> CachedResponse:
+            rows = await BouquetRepository(session).search_bouquets(
+                **filters.model_dump(exclude={"cursor"}),
+                after=after,
+                popularity_decay=self._popularity_decay(),
+            )
+            return self._dump_bouquet_page(rows, filters.sort, filters.limit)
+
+        return await self._cached_listing(("search", filters.cache_key()), load, conditions)
+
+    async def _search_in_index(
+        self,
+        filters: BouquetFilterSchema,
+        after: list | None,
+        conditions: ConditionalHeaders | None,
+    ) -> CachedResponse:
+        async def load(session: AsyncSession) -> CachedResponse:
+            page = self.catalog_index.search(
+                sort=filters.sort,
+                limit=filters.limit,
+                offset=filters.offset,
+                after=after,
+                bouquet_type_ids=filters.bouquet_type_ids,
+                flower_type_ids=filters.flower_type_ids,
+                price_min=filters.price_min,
+                price_max=filters.price_max,
+            )
+            rows = await BouquetRepository(session).get_cards_by_ids(page.ids)
+            response = self._dump_bouquet_list(rows)
+            # Курсор берётся из индекса: порядок страницы задаёт он, а не строки из базы
+            if page.next_key is not None:
+                response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+                    filters.sort.value, page.next_key
+                )
+            return response
+
+        return await self._cached_listing(("search", filters.cache_key()), load, conditions)
+
+    async def get_search_facets(
+        self,
+        filters: BouquetFacetFilterSchema,
+        conditions: ConditionalHeaders | None = None,
+    ) -> CachedResponse:
+        async def load(session: AsyncSession) -> CachedResponse:
+            rows = await BouquetRepository(session).get_search_facets(**filters.model_dump())
+            facets = self._build_facets(rows, filters.buckets)
+            return CachedResponse(body=facets.model_dump_json().encode())
+
+        return await self._cached_listing(
+            ("facets", filters.filter_key(), filters.buckets), load, conditions
+        )
+
+    @staticmethod
+    def _build_facets(rows: list[dict], buckets: int) -> BouquetFacetsSchema:
+        total = next(row for row in rows if row["facet"] == "total")
+        low, high = total["low"] or 0, total["high"] or 0
+        counts = {
+            row["bucket"]: row["hits"]
+            for row in rows
+            if row["facet"] == "price" and row["bucket"] is not None
+        }
+
+        # Границы корзин повторяют width_bucket(price, low, high + 1, buckets)
+        width = (high + 1 - low) / buckets
+        price_histogram = []
+        if total["low"] is not None:
+            for bucket in range(1, buckets + 1):
+                price_histogram.append(
+                    PriceBucketSchema(
+                        price_from=low + math.ceil((bucket - 1) * width),
+                        price_to=low + math.ceil(bucket * width),
+                        count=counts.get(bucket, 0),
+                    )
+                )
+
+        def facet(name: str) -> list[FacetCountSchema]:
+            return [
+                FacetCountSchema(id=row["key"], name=row["name"], count=row["hits"])
+                for row in rows
+                if row["facet"] == name
+            ]
+
+        return BouquetFacetsSchema(
+            total=total["hits"],
+            min_price=low,
+            max_price=high,
+            bouquet_types=facet("bouquet_type"),
+            flower_types=facet("flower_type"),
+            price_histogram=price_histogram,
+        )
 
     async def get_all_bouquets(
         self, limit: int, offset: int
     ) -> list[BaseBouquetSchema]:
-        bouquets = await self.repository.search_bouquets(limit=limit, offset=offset)
-
-        for bouquet in bouquets:
-            if bouquet.images:
-                bouquet.main_image = sorted(bouquet.images, key=lambda x: x.order)[0]
-
-        return [
-            BaseBouquetSchema.model_validate(b, from_attributes=True) for b in bouquets
-        ]
+        rows = await self.repository.search_bouquets(limit=limit, offset=offset)
+        return self._validate_bouquet_cards(rows)
 
     async def create_bouquet(self, data: BouquetCreateSchema) -> BaseBouquetSchema:
         bouquet_type = await self.repository.get_bouquet_type(data.bouquet_type_id)
@@ -98,13 +442,23 @@ class BouquetService(BaseDbModelService[Bouquet]):
 
         bouquet = await self.repository.add_item(**data.model_dump(exclude={"images"}))
         if data.images:
-            image_paths = await self.image_service.upload_multiple(
-                data.images, subfolder="bouquets"
+            images = await self.image_service.upload_multiple(
+                data.images,
+                subfolder="bouquets",
+                get_unreferenced=self.repository.get_unreferenced_image_paths,
+                lock_paths=self.repository.lock_image_paths,
             )
-            await self.repository.add_images(bouquet.id, image_paths)
+            await self.repository.add_images(bouquet.id, images)
             await self.repository.session.refresh(bouquet)
 
-        return BaseBouquetSchema.model_validate(bouquet, from_attributes=True)
+        await self.repository.load_main_image(bouquet)
+        # Пересчёт похожих коммитит сессию, после чего атрибуты bouquet истекают
+        result = BaseBouquetSchema.model_validate(bouquet, from_attributes=True)
+        self._update_suggestions(bouquet)
+        self._update_catalog_index(bouquet, data.flower_type_ids or [])
+        await self._refresh_similar(bouquet.id)
+        self._invalidate_catalog()
+        return result
 
     async def update_bouquet(
         self, bouquet_id: UUID, data: BouquetUpdateSchema
@@ -122,23 +476,42 @@ class BouquetService(BaseDbModelService[Bouquet]):
             await self.repository.update_flower_types(bouquet_id, flower_type_ids)
             await self.repository.session.refresh(bouquet)
 
-        return BaseBouquetSchema.model_validate(bouquet, from_attributes=True)
+        await self.repository.load_main_image(bouquet)
+        result = BaseBouquetSchema.model_validate(bouquet, from_attributes=True)
+        self._update_suggestions(bouquet)
+        self._update_catalog_index(bouquet, flower_type_ids)
+
+        # Сходство зависит от видов цветов, типа и цены
+        if flower_type_ids is not None or SIMILARITY_FIELDS & update_data.keys():
+            await self._refresh_similar(bouquet_id)
+
+        self._invalidate_bouquet(bouquet_id)
+        return result
 
     async def delete_bouquet(self, bouquet_id: UUID) -> None:
         bouquet = await self.repository.get_item(str(bouquet_id))
         if not bouquet:
             raise NotFoundException(f"Букет с ID {bouquet_id} не найден")
-        if bouquet.images:
-            await self.image_service.delete_multiple(
-                [image.image_path for image in bouquet.images]
-            )
+        image_paths = [image.image_path for image in bouquet.images]
         await self.repository.delete_item(bouquet)
+        await self._delete_unreferenced_images(image_paths)
+        if self.suggest_index is not None:
+            self.suggest_index.remove(SuggestionKind.BOUQUET, bouquet_id)
+        if self.catalog_index is not None:
+            self.catalog_index.remove(bouquet_id)
+        self._invalidate_bouquet(bouquet_id)
 
     async def archive_bouquet(self, bouquet_id: UUID) -> BaseBouquetSchema:
         bouquet = await self.repository.update_item(bouquet_id, is_active=False)
         if not bouquet:
             raise NotFoundException(f"Букет с ID {bouquet_id} не найден")
-        return BaseBouquetSchema.model_validate(bouquet, from_attributes=True)
+        await self.repository.load_main_image(bouquet)
+        result = BaseBouquetSchema.model_validate(bouquet, from_attributes=True)
+        self._update_suggestions(bouquet)
+        self._update_catalog_index(bouquet)
+        await self._refresh_similar(bouquet_id)
+        self._invalidate_bouquet(bouquet_id)
+        return result
 
     async def update_image_order(
         self, bouquet_id: UUID, image_id: UUID, order: int
@@ -150,6 +523,7 @@ class BouquetService(BaseDbModelService[Bouquet]):
                 f"Изображение с ID {image_id} не найдено в букете {bouquet_id}"
             )
 
+        self._invalidate_bouquet(bouquet_id)
         return [
             BouquetImageSchema.model_validate(image, from_attributes=True)
             for image in images
@@ -162,11 +536,15 @@ class BouquetService(BaseDbModelService[Bouquet]):
         if not bouquet:
             raise NotFoundException(f"Букет с ID {bouquet_id} не найден")
 
-        image_paths = await self.image_service.upload_multiple(
-            files, subfolder="bouquets"
+        uploaded = await self.image_service.upload_multiple(
+            files,
+            subfolder="bouquets",
+            get_unreferenced=self.repository.get_unreferenced_image_paths,
+            lock_paths=self.repository.lock_image_paths,
         )
-        images = await self.repository.add_images(bouquet_id, image_paths)
+        images = await self.repository.add_images(bouquet_id, uploaded)
 
+        self._invalidate_bouquet(bouquet_id)
         return [
             BouquetImageSchema.model_validate(image, from_attributes=True)
             for image in images
@@ -179,7 +557,17 @@ class BouquetService(BaseDbModelService[Bouquet]):
                 f"Изображение с ID {image_id} не найдено в букете {bouquet_id}"
             )
 
-        await self.image_service.delete_image(image_path)
+        self._invalidate_bouquet(bouquet_id)
+        await self._delete_unreferenced_images([image_path])
+
+    async def _delete_unreferenced_images(self, image_paths: list[str]) -> None:
+        # Одинаковые загрузки делят один файл, он удаляется вместе с последней ссылкой.
+        # Лок пути держится до удаления файла: загрузка, переиспользующая файл,
+        # ждёт его и после снятия кодирует файл заново
+        await self.repository.lock_image_paths(image_paths)
+        orphaned = await self.repository.get_unreferenced_image_paths(image_paths)
+        await self.image_service.delete_multiple(orphaned)
+        await self.repository.session.commit()
 
     async def get_bouquets_to_order(
         self, bouquets: list[OrderItemCreateSchema]
@@ -214,6 +602,11 @@ class BouquetService(BaseDbModelService[Bouquet]):
 
         return items
 
-    async def get_price_range(self) -> PriceRangeSchema:
-        price_range = await self.repository.get_price_range()
-        return PriceRangeSchema(**price_range)
+    async def get_price_range(
+        self, conditions: ConditionalHeaders | None = None
+    ) -> CachedResponse:
+        async def load(session: AsyncSession) -> CachedResponse:
+            price_range = await BouquetRepository(session).get_price_range()
+            return CachedResponse(body=PriceRangeSchema(**price_range).model_dump_json().encode())
+
+        return await self._cached_listing(("price_range",), load, conditions)
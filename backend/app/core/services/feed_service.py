@@ -0,0 +1,188 @@
+import asyncio
+import os
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from xml.sax.saxutils import escape, quoteattr
+
+from pydantic import TypeAdapter
+from sqlalchemy import Row
+
+from app.core.dto.feed import FeedCategorySchema, FeedOfferSchema
+from app.core.repositories.bouquet_repository import BouquetRepository
+from app.infrastructure.config.config import APP_CONFIG, BASE_DIR
+from app.infrastructure.database.models.bouquet import BouquetType
+from app.infrastructure.logging.logger import get_logger
+from app.utils.enums import FeedFormat
+from app.utils.http_cache import make_etag
+from app.utils.url_helper import get_absolute_url, get_bouquet_url
+
+
+logger = get_logger(__name__)
+
+
+FEED_DIR = BASE_DIR / "static" / "feeds"
+FEED_BATCH_SIZE = 500
+FEED_CURRENCY = "RUR"
+FEED_EXTENSIONS = {FeedFormat.YML: "xml", FeedFormat.JSON: "json"}
+FEED_MEDIA_TYPES = {FeedFormat.YML: "application/xml", FeedFormat.JSON: "application/json"}
+# Старые версии не удаляются сразу: другой воркер может ещё отдавать файл.
+# Удаляется версия, которая не входит в последние FEED_KEEP_VERSIONS и старше FEED_STALE_GRACE секунд
+FEED_KEEP_VERSIONS = 2
+FEED_STALE_GRACE = 600
+
+OFFER_LIST_ADAPTER = TypeAdapter(list[FeedOfferSchema])
+CATEGORY_LIST_ADAPTER = TypeAdapter(list[FeedCategorySchema])
+
+# Один процесс не собирает один и тот же фид дважды одновременно
+_feed_locks: defaultdict[FeedFormat, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+
+class FeedService:
+    """
+    Товарный фид каталога (YML для Яндекс Маркета и JSON).
+
+    Файл собирается потоково из серверного курсора и хранится на диске под
+    именем, производным от версии каталога. Пока каталог не меняется,
+    отдаётся готовый файл.
+    """
+
+    def __init__(self, repository: BouquetRepository, feed_dir: Path = FEED_DIR):
+        self.repository = repository
+        self.feed_dir = feed_dir
+
+    async def get_feed(self, feed_format: FeedFormat) -> Path:
+        version = await self.repository.get_catalog_version()
+        tag = make_etag(*version).strip('"')
+        path = self.feed_dir / f"catalog-{tag}.{FEED_EXTENSIONS[feed_format]}"
+        if await asyncio.to_thread(path.exists):
+            return path
+
+        async with _feed_locks[feed_format]:
+            if not await asyncio.to_thread(path.exists):
+                await self._generate(feed_format, path)
+                await asyncio.to_thread(self._remove_stale, feed_format)
+        return path
+
+    async def _generate(self, feed_format: FeedFormat, path: Path) -> None:
+        categories = await self.repository.get_bouquet_types()
+        render_header, render_offers, footer = {
+            FeedFormat.YML: (self._yml_header, self._yml_offers, b"</offers>\n</shop>\n</yml_catalog>\n"),
+            FeedFormat.JSON: (self._json_header, self._json_offers, b"]}"),
+        }[feed_format]
+
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        offers_count = 0
+        try:
+            with tmp_path.open("wb") as file:
+                await asyncio.to_thread(file.write, render_header(categories))
+                first = True
+                async for rows in self.repository.stream_active_bouquets(FEED_BATCH_SIZE):
+                    chunk = render_offers(rows, first)
+                    await asyncio.to_thread(file.write, chunk)
+                    offers_count += len(rows)
+                    first = False
+                await asyncio.to_thread(file.write, footer)
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+        logger.info("feed_generated", format=feed_format.value, offers=offers_count, path=str(path))
+
+    def _remove_stale(self, feed_format: FeedFormat) -> None:
+        versions = []
+        for path in self.feed_dir.glob(f"catalog-*.{FEED_EXTENSIONS[feed_format]}"):
+            try:
+                versions.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                continue
+        versions.sort(reverse=True)
+
+        expired_before = time.time() - FEED_STALE_GRACE
+        for modified, stale in versions[FEED_KEEP_VERSIONS:]:
+            if modified < expired_before:
+                stale.unlink(missing_ok=True)
+
+    @staticmethod
+    def _offer(row: Row) -> FeedOfferSchema:
+        return FeedOfferSchema(
+            id=row.id,
+            name=row.name,
+            description=row.description,
+            url=get_bouquet_url(row.id),
+            price=row.price,
+            currency=FEED_CURRENCY,
+            quantity=row.quantity,
+            available=row.quantity > 0,
+            category_id=row.bouquet_type_id,
+            flower_types=row.flower_type_names,
+            images=[get_absolute_url(path) for path in row.image_paths],
+        )
+
+    @staticmethod
+    def _json_header(categories: list[BouquetType]) -> bytes:
+        items = [FeedCategorySchema(id=category.id, name=category.name) for category in categories]
+        return (
+            b'{"generated_at":"' + datetime.now(timezone.utc).isoformat().encode()
+            + b'","categories":' + CATEGORY_LIST_ADAPTER.dump_json(items)
+            + b',"offers":['
+        )
+
+    def _json_offers(self, rows: list[Row], first: bool) -> bytes:
+        # Пачка сериализуется как список, скобки срезаются, пачки склеиваются запятой
+        chunk = OFFER_LIST_ADAPTER.dump_json([self._offer(row) for row in rows])[1:-1]
+        return chunk if first or not chunk else b"," + chunk
+
+    # В YML id предложения - до 20 латинских букв и цифр, id категории - целое число
+    @staticmethod
+    def _yml_offer_id(offer_id: uuid.UUID) -> str:
+        return offer_id.hex[:20]
+
+    def _yml_header(self, categories: list[BouquetType]) -> bytes:
+        lines = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            f'<yml_catalog date="{datetime.now(timezone.utc).isoformat(timespec="minutes")}">',
+            "<shop>",
+            f"<name>{escape(APP_CONFIG.SHOP_NAME)}</name>",
+            f"<company>{escape(APP_CONFIG.SHOP_NAME)}</company>",
+            f"<url>{escape(APP_CONFIG.SITE_URL)}</url>",
+            "<currencies>",
+            f'<currency id="{FEED_CURRENCY}" rate="1"/>',
+            "</currencies>",
+            "<categories>",
+            *(
+                f"<category id={quoteattr(str(self._yml_category_id(category.id)))}>"
+                f"{escape(category.name)}</category>"
+                for category in categories
+            ),
+            "</categories>",
+            "<offers>",
+        ]
+        return ("\n".join(lines) + "\n").encode()
+
+    @staticmethod
+    def _yml_category_id(category_id: uuid.UUID) -> int:
+        return int(category_id.hex[:14], 16)
+
+    def _yml_offers(self, rows: list[Row], first: bool) -> bytes:
+        parts = []
+        for row in rows:
+            offer = self._offer(row)
+            available = "true" if offer.available else "false"
+            parts.append(f'<offer id="{self._yml_offer_id(offer.id)}" available="{available}">')
+            parts.append(f"<name>{escape(offer.name)}</name>")
+            parts.append(f"<url>{escape(offer.url)}</url>")
+            parts.append(f"<price>{offer.price}</price>")
+            parts.append(f"<currencyId>{offer.currency}</currencyId>")
+            parts.append(f"<categoryId>{self._yml_category_id(offer.category_id)}</categoryId>")
+            parts.extend(f"<picture>{escape(image)}</picture>" for image in offer.images)
+            parts.append(f"<description>{escape(offer.description)}</description>")
+            parts.append(f"<count>{offer.quantity}</count>")
+            parts.extend(
+                f'<param name="Цветы">{escape(flower_type)}</param>'
+                for flower_type in offer.flower_types
+            )
+            parts.append("</offer>")
+        return ("\n".join(parts) + "\n").encode() if parts else b""
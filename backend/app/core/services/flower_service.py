@@ -1,10 +1,17 @@
 from uuid import UUID
+from pydantic import TypeAdapter
+
 from app.core.repositories.flower_repository import FlowerRepository
 from app.core.services.base import BaseDbModelService
 from app.core.dto.flower import FlowerTypeSchema
 from app.infrastructure.database.models.bouquet import FlowerType
 from app.infrastructure.errors.base import NotFoundException
 from app.core.dto.bouquet import BouquetFlowerTypeSchema
+from app.infrastructure.cache.catalog_cache import CachedResponse
+from app.utils.http_cache import ConditionalHeaders, make_etag
+
+
+FLOWER_TYPE_LIST_ADAPTER = TypeAdapter(list[BouquetFlowerTypeSchema])
 
 
 class FlowerService(BaseDbModelService[FlowerType]):
@@ -15,9 +22,21 @@ class FlowerService(BaseDbModelService[FlowerType]):
         flower_types = await self.repository.get_all_with_bouquet_count()
         return [FlowerTypeSchema.model_validate(flower_type, from_attributes=True) for flower_type in flower_types]
 
-    async def get_all_from_client(self) -> list[FlowerTypeSchema]:
+    async def get_all_from_client(
+        self, conditions: ConditionalHeaders | None = None
+    ) -> CachedResponse:
+        last_modified, count = await self.repository.get_version()
+        etag = make_etag("flower_types", last_modified, count)
+        if conditions is not None and conditions.is_not_modified(etag, last_modified):
+            return CachedResponse(body=b"", headers={"ETag": etag}, last_modified=last_modified)
+
         flower_types = await self.repository.get_all_items()
-        return [BouquetFlowerTypeSchema.model_validate(flower_type, from_attributes=True) for flower_type in flower_types]
+        items = [BouquetFlowerTypeSchema.model_validate(flower_type, from_attributes=True) for flower_type in flower_types]
+        return CachedResponse(
+            body=FLOWER_TYPE_LIST_ADAPTER.dump_json(items),
+            headers={"ETag": etag},
+            last_modified=last_modified,
+        )
 
     async def validate_flower_types(self, flower_type_ids: list[UUID]) -> None:
         flower_types = await self.repository.get_by_ids(flower_type_ids)
@@ -1,86 +1,143 @@
-import io
 import uuid
 from pathlib import Path
 import asyncio
+from typing import IO, Any, Awaitable, Callable, TypeVar
 
-from PIL import Image
+from PIL import Image, UnidentifiedImageError
 from fastapi import UploadFile
 
+from app.core.dto.bouquet import UploadedImageSchema
+from app.infrastructure.cache.image_resize_cache import ImageResizeCache
 from app.infrastructure.config.config import APP_CONFIG, BASE_DIR
+from app.infrastructure.logging.logger import get_logger
 from app.infrastructure.errors.image_errors import (
     InvalidImageType,
     InvalidImageFormat,
     ImageTooLarge,
+    ImageTooManyPixels,
     EmptyImageFile,
-    ImageProcessingError
+    ImageEncoderBusy,
+    ImageProcessingError,
+    ImageNotFound
 )
+from app.infrastructure.tasks import BoundedProcessPool, PoolOverloaded
+from app.utils import image_processing
+from app.utils.image_processing import EncodeOptions
+
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Через сколько секунд клиенту повторить загрузку при переполненной очереди кодирования
+ENCODER_RETRY_AFTER = 5
+# Форматы по заголовку файла, а не по расширению и content-type от клиента
+ALLOWED_IMAGE_FORMATS = {"JPEG", "PNG", "GIF", "BMP", "WEBP"}
+# Размер блока при копировании загрузки во временный файл
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# Кодирование по пути файла на весь процесс: одинаковые картинки кодируются один раз
+_pending: dict[Path, asyncio.Future] = {}
 
 
 class ImageService:
-    def __init__(self):
+    def __init__(
+        self,
+        encoder_pool: BoundedProcessPool | None = None,
+        resize_pool: BoundedProcessPool | None = None,
+        resize_cache: ImageResizeCache | None = None
+    ):
         images_dir = BASE_DIR / "static" / "images"
         images_dir.mkdir(parents=True, exist_ok=True)
         self.images_dir = images_dir
-    
-    async def upload_and_convert(
-        self, 
-        file: UploadFile, 
-        subfolder: str = "products"
-    ) -> str:
-        await self._validate_file(file)
-        contents = await file.read()
-        await file.seek(0)
-        
-        target_dir = self.images_dir / subfolder
-        target_dir.mkdir(parents=True, exist_ok=True)
-        
-        filename = f"{uuid.uuid4()}.webp"
-        filepath = target_dir / filename
-        
-        await asyncio.to_thread(
-            self._convert_and_save,
-            contents,
-            filepath
+        # Без пула (скрипты импорта) кодирование идёт в потоке, как раньше
+        self.encoder_pool = encoder_pool
+        # Отдельный пул: запросы витрины не занимают очередь загрузок из админки
+        self.resize_pool = resize_pool
+        self.resize_cache = resize_cache
+        self.encode_options = EncodeOptions(
+            quality=APP_CONFIG.WEBP_QUALITY,
+            method=APP_CONFIG.WEBP_METHOD,
+            variant_widths=tuple(APP_CONFIG.IMAGE_VARIANT_WIDTHS.values()),
+            max_side=APP_CONFIG.IMAGE_MAX_SIDE,
         )
-        
-        return f"{subfolder}/{filename}"
     
-    def _convert_and_save(self, contents: bytes, filepath: Path) -> None:
+    async def _prepare(self, file: UploadFile, source: Path) -> str:
+        """Проверяет загрузку, копирует её в source и возвращает ключ содержимого."""
+        await self._validate_file(file)
+        await asyncio.to_thread(self._validate_header, file.file)
+        # Процесс кодирования читает исходник с диска: загрузка не копируется
+        # в память целиком ни здесь, ни при передаче в пул
+        await asyncio.to_thread(self._copy_to_file, file.file, source)
+        return await self._encode(image_processing.fingerprint, source, self.encode_options)
+
+    async def _store(self, source: Path, filepath: Path) -> tuple[list[int], bool]:
+        """Кодирует исходник в filepath, если файла ещё нет. Возвращает ширины копий и признак переиспользования."""
+        pending = _pending.get(filepath)
+        if pending is not None:
+            return await asyncio.shield(pending), True
+
+        future = asyncio.get_running_loop().create_future()
+        _pending[filepath] = future
         try:
-            image = Image.open(io.BytesIO(contents))
-            
-            image = self._convert_to_rgb(image)
-            
-            image.save(
-                filepath,
-                "WEBP",
-                quality=APP_CONFIG.WEBP_QUALITY,
-                method=6,
-                optimize=True
-            )
-            
+            widths = await asyncio.to_thread(image_processing.stored_widths, filepath)
+            reused = widths is not None
+            if not reused:
+                widths = await self._encode(
+                    image_processing.convert_and_save,
+                    source,
+                    filepath,
+                    self.encode_options
+                )
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()
+            raise
+        finally:
+            del _pending[filepath]
+
+        future.set_result(widths)
+        return widths, reused
+
+    @staticmethod
+    def _validate_header(stream: IO[bytes]) -> None:
+        # Image.open читает только заголовок, пиксели не декодируются
+        try:
+            with Image.open(stream) as image:
+                image_format, (width, height) = image.format, image.size
+        except Image.DecompressionBombError:
+            raise ImageTooManyPixels(APP_CONFIG.IMAGE_MAX_PIXELS / 1_000_000)
+        except (UnidentifiedImageError, OSError, ValueError) as e:
+            raise ImageProcessingError(str(e))
+        finally:
+            stream.seek(0)
+
+        if image_format not in ALLOWED_IMAGE_FORMATS:
+            raise InvalidImageFormat(", ".join(sorted(ALLOWED_IMAGE_FORMATS)))
+        if width * height > APP_CONFIG.IMAGE_MAX_PIXELS:
+            raise ImageTooManyPixels(APP_CONFIG.IMAGE_MAX_PIXELS / 1_000_000)
+
+    @staticmethod
+    def _copy_to_file(stream: IO[bytes], filepath: Path) -> None:
+        with filepath.open("wb") as target:
+            while chunk := stream.read(COPY_CHUNK_SIZE):
+                target.write(chunk)
+        stream.seek(0)
+
+    async def _encode(self, func: Callable[..., T], *args: Any) -> T:
+        return await self._run(self.encoder_pool, func, *args)
+
+    @staticmethod
+    async def _run(pool: BoundedProcessPool | None, func: Callable[..., T], *args: Any) -> T:
+        try:
+            if pool is None:
+                return await asyncio.to_thread(func, *args)
+            return await pool.run(func, *args)
+        except PoolOverloaded:
+            raise ImageEncoderBusy(ENCODER_RETRY_AFTER)
         except Exception as e:
             raise ImageProcessingError(str(e))
     
-    def _convert_to_rgb(self, image: Image.Image) -> Image.Image:
-        if image.mode in ("RGBA", "LA", "P"):
-            background = Image.new("RGB", image.size, (255, 255, 255))
-            
-            if image.mode == "P":
-                image = image.convert("RGBA")
-            
-            if image.mode in ("RGBA", "LA"):
-                background.paste(image, mask=image.split()[-1])
-            else:
-                background.paste(image)
-            
-            return background
-        
-        elif image.mode != "RGB":
-            return image.convert("RGB")
-        
-        return image
-    
     async def _validate_file(self, file: UploadFile) -> None:
         if not file.content_type or not file.content_type.startswith("image/"):
             raise InvalidImageType()
@@ -116,18 +173,116 @@ class ImageService:
     def _delete_file(filepath: Path) -> None:
         if filepath.exists() and filepath.is_file():
             filepath.unlink()
-    
+        # Копии ищутся по имени, а не по текущим IMAGE_VARIANT_WIDTHS: набор ширин мог измениться
+        for variant in filepath.parent.glob(f"{filepath.stem}-*w{filepath.suffix}"):
+            variant.unlink(missing_ok=True)
+
+    async def generate_variants(self, image_path: str) -> list[int]:
+        """Создаёт уменьшенные копии для уже сохранённого изображения."""
+        filepath = self.images_dir / image_path
+        return await self._encode(image_processing.generate_variants, filepath, self.encode_options)
+
+    async def resize(self, image_path: str, width: int, height: int) -> Path:
+        """
+        Файл изображения, уменьшенного под width x height (0 - без ограничения).
+        Создаётся из сохранённого оригинала при первом запросе и дальше
+        отдаётся из кэша на диске. Доступны только размеры из IMAGE_RESIZE_SIZES,
+        иначе число ключей кэша и кодирований не ограничено.
+        """
+        if f"{width}x{height}" not in APP_CONFIG.IMAGE_RESIZE_SIZES:
+            raise ImageNotFound()
+
+        images_dir = self.images_dir.resolve()
+        source = (images_dir / image_path).resolve()
+        if not source.is_relative_to(images_dir) or source.suffix != ".webp":
+            raise ImageNotFound()
+        # Проверяется и при попадании в кэш: копии удалённого изображения не отдаются
+        if not await asyncio.to_thread(source.is_file):
+            raise ImageNotFound()
+
+        async def create(target: Path) -> int:
+            return await self._run(
+                self.resize_pool,
+                image_processing.resize_to_fit,
+                source,
+                target,
+                width,
+                height,
+                self.encode_options
+            )
+
+        return await self.resize_cache.get_or_create(
+            f"{width}x{height}/{source.relative_to(images_dir).as_posix()}", create
+        )
 
     async def upload_multiple(
         self, 
         files: list[UploadFile], 
-        subfolder: str
-    ) -> list[str]:
-        tasks = [
-            self.upload_and_convert(file, subfolder)
-            for file in files
-        ]
-        return await asyncio.gather(*tasks)
+        subfolder: str,
+        get_unreferenced: Callable[[list[str]], Awaitable[list[str]]],
+        lock_paths: Callable[[list[str]], Awaitable[None]]
+    ) -> list[UploadedImageSchema]:
+        """
+        Имя файла - ключ декодированных пикселей и настроек кодирования:
+        повторная загрузка той же картинки не кодируется и не занимает место.
+
+        lock_paths блокирует пути до конца транзакции, в которой на файлы
+        записываются ссылки. Удаление файлов без ссылок берёт тот же лок,
+        поэтому переиспользованный файл не удаляется до записи ссылки.
+        get_unreferenced отбирает из путей те, на которые не ссылается ни одно
+        изображение: только такие файлы удаляются, если загрузка не удалась.
+        """
+        target_dir = self.images_dir / subfolder
+        await asyncio.to_thread(target_dir.mkdir, parents=True, exist_ok=True)
+        sources = [target_dir / f".{uuid.uuid4()}.upload" for _ in files]
+
+        # Файлы одного запроса кодируются не все сразу, чтобы большая загрузка
+        # не заняла весь пул и не вытеснила загрузки других администраторов
+        semaphore = asyncio.Semaphore(APP_CONFIG.IMAGE_UPLOAD_CONCURRENCY)
+
+        async def prepare(file: UploadFile, source: Path) -> str:
+            async with semaphore:
+                return await self._prepare(file, source)
+
+        async def store(source: Path, image_path: str) -> UploadedImageSchema:
+            async with semaphore:
+                widths, reused = await self._store(source, self.images_dir / image_path)
+            if reused:
+                logger.info("image_upload_deduplicated", image_path=image_path)
+            return UploadedImageSchema(image_path=image_path, widths=widths, reused=reused)
+
+        try:
+            digests = await asyncio.gather(
+                *(prepare(file, source) for file, source in zip(files, sources)),
+                return_exceptions=True,
+            )
+            errors = [result for result in digests if isinstance(result, BaseException)]
+            if errors:
+                raise errors[0]
+
+            image_paths = [f"{subfolder}/{digest}.webp" for digest in digests]
+            await lock_paths(image_paths)
+            results = await asyncio.gather(
+                *(store(source, path) for source, path in zip(sources, image_paths)),
+                return_exceptions=True,
+            )
+        finally:
+            for source in sources:
+                await asyncio.to_thread(source.unlink, True)
+
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            # Уже сохранённые файлы неудачной загрузки никуда не попадут.
+            # Файлы общие по ключу: переиспользованные и те, на которые успели
+            # сослаться другие изображения, остаются
+            created = [
+                result.image_path
+                for result in results
+                if isinstance(result, UploadedImageSchema) and not result.reused
+            ]
+            await self.delete_multiple(await get_unreferenced(created))
+            raise errors[0]
+        return results
 
     async def delete_multiple(self, image_paths: list[str]) -> None:
         tasks = [
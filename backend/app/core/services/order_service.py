@@ -1,3 +1,4 @@
+from datetime import datetime, timezone
 from uuid import UUID
 from fastapi import BackgroundTasks, HTTPException, Request
 
@@ -7,6 +8,7 @@ from jose.exceptions import ExpiredSignatureError, JWTError
 
 from app.core.dto.order import OrderCreateResponseSchema, OrderCreateSchema, OrderResponseSchema
 from app.core.dto.order import OrderAdminSchema, OrderStatusUpdateSchema
+from app.core.repositories.bouquet_repository import PURCHASED_ORDER_STATUSES
 from app.core.repositories.order_repository import OrderRepository
 from app.core.services.base import BaseDbModelService
 from app.infrastructure.database.models.order import Order
@@ -14,12 +16,25 @@ from app.infrastructure.errors.base import InternalServerError, NotFoundExceptio
 from app.utils.enums import OrderStatus, PaymentStatus
 from app.core.clients import SMTPClients, TelegramClient, YandexPayClient
 from app.core.dto.yandex_pay import Cart, CartItem, CartTotal, OrderInfo, YandexPayWebhookDTO
+from app.infrastructure.config.config import APP_CONFIG
 from app.infrastructure.logging.logger import get_logger
 
 
 logger = get_logger(__name__)
 
 
+# Точка отсчёта веса совместных покупок, менять нельзя без пересчёта таблицы
+CO_PURCHASE_EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def co_purchase_weight(paid_at: datetime) -> float:
+    # Вес растёт как 2^(t / T) вместо затухания старых значений: накопленные
+    # суммы не пересчитываются, а их порядок совпадает с порядком по весу
+    # с затуханием на любой момент времени
+    days = (paid_at - CO_PURCHASE_EPOCH).total_seconds() / 86400
+    return 2 ** (days / APP_CONFIG.CO_PURCHASE_HALF_LIFE_DAYS)
+
+
 class OrderService(BaseDbModelService[Order]):
     def __init__(
         self, 
@@ -122,6 +137,12 @@ class OrderService(BaseDbModelService[Order]):
                 logger.warning(f"Process duplicate order: order_id={webhook_data.order.id}, status={webhook_data.order.payment_status}")
                 return
                 
+            if (
+                new_order_status == OrderStatus.PAID
+                and old_order_status not in PURCHASED_ORDER_STATUSES
+            ):
+                await self._record_co_purchases(order_id)
+
             order_with_relations = await self.repository.get_order_with_relations(order_id)
             if new_order_status == OrderStatus.PAID:
                 background_tasks.add_task(
@@ -145,6 +166,18 @@ class OrderService(BaseDbModelService[Order]):
                 )
         return {"status": "success"}
 
+    async def _record_co_purchases(self, order_id: UUID) -> None:
+        # Ошибка статистики не должна ломать обработку оплаты
+        try:
+            pairs = await self.repository.add_co_purchases(
+                order_id, co_purchase_weight(datetime.now(timezone.utc))
+            )
+        except Exception as e:
+            await self.repository.session.rollback()
+            logger.error("co_purchases_update_failed", order_id=str(order_id), error=str(e))
+            return
+        logger.debug("co_purchases_updated", order_id=str(order_id), pairs=pairs)
+
     async def update_order_status(
         self, 
         order_id: UUID, 
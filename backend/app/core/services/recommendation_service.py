@@ -0,0 +1,91 @@
+import asyncio
+from uuid import UUID
+
+import numpy as np
+
+from app.core.repositories.bouquet_repository import BouquetRepository
+from app.infrastructure.config.config import APP_CONFIG
+from app.infrastructure.logging.logger import get_logger
+from app.utils.similarity import BouquetFeatures
+
+
+logger = get_logger(__name__)
+
+
+class RecommendationService:
+    """
+    Похожие букеты по видам цветов, типу и ценовому диапазону.
+
+    Top-K для каждого букета хранится в bouquet_similarities, поэтому
+    выдача - поиск по ключу. Полный пересчёт выполняет фоновая задача,
+    после изменения букета пересчитываются только затронутые строки.
+    """
+
+    def __init__(self, repository: BouquetRepository, top_k: int = APP_CONFIG.SIMILAR_BOUQUETS_TOP_K):
+        self.repository = repository
+        self.top_k = top_k
+
+    async def _load_features(self) -> BouquetFeatures:
+        rows = await self.repository.get_bouquet_features()
+        return BouquetFeatures.build(
+            ids=[row.id for row in rows],
+            bouquet_type_ids=[row.bouquet_type_id for row in rows],
+            prices=[row.price for row in rows],
+            flower_type_ids=[row.flower_type_ids for row in rows],
+        )
+
+    async def rebuild(self, min_interval: float = 0.0) -> int | None:
+        """
+        Полный пересчёт. Выполняет один воркер: None, если пересчёт уже идёт
+        в другом или был меньше `min_interval` секунд назад.
+        """
+        if not await self.repository.lock_similarity_rebuild(min_interval):
+            logger.debug("similar_bouquets_rebuild_skipped")
+            return None
+
+        features = await self._load_features()
+        # Матричные операции не должны блокировать event loop
+        lists = await asyncio.to_thread(features.top_k, range(len(features)), self.top_k)
+        await self.repository.save_similarity_lists(lists, replace_all=True)
+        logger.info("similar_bouquets_rebuilt", bouquets=len(lists))
+        return len(lists)
+
+    async def refresh(self, bouquet_id: UUID) -> None:
+        """
+        Пересчёт после изменения одного букета: его собственный список и списки,
+        в которые он входит или в которые теперь проходит по порогу top-K.
+        Из сохранённых списков читаются только владельцы списков с bouquet_id
+        и пороги заполненных списков.
+        """
+        features = await self._load_features()
+        owners = await self.repository.get_similarity_owners(bouquet_id)
+        thresholds = await self.repository.get_similarity_thresholds(self.top_k)
+        # Строка матрицы сходства по всему каталогу, как и в rebuild, считается вне event loop
+        lists = await asyncio.to_thread(
+            self._affected_lists, features, owners, thresholds, bouquet_id
+        )
+        await self.repository.save_similarity_lists(lists)
+        logger.debug("similar_bouquets_refreshed", bouquet_id=str(bouquet_id), rows=len(lists))
+
+    def _affected_lists(
+        self,
+        features: BouquetFeatures,
+        owners: list[UUID],
+        thresholds: dict[UUID, float],
+        bouquet_id: UUID,
+    ) -> dict[UUID, tuple[list[UUID], list[float]]]:
+        index = {item: row for row, item in enumerate(features.ids)}
+
+        affected = {index[owner] for owner in owners if owner in index}
+        row = index.get(bouquet_id)
+        if row is not None:
+            affected.add(row)
+            # Порог входа в список: последнее место заполненного top-K, иначе любое сходство
+            row_thresholds = np.zeros(len(features), dtype=np.float32)
+            for owner, threshold in thresholds.items():
+                if owner in index:
+                    row_thresholds[index[owner]] = threshold
+            scores = features.scores(np.array([row]))[0]
+            affected.update(np.flatnonzero(scores > row_thresholds).tolist())
+
+        return features.top_k(sorted(affected), self.top_k)
@@ -0,0 +1,175 @@
+import asyncio
+import json
+import math
+import os
+import re
+import uuid
+from datetime import datetime
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from app.core.repositories.bouquet_repository import BouquetRepository
+from app.infrastructure.config.config import APP_CONFIG, BASE_DIR
+from app.infrastructure.logging.logger import get_logger
+from app.utils.http_cache import make_etag
+from app.utils.url_helper import get_bouquet_type_url, get_bouquet_url
+
+
+logger = get_logger(__name__)
+
+
+SITEMAP_DIR = BASE_DIR / "static" / "sitemaps"
+# Ограничение протокола sitemaps.org на один файл
+SITEMAP_CHUNK_SIZE = 50_000
+# Чанки нумеруются старшими битами id; средний чанк держим между четвертью
+# и половиной лимита, чтобы разброс не упирался в лимит и число чанков не прыгало
+SITEMAP_MAX_BUCKET_BITS = 16
+SITEMAP_INDEX_NAME = "sitemap.xml"
+SITEMAP_TYPES_NAME = "sitemap-types.xml"
+SITEMAP_MANIFEST_NAME = "manifest.json"
+SITEMAP_XMLNS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+_rebuild_lock = asyncio.Lock()
+
+
+class SitemapService:
+    """
+    Sitemap для витрины: индекс, чанки до 50 000 букетов и страницы типов.
+
+    Файлы лежат в static и раздаются статикой. Подписи чанков хранятся
+    в manifest.json, при пересборке переписываются только чанки,
+    подпись которых изменилась.
+    """
+
+    def __init__(self, repository: BouquetRepository, sitemap_dir: Path = SITEMAP_DIR):
+        self.repository = repository
+        self.sitemap_dir = sitemap_dir
+
+    async def rebuild(self) -> dict[str, int]:
+        async with _rebuild_lock:
+            return await self._rebuild()
+
+    async def _rebuild(self) -> dict[str, int]:
+        manifest = self._read_manifest()
+        bucket_bits = self._bucket_bits(
+            await self.repository.count_sitemap_bouquets(), self._manifest_bits(manifest)
+        )
+        chunks = await self.repository.get_sitemap_chunks(bucket_bits)
+
+        rebuilt = 0
+        new_manifest: dict[str, str] = {}
+        index_entries: list[tuple[str, datetime | None]] = []
+        for chunk in chunks:
+            name = f"sitemap-bouquets-{bucket_bits}-{chunk.chunk}.xml"
+            new_manifest[name] = chunk.signature
+            index_entries.append((name, chunk.lastmod))
+            if manifest.get(name) == chunk.signature and (self.sitemap_dir / name).exists():
+                continue
+
+            rows = await self.repository.get_sitemap_chunk(chunk.chunk, bucket_bits)
+            await self._write(
+                name, self._urlset((get_bouquet_url(row.id), row.updated_at) for row in rows)
+            )
+            rebuilt += 1
+
+        # Страниц типов немного, файл собирается целиком и пишется только при изменениях
+        type_rows = await self.repository.get_bouquet_type_lastmods()
+        types_body = self._urlset(
+            (get_bouquet_type_url(row.id), row.lastmod) for row in type_rows
+        )
+        types_signature = make_etag(types_body)
+        new_manifest[SITEMAP_TYPES_NAME] = types_signature
+        index_entries.append(
+            (SITEMAP_TYPES_NAME, max((row.lastmod for row in type_rows), default=None))
+        )
+        if manifest.get(SITEMAP_TYPES_NAME) != types_signature:
+            await self._write(SITEMAP_TYPES_NAME, types_body)
+            rebuilt += 1
+
+        if rebuilt or new_manifest.keys() != manifest.keys():
+            await self._write(SITEMAP_INDEX_NAME, self._index(index_entries))
+            await self._write(
+                SITEMAP_MANIFEST_NAME, json.dumps(new_manifest, indent=2).encode()
+            )
+            self._remove_stale(new_manifest)
+
+        logger.info(
+            "sitemap_rebuilt",
+            chunks=len(chunks),
+            rebuilt=rebuilt,
+            urls=sum(chunk.urls for chunk in chunks) + len(type_rows),
+        )
+        return {"chunks": len(chunks), "rebuilt": rebuilt}
+
+    @staticmethod
+    def _bucket_bits(urls: int, current: int) -> int:
+        """
+        Число бит id для номера чанка. Меняется только при выходе среднего
+        размера чанка за пределы [SITEMAP_CHUNK_SIZE / 4, SITEMAP_CHUNK_SIZE / 2],
+        поэтому колебания числа букетов не перетасовывают все чанки.
+        """
+        if urls / 2**current > SITEMAP_CHUNK_SIZE / 2:
+            needed = math.ceil(math.log2(urls / (SITEMAP_CHUNK_SIZE / 2)))
+            return min(needed, SITEMAP_MAX_BUCKET_BITS)
+        while current > 0 and urls / 2 ** (current - 1) < SITEMAP_CHUNK_SIZE / 4:
+            current -= 1
+        return current
+
+    @staticmethod
+    def _manifest_bits(manifest: dict[str, str]) -> int:
+        for name in manifest:
+            match = re.fullmatch(r"sitemap-bouquets-(\d+)-\d+\.xml", name)
+            if match:
+                return min(int(match.group(1)), SITEMAP_MAX_BUCKET_BITS)
+        return 0
+
+    def _read_manifest(self) -> dict[str, str]:
+        try:
+            return json.loads((self.sitemap_dir / SITEMAP_MANIFEST_NAME).read_text())
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _remove_stale(self, manifest: dict[str, str]) -> None:
+        for path in self.sitemap_dir.glob("sitemap-bouquets-*.xml"):
+            if path.name not in manifest:
+                path.unlink(missing_ok=True)
+
+    async def _write(self, name: str, body: bytes) -> None:
+        path = self.sitemap_dir / name
+        tmp_path = path.with_name(f".{name}.{uuid.uuid4().hex}.tmp")
+        try:
+            await asyncio.to_thread(tmp_path.write_bytes, body)
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _lastmod(value: datetime | None) -> str:
+        return f"<lastmod>{value.isoformat(timespec='seconds')}</lastmod>" if value else ""
+
+    @classmethod
+    def _urlset(cls, entries) -> bytes:
+        lines = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            f'<urlset xmlns="{SITEMAP_XMLNS}">',
+            *(
+                f"<url><loc>{escape(loc)}</loc>{cls._lastmod(lastmod)}</url>"
+                for loc, lastmod in entries
+            ),
+            "</urlset>",
+        ]
+        return ("\n".join(lines) + "\n").encode()
+
+    @classmethod
+    def _index(cls, entries: list[tuple[str, datetime | None]]) -> bytes:
+        base_url = APP_CONFIG.SITEMAP_BASE_URL.rstrip("/")
+        lines = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            f'<sitemapindex xmlns="{SITEMAP_XMLNS}">',
+            *(
+                f"<sitemap><loc>{escape(f'{base_url}/{name}')}</loc>{cls._lastmod(lastmod)}</sitemap>"
+                for name, lastmod in entries
+            ),
+            "</sitemapindex>",
+        ]
+        return ("\n".join(lines) + "\n").encode()
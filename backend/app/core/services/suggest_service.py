@@ -0,0 +1,21 @@
+from pydantic import TypeAdapter
+
+from app.core.dto.bouquet import SuggestionSchema
+from app.infrastructure.cache.suggest_index import SuggestIndex
+
+
+SUGGESTION_LIST_ADAPTER = TypeAdapter(list[SuggestionSchema])
+
+
+class SuggestService:
+    def __init__(self, index: SuggestIndex):
+        self.index = index
+
+    def suggest(self, query: str, limit: int) -> bytes:
+        suggestions = self.index.search(query, limit)
+        return SUGGESTION_LIST_ADAPTER.dump_json(
+            [
+                SuggestionSchema(kind=item.kind, id=item.id, name=item.name)
+                for item in suggestions
+            ]
+        )
@@ -0,0 +1,15 @@
+from app.infrastructure.cache.catalog_cache import CachedResponse, CatalogCache
+from app.infrastructure.cache.catalog_index import CatalogIndex
+from app.infrastructure.cache.image_resize_cache import ImageResizeCache
+from app.infrastructure.cache.suggest_index import SuggestIndex
+from app.infrastructure.cache.view_counter import ViewCounterBuffer
+
+
+__all__ = [
+    "CachedResponse",
+    "CatalogCache",
+    "CatalogIndex",
+    "ImageResizeCache",
+    "SuggestIndex",
+    "ViewCounterBuffer",
+]
@@ -0,0 +1,207 @@
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Awaitable, Callable, Hashable
+
+from fastapi import Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.infrastructure.config.config import APP_CONFIG
+from app.infrastructure.logging.logger import get_logger
+from app.utils.http_cache import ConditionalHeaders, http_date, make_etag
+
+
+logger = get_logger(__name__)
+
+
+ENTRY_OVERHEAD_BYTES = 256
+
+CacheLoader = Callable[[AsyncSession], Awaitable["CachedResponse"]]
+SessionFactory = Callable[[], Awaitable[AsyncSession]]
+
+
+# Заголовки, которые повторяются в ответе 304
+VALIDATOR_HEADERS = ("ETag", "Last-Modified", "Cache-Control")
+
+
+@dataclass(slots=True)
+class CachedResponse:
+    """
+    Готовый к отправке ответ. ETag по умолчанию считается от тела один раз
+    при создании, поэтому проверка If-None-Match для записи из кэша
+    не требует ни запроса к базе, ни сериализации.
+    """
+
+    body: bytes
+    headers: dict[str, str] = field(default_factory=dict)
+    media_type: str = "application/json"
+    last_modified: datetime | None = None
+    cache_control: str = APP_CONFIG.CATALOG_CACHE_CONTROL
+
+    def __post_init__(self) -> None:
+        self.headers.setdefault("ETag", make_etag(self.body))
+        self.headers.setdefault("Cache-Control", self.cache_control)
+        if self.last_modified is not None:
+            self.headers.setdefault("Last-Modified", http_date(self.last_modified))
+
+    @property
+    def etag(self) -> str:
+        return self.headers["ETag"]
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + ENTRY_OVERHEAD_BYTES
+
+    def to_response(self, conditions: ConditionalHeaders | None = None) -> Response:
+        if conditions is not None and conditions.is_not_modified(
+            self.etag, self.last_modified
+        ):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={
+                    name: self.headers[name]
+                    for name in VALIDATOR_HEADERS
+                    if name in self.headers
+                },
+            )
+        return Response(
+            content=self.body, media_type=self.media_type, headers=self.headers
+        )
+
+
+@dataclass(slots=True)
+class _CacheEntry:
+    value: CachedResponse
+    stored_at: float
+
+
+class CatalogCache:
+    """
+    LRU-кэш сериализованных ответов каталога в памяти процесса.
+
+    Запись свежая в течение `ttl` секунд, затем ещё `stale_ttl` секунд
+    отдаётся как есть, а обновление уходит в фоновую задачу со своей сессией.
+    Любая запись из админки вызывает `invalidate()`, для одной записи
+    `invalidate(key)`.
+    """
+
+    def __init__(
+        self,
+        session_factory: SessionFactory,
+        max_bytes: int,
+        ttl: float,
+        stale_ttl: float,
+    ):
+        self._session_factory = session_factory
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._stale_ttl = stale_ttl
+        self._entries: OrderedDict[Hashable, _CacheEntry] = OrderedDict()
+        self._size = 0
+        self._generation = 0
+        self._key_generations: dict[Hashable, int] = {}
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self._refreshing: set[Hashable] = set()
+        self._tasks: set[asyncio.Task] = set()
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: CacheLoader,
+        session: AsyncSession,
+    ) -> CachedResponse:
+        entry = self._entries.get(key)
+        now = time.monotonic()
+
+        if entry is not None:
+            age = now - entry.stored_at
+            if age < self._ttl:
+                self._entries.move_to_end(key)
+                return entry.value
+            if age < self._ttl + self._stale_ttl:
+                self._entries.move_to_end(key)
+                self._schedule_refresh(key, loader)
+                return entry.value
+            self._remove(key)
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        generation = self._current_generation(key)
+        try:
+            value = await loader(session)
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+        self._store(key, value, generation)
+        future.set_result(value)
+        return value
+
+    def invalidate(self, key: Hashable | None = None) -> None:
+        # Загрузки, начатые до инвалидации, не попадут в кэш и не будут разделены с новыми запросами
+        if key is not None:
+            self._key_generations[key] = self._key_generations.get(key, 0) + 1
+            self._inflight.pop(key, None)
+            self._remove(key)
+            logger.debug("catalog_cache_key_invalidated", key=str(key))
+            return
+
+        self._generation += 1
+        self._key_generations.clear()
+        self._inflight.clear()
+        self._entries.clear()
+        self._size = 0
+        logger.info("catalog_cache_invalidated", generation=self._generation)
+
+    def _current_generation(self, key: Hashable) -> tuple[int, int]:
+        return self._generation, self._key_generations.get(key, 0)
+
+    def _schedule_refresh(self, key: Hashable, loader: CacheLoader) -> None:
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        task = asyncio.create_task(self._refresh(key, loader))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refresh(self, key: Hashable, loader: CacheLoader) -> None:
+        generation = self._current_generation(key)
+        try:
+            session = await self._session_factory()
+            async with session:
+                value = await loader(session)
+            self._store(key, value, generation)
+        except Exception as e:
+            logger.warning("catalog_cache_refresh_failed", key=str(key), error=str(e))
+        finally:
+            self._refreshing.discard(key)
+
+    def _store(
+        self, key: Hashable, value: CachedResponse, generation: tuple[int, int]
+    ) -> None:
+        # Результат, загруженный до инвалидации, уже устарел
+        if generation != self._current_generation(key) or value.size > self._max_bytes:
+            return
+
+        self._remove(key)
+        self._entries[key] = _CacheEntry(value=value, stored_at=time.monotonic())
+        self._size += value.size
+
+        while self._size > self._max_bytes and self._entries:
+            evicted_key = next(iter(self._entries))
+            self._remove(evicted_key)
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry.value.size
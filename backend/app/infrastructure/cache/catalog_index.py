@@ -0,0 +1,291 @@
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Any, Iterable
+from uuid import UUID
+
+import numpy as np
+
+from app.infrastructure.errors.base import BadRequestException
+from app.utils.enums import BouquetSort
+
+
+UUID_LOW_MASK = (1 << 64) - 1
+# Сортировки, которые индекс умеет отдавать; остальные идут в SQL
+INDEXED_SORTS = frozenset({BouquetSort.POPULAR, BouquetSort.PRICE_ASC, BouquetSort.PRICE_DESC})
+
+
+@dataclass(slots=True)
+class CatalogIndexEntry:
+    id: UUID
+    bouquet_type_id: UUID
+    price: int
+    popularity_score: float
+    flower_type_ids: list[UUID]
+
+
+@dataclass(slots=True)
+class CatalogIndexPage:
+    ids: list[UUID]
+    # Ключ сортировки последнего элемента, если страница заполнена целиком
+    next_key: list[Any] | None
+
+
+class CatalogIndex:
+    """
+    Индекс каталога в памяти процесса для фильтрации и сортировки без SQL.
+
+    Каждому активному букету выделяется слот. На каждый тип букета и вид
+    цветов хранится упакованный битсет слотов (np.packbits, бит на букет),
+    фильтры считаются побитовыми OR внутри фасета и AND между фасетами.
+    Для сортировок POPULAR и PRICE_* хранятся предотсортированные массивы
+    слотов, порядок совпадает с ORDER BY в BouquetRepository, включая id
+    как последний ключ. База нужна только чтобы получить карточки страницы.
+
+    Индекс целиком пересобирается фоновой задачей и точечно обновляется
+    при записи букетов из админки. Удалённый букет только снимается с бита
+    активности, его слот освобождается при следующей пересборке. Точечные
+    изменения, пришедшие во время пересборки, записываются в журнал
+    из `record()` и повторяются на новом индексе в `swap()`.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self._ids: list[UUID] = []
+        self._slots: dict[UUID, int] = {}
+        self._id_hi = np.zeros(0, dtype=np.uint64)
+        self._id_lo = np.zeros(0, dtype=np.uint64)
+        self._prices = np.zeros(0, dtype=np.int64)
+        self._popularity = np.zeros(0, dtype=np.float64)
+        self._active = np.zeros(0, dtype=np.uint8)
+        self._bouquet_types: dict[UUID, np.ndarray] = {}
+        self._flower_types: dict[UUID, np.ndarray] = {}
+        self._slot_bouquet_type: list[UUID] = []
+        self._slot_flower_types: list[list[UUID]] = []
+        self._orders: dict[BouquetSort, np.ndarray] = {}
+        self._logs: list[list[tuple[str, tuple]]] = []
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def replace(self, entries: Iterable[CatalogIndexEntry]) -> None:
+        entries = list(entries)
+        size = len(entries)
+        ids = [entry.id for entry in entries]
+
+        self._ids = ids
+        self._slots = {item: slot for slot, item in enumerate(ids)}
+        self._id_hi = np.fromiter((item.int >> 64 for item in ids), dtype=np.uint64, count=size)
+        self._id_lo = np.fromiter((item.int & UUID_LOW_MASK for item in ids), dtype=np.uint64, count=size)
+        self._prices = np.fromiter((entry.price for entry in entries), dtype=np.int64, count=size)
+        self._popularity = np.fromiter(
+            (entry.popularity_score for entry in entries), dtype=np.float64, count=size
+        )
+        self._active = np.packbits(np.ones(size, dtype=bool))
+        self._slot_bouquet_type = [entry.bouquet_type_id for entry in entries]
+        self._slot_flower_types = [list(entry.flower_type_ids) for entry in entries]
+        self._bouquet_types = self._build_bitsets(
+            (slot, [type_id]) for slot, type_id in enumerate(self._slot_bouquet_type)
+        )
+        self._flower_types = self._build_bitsets(enumerate(self._slot_flower_types))
+        self._sort()
+        self.ready = True
+
+    def record(self) -> list[tuple[str, tuple]]:
+        """Журнал точечных изменений для пересборки, начатой сейчас: передаётся в swap()."""
+        log: list[tuple[str, tuple]] = []
+        self._logs.append(log)
+        return log
+
+    def swap(self, other: "CatalogIndex", log: list[tuple[str, tuple]] | None = None) -> None:
+        # Новый индекс строится вне event loop, подмена состояния - одна операция в нём.
+        # Изменения из журнала новый индекс мог не увидеть, они применяются повторно
+        logs = self._logs
+        vars(self).update(vars(other))
+        self._logs = logs
+        self.stop_recording(log)
+        for method, args in log or ():
+            getattr(self, method)(*args)
+
+    def stop_recording(self, log: list[tuple[str, tuple]] | None) -> None:
+        self._logs = [item for item in self._logs if item is not log]
+
+    def _build_bitsets(
+        self, memberships: Iterable[tuple[int, list[UUID]]]
+    ) -> dict[UUID, np.ndarray]:
+        slots: dict[UUID, list[int]] = {}
+        for slot, keys in memberships:
+            for key in keys:
+                slots.setdefault(key, []).append(slot)
+
+        bitsets = {}
+        for key, key_slots in slots.items():
+            bits = np.zeros(len(self._ids), dtype=bool)
+            bits[key_slots] = True
+            bitsets[key] = np.packbits(bits)
+        return bitsets
+
+    def _sort(self) -> None:
+        # np.lexsort сортирует по последнему ключу, id (hi, lo) разрешает равенство
+        popularity = np.lexsort((self._id_lo, self._id_hi, self._popularity))[::-1]
+        price = np.lexsort((self._id_lo, self._id_hi, self._prices))
+        self._set_orders(popularity, price)
+
+    def _set_orders(self, popularity: np.ndarray, price: np.ndarray) -> None:
+        self._orders = {
+            BouquetSort.POPULAR: popularity,
+            BouquetSort.PRICE_ASC: price,
+            BouquetSort.PRICE_DESC: price[::-1],
+        }
+
+    def _reposition(self, slot: int) -> None:
+        # Вместо полной сортировки слот вынимается и вставляется по бинарному поиску
+        orders = []
+        for sort in (BouquetSort.POPULAR, BouquetSort.PRICE_ASC):
+            order = self._orders[sort]
+            order = order[order != slot]
+            position = bisect_right(
+                order, self._sort_key(slot, sort), key=lambda item: self._sort_key(item, sort)
+            )
+            orders.append(np.insert(order, position, slot))
+        self._set_orders(*orders)
+
+    @staticmethod
+    def _set_bit(bitset: np.ndarray, slot: int, value: bool) -> None:
+        # Порядок бит как у np.packbits: старший бит байта - младший слот
+        mask = np.uint8(0x80 >> (slot & 7))
+        if value:
+            bitset[slot >> 3] |= mask
+        else:
+            bitset[slot >> 3] &= ~mask
+
+    def _grow(self, bitset: np.ndarray) -> np.ndarray:
+        required = (len(self._ids) + 7) // 8
+        if len(bitset) >= required:
+            return bitset
+        return np.concatenate([bitset, np.zeros(required - len(bitset), dtype=np.uint8)])
+
+    def _bitset(self, bitsets: dict[UUID, np.ndarray], key: UUID) -> np.ndarray:
+        bitset = self._grow(bitsets.get(key, np.zeros(0, dtype=np.uint8)))
+        bitsets[key] = bitset
+        return bitset
+
+    def upsert(
+        self,
+        bouquet_id: UUID,
+        bouquet_type_id: UUID,
+        price: int,
+        popularity_score: float,
+        flower_type_ids: list[UUID] | None = None,
+    ) -> None:
+        """Добавляет или обновляет активный букет. flower_type_ids=None оставляет виды цветов как были."""
+        self._record("upsert", bouquet_id, bouquet_type_id, price, popularity_score, flower_type_ids)
+        if not self.ready:
+            return
+
+        slot = self._slots.get(bouquet_id)
+        if slot is None:
+            slot = len(self._ids)
+            self._ids.append(bouquet_id)
+            self._slots[bouquet_id] = slot
+            self._id_hi = np.append(self._id_hi, np.uint64(bouquet_id.int >> 64))
+            self._id_lo = np.append(self._id_lo, np.uint64(bouquet_id.int & UUID_LOW_MASK))
+            self._prices = np.append(self._prices, np.int64(price))
+            self._popularity = np.append(self._popularity, np.float64(popularity_score))
+            self._slot_bouquet_type.append(bouquet_type_id)
+            self._slot_flower_types.append([])
+            self._active = self._grow(self._active)
+            flower_type_ids = flower_type_ids or []
+        else:
+            self._prices[slot] = price
+            self._popularity[slot] = popularity_score
+
+        self._set_bit(self._bitset(self._bouquet_types, self._slot_bouquet_type[slot]), slot, False)
+        self._slot_bouquet_type[slot] = bouquet_type_id
+        self._set_bit(self._bitset(self._bouquet_types, bouquet_type_id), slot, True)
+
+        if flower_type_ids is not None:
+            for flower_type_id in self._slot_flower_types[slot]:
+                self._set_bit(self._bitset(self._flower_types, flower_type_id), slot, False)
+            self._slot_flower_types[slot] = list(flower_type_ids)
+            for flower_type_id in flower_type_ids:
+                self._set_bit(self._bitset(self._flower_types, flower_type_id), slot, True)
+
+        self._set_bit(self._active, slot, True)
+        self._reposition(slot)
+
+    def remove(self, bouquet_id: UUID) -> None:
+        self._record("remove", bouquet_id)
+        slot = self._slots.get(bouquet_id)
+        if slot is not None:
+            self._set_bit(self._active, slot, False)
+
+    def _record(self, method: str, *args: Any) -> None:
+        for log in self._logs:
+            log.append((method, args))
+
+    def _union(self, bitsets: dict[UUID, np.ndarray], keys: list[UUID]) -> np.ndarray:
+        result = np.zeros_like(self._active)
+        for key in keys:
+            bitset = bitsets.get(key)
+            if bitset is not None:
+                result[: len(bitset)] |= bitset
+        return result
+
+    def _sort_key(self, slot: int, sort: BouquetSort) -> tuple:
+        value = self._popularity[slot] if sort == BouquetSort.POPULAR else self._prices[slot]
+        key = (value.item(), self._ids[slot].int)
+        return key if sort == BouquetSort.PRICE_ASC else (-key[0], -key[1])
+
+    @staticmethod
+    def _parse_cursor(after: list[Any]) -> tuple[int | float, UUID]:
+        # Курсор приходит от клиента: ошибка в нём - 400, как и в SQL-пути
+        if not isinstance(after, (list, tuple)) or len(after) != 2:
+            raise BadRequestException("Некорректный курсор пагинации")
+        value, last_id = after
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not isinstance(last_id, UUID):
+            raise BadRequestException("Некорректный курсор пагинации")
+        return value, last_id
+
+    def search(
+        self,
+        sort: BouquetSort,
+        limit: int,
+        offset: int = 0,
+        after: list[Any] | None = None,
+        bouquet_type_ids: list[UUID] | None = None,
+        flower_type_ids: list[UUID] | None = None,
+        price_min: int | None = None,
+        price_max: int | None = None,
+    ) -> CatalogIndexPage:
+        size = len(self._ids)
+        bits = self._active.copy()
+        if bouquet_type_ids:
+            bits &= self._union(self._bouquet_types, bouquet_type_ids)
+        if flower_type_ids:
+            bits &= self._union(self._flower_types, flower_type_ids)
+
+        mask = np.unpackbits(bits, count=size).view(bool)
+        if price_min is not None:
+            mask &= self._prices >= price_min
+        if price_max is not None:
+            mask &= self._prices <= price_max
+
+        order = self._orders[sort]
+        selected = order[mask[order]]
+
+        if after is not None:
+            value, last_id = self._parse_cursor(after)
+            cursor = (value, last_id.int)
+            if sort != BouquetSort.PRICE_ASC:
+                cursor = (-cursor[0], -cursor[1])
+            start = bisect_right(selected, cursor, key=lambda slot: self._sort_key(slot, sort))
+        else:
+            start = offset
+
+        page = selected[start:start + limit].tolist()
+        next_key = None
+        if page and len(page) == limit:
+            last = page[-1]
+            value = self._popularity[last] if sort == BouquetSort.POPULAR else self._prices[last]
+            next_key = [value.item(), self._ids[last]]
+        return CatalogIndexPage(ids=[self._ids[slot] for slot in page], next_key=next_key)
@@ -0,0 +1,134 @@
+import asyncio
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from app.infrastructure.logging.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class ImageResizeCache:
+    """
+    Учёт уменьшенных по запросу изображений на диске с вытеснением LRU.
+
+    Файлы лежат в `directory` под ключом вида `<w>x<h>/<путь оригинала>`,
+    в памяти хранится только порядок использования и размеры. Порядок
+    переживает перезапуск: при попадании у файла обновляется mtime, а `load()`
+    восстанавливает очередь по mtime. Лимит `max_bytes` соблюдается в пределах
+    процесса: воркеры с общей директорией видят вытеснение друг друга
+    как промах и пересоздают файл.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = directory
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._size = 0
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def load(self) -> None:
+        """Читает содержимое директории. Блокирующая, вызывается вне event loop."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        files = []
+        for path in self.directory.rglob("*.webp"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, path.relative_to(self.directory).as_posix(), stat.st_size))
+
+        self._entries.clear()
+        self._size = 0
+        evicted = []
+        for _, key, size in sorted(files):
+            evicted.extend(self._track(key, size))
+        self._remove_files(evicted)
+        logger.info("image_resize_cache_loaded", files=len(self._entries), size=self._size)
+
+    def path(self, key: str) -> Path:
+        return self.directory / key
+
+    async def get_or_create(
+        self, key: str, create: Callable[[Path], Awaitable[int]]
+    ) -> Path:
+        """
+        Путь к готовому файлу. При промахе `create(path)` пишет файл
+        и возвращает его размер, одновременные промахи по ключу ждут одного вызова.
+        """
+        path = self.path(key)
+        # Файл мог создать другой воркер или он пережил перезапуск, тогда он просто учитывается
+        size = await asyncio.to_thread(self._mark_used, path)
+        if size is not None:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            else:
+                await self._add(key, size)
+            return path
+        self._discard(key)
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            size = await create(path)
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+        await self._add(key, size)
+        future.set_result(path)
+        return path
+
+    async def _add(self, key: str, size: int) -> None:
+        evicted = self._track(key, size)
+        if evicted:
+            await asyncio.to_thread(self._remove_files, evicted)
+            logger.debug("image_resize_cache_evicted", files=len(evicted), size=self._size)
+
+    def _track(self, key: str, size: int) -> list[Path]:
+        """Учитывает файл и возвращает вытесненные файлы, которые нужно удалить."""
+        self._discard(key)
+        self._entries[key] = size
+        self._size += size
+
+        evicted = []
+        while self._size > self._max_bytes and len(self._entries) > 1:
+            evicted_key, evicted_size = self._entries.popitem(last=False)
+            self._size -= evicted_size
+            evicted.append(self.path(evicted_key))
+        return evicted
+
+    def _discard(self, key: str) -> None:
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._size -= size
+
+    @staticmethod
+    def _mark_used(path: Path) -> int | None:
+        # Обновлённый mtime - время последнего использования для load()
+        try:
+            os.utime(path)
+            return path.stat().st_size
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _remove_files(paths: list[Path]) -> None:
+        for path in paths:
+            path.unlink(missing_ok=True)
@@ -0,0 +1,164 @@
+import heapq
+import re
+from bisect import bisect_left, insort
+from collections import Counter
+from dataclasses import dataclass, field
+from uuid import UUID
+
+from app.utils.enums import SuggestionKind
+
+
+TOKEN_PATTERN = re.compile(r"\w+")
+# Минимальная доля триграмм запроса, найденных в названии, для нечёткого совпадения
+FUZZY_THRESHOLD = 0.5
+# Поднимает типы букетов и цветов над отдельными букетами при равном совпадении
+KIND_BOOST = {
+    SuggestionKind.BOUQUET_TYPE: 2.0,
+    SuggestionKind.FLOWER_TYPE: 1.5,
+    SuggestionKind.BOUQUET: 1.0,
+}
+
+
+def normalize(text: str) -> list[str]:
+    return TOKEN_PATTERN.findall(text.lower().replace("ё", "е"))
+
+
+def trigrams(token: str) -> set[str]:
+    # Как в pg_trgm: два пробела в начале и один в конце слова
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass(slots=True)
+class Suggestion:
+    kind: SuggestionKind
+    id: UUID
+    name: str
+    weight: float = 0.0
+    tokens: list[str] = field(default_factory=list)
+
+
+class SuggestIndex:
+    """
+    Индекс подсказок поиска в памяти процесса: названия активных букетов,
+    типов букетов и видов цветов.
+
+    Сначала ищется совпадение по префиксам слов (отсортированный список
+    слов и bisect), если его не хватает - по триграммам, что ловит опечатки.
+    Индекс целиком строится фоновой задачей, а при записи букетов из админки
+    меняются только слова и триграммы одной записи. Запросы подсказок
+    в базу не ходят.
+    """
+
+    def __init__(self):
+        self._entries: dict[tuple[SuggestionKind, UUID], Suggestion] = {}
+        self._tokens: list[tuple[str, tuple[SuggestionKind, UUID]]] = []
+        self._trigrams: dict[str, set[tuple[SuggestionKind, UUID]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def replace(self, suggestions: list[Suggestion]) -> None:
+        self._entries = {(item.kind, item.id): item for item in suggestions}
+        self._reindex()
+
+    def upsert(self, kind: SuggestionKind, item_id: UUID, name: str, weight: float = 0.0) -> None:
+        key = (kind, item_id)
+        previous = self._entries.get(key)
+        if previous is not None:
+            self._unindex(key, previous)
+        entry = Suggestion(kind=kind, id=item_id, name=name, weight=weight)
+        self._entries[key] = entry
+        self._index(key, entry)
+
+    def remove(self, kind: SuggestionKind, item_id: UUID) -> None:
+        key = (kind, item_id)
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._unindex(key, entry)
+
+    def _index(self, key: tuple[SuggestionKind, UUID], entry: Suggestion) -> None:
+        entry.tokens = normalize(entry.name)
+        for token in entry.tokens:
+            insort(self._tokens, (token, key))
+        for gram in set().union(*(trigrams(token) for token in entry.tokens)):
+            self._trigrams.setdefault(gram, set()).add(key)
+
+    def _unindex(self, key: tuple[SuggestionKind, UUID], entry: Suggestion) -> None:
+        for token in entry.tokens:
+            position = bisect_left(self._tokens, (token, key))
+            if position < len(self._tokens) and self._tokens[position] == (token, key):
+                del self._tokens[position]
+        for gram in set().union(*(trigrams(token) for token in entry.tokens)):
+            keys = self._trigrams.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._trigrams[gram]
+
+    def _reindex(self) -> None:
+        # Полная сборка только для replace из фоновой задачи
+        tokens = []
+        trigram_index: dict[str, set[tuple[SuggestionKind, UUID]]] = {}
+        for key, entry in self._entries.items():
+            entry.tokens = normalize(entry.name)
+            entry_grams = set()
+            for token in entry.tokens:
+                tokens.append((token, key))
+                entry_grams |= trigrams(token)
+            for gram in entry_grams:
+                trigram_index.setdefault(gram, set()).add(key)
+        tokens.sort()
+
+        self._tokens = tokens
+        self._trigrams = trigram_index
+
+    def _prefix_matches(self, prefix: str) -> set[tuple[SuggestionKind, UUID]]:
+        matches = set()
+        # По индексу, а не срезом: срез копировал бы хвост списка на каждый запрос
+        tokens = self._tokens
+        for position in range(bisect_left(tokens, (prefix,)), len(tokens)):
+            token, key = tokens[position]
+            if not token.startswith(prefix):
+                break
+            matches.add(key)
+        return matches
+
+    def search(self, query: str, limit: int) -> list[Suggestion]:
+        query_tokens = normalize(query)
+        if not query_tokens or not self._entries:
+            return []
+
+        # Каждое слово запроса должно быть началом какого-то слова названия
+        prefix_keys = set.intersection(*(self._prefix_matches(token) for token in query_tokens))
+        phrase = " ".join(query_tokens)
+        scores = {
+            key: 2.0 if " ".join(self._entries[key].tokens).startswith(phrase) else 1.0
+            for key in prefix_keys
+        }
+
+        fuzzy_scores: dict[tuple[SuggestionKind, UUID], float] = {}
+        if len(scores) < limit:
+            query_grams = set().union(*(trigrams(token) for token in query_tokens))
+            hits: Counter[tuple[SuggestionKind, UUID]] = Counter()
+            for gram in query_grams:
+                hits.update(self._trigrams.get(gram, ()))
+            for key, count in hits.items():
+                similarity = count / len(query_grams)
+                if key not in scores and similarity >= FUZZY_THRESHOLD:
+                    fuzzy_scores[key] = similarity
+
+        # Совпадения по префиксу всегда выше нечётких
+        ranked = heapq.nsmallest(
+            limit,
+            [(0, key, score) for key, score in scores.items()]
+            + [(1, key, score) for key, score in fuzzy_scores.items()],
+            key=lambda item: (
+                item[0],
+                -item[2] * KIND_BOOST[item[1][0]],
+                -self._entries[item[1]].weight,
+                len(self._entries[item[1]].name),
+                self._entries[item[1]].name,
+            ),
+        )
+        return [self._entries[key] for _, key, _ in ranked]
@@ -0,0 +1,27 @@
+from collections import Counter
+from uuid import UUID
+
+
+class ViewCounterBuffer:
+    """
+    Накопитель просмотров букетов в памяти процесса (write-behind).
+
+    Просмотры суммируются по id и периодически сбрасываются в базу одним
+    запросом. Если запись не удалась, снятые счётчики возвращаются обратно.
+    """
+
+    def __init__(self):
+        self._counts: Counter[UUID] = Counter()
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def add(self, bouquet_id: UUID, views: int = 1) -> None:
+        self._counts[bouquet_id] += views
+
+    def drain(self) -> dict[UUID, int]:
+        counts, self._counts = self._counts, Counter()
+        return dict(counts)
+
+    def restore(self, counts: dict[UUID, int]) -> None:
+        self._counts.update(counts)
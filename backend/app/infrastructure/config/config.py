@@ -56,13 +56,59 @@ class AppConfig(Config):
     DEBUG: bool = Field(default=False)
     
     BASE_URL: str = Field(default="http://localhost:8000")
+    SITE_URL: str = Field(default="http://localhost:5173", description="Адрес витрины для ссылок в фидах и sitemap")
+    SITE_BOUQUET_PATH: str = Field(default="/catalog/{id}", description="Путь страницы букета на витрине")
+    SITE_BOUQUET_TYPE_PATH: str = Field(default="/catalog?bouquet_type_ids={id}", description="Путь страницы типа букетов на витрине")
+    SHOP_NAME: str = Field(default="Lascovo", description="Название магазина в товарном фиде")
     STATIC_URL: str = Field(default="http://localhost:8000/static/images")
     
     MAX_IMAGE_SIZE_MB: int = Field(default=10)
     WEBP_QUALITY: int = Field(default=85)
+    IMAGE_MAX_PIXELS: int = Field(default=40_000_000, description="Максимум пикселей в загружаемом изображении, проверяется по заголовку до декодирования")
+    IMAGE_MAX_SIDE: int = Field(default=2560, description="Длинная сторона сохраняемого оригинала, большие изображения уменьшаются")
+    WEBP_METHOD: int = Field(default=4, description="Метод сжатия WebP от 0 до 6: выше - меньше файл, но заметно дольше кодирование")
+    IMAGE_ENCODE_WORKERS: int = Field(default=2, description="Число процессов кодирования изображений")
+    IMAGE_ENCODE_MAX_QUEUE: int = Field(default=32, description="Сколько изображений может ждать кодирования, сверх этого загрузка отклоняется с 503")
+    IMAGE_UPLOAD_CONCURRENCY: int = Field(default=2, description="Сколько изображений одного запроса кодируется одновременно")
+    IMAGE_VARIANT_WIDTHS: dict[str, int] = Field(
+        default={"thumbnail": 160, "card": 400, "detail": 960, "zoom": 1600},
+        description="Ширины уменьшенных копий изображения, создаваемых при загрузке",
+    )
+    IMAGE_RESIZE_SIZES: list[str] = Field(
+        default=["160x160", "320x320", "400x0", "640x0", "960x0"],
+        description="Размеры <ширина>x<высота>, доступные для уменьшения по запросу, 0 - без ограничения; остальные отдают 404",
+    )
+    IMAGE_RESIZE_WORKERS: int = Field(default=1, description="Число процессов для уменьшения изображений по запросу, отдельно от кодирования загрузок")
+    IMAGE_RESIZE_MAX_QUEUE: int = Field(default=16, description="Сколько уменьшений может ждать процесса, сверх этого запрос отклоняется с 503")
+    IMAGE_RESIZE_CACHE_MAX_MB: int = Field(default=1024, description="Максимальный объём кэша уменьшенных по запросу изображений на диске")
+    IMAGE_RESIZE_CACHE_CONTROL: str = Field(default="public, max-age=31536000, immutable", description="Заголовок Cache-Control для уменьшенных по запросу изображений")
     
     SLOW_REQUEST_THRESHOLD: float = Field(default=1.0, description="Порог медленных запросов в секундах")
 
+    CATALOG_CACHE_TTL: float = Field(default=30.0, description="Время жизни свежей записи кэша каталога в секундах")
+    CATALOG_CACHE_STALE_TTL: float = Field(default=300.0, description="Сколько секунд после TTL отдавать устаревшую запись, обновляя её в фоне")
+    CATALOG_CACHE_MAX_MB: int = Field(default=64, description="Максимальный объём кэша каталога в памяти")
+    DETAIL_CACHE_TTL: float = Field(default=60.0, description="Время жизни свежей карточки букета в кэше в секундах")
+    DETAIL_CACHE_STALE_TTL: float = Field(default=600.0, description="Сколько секунд после TTL отдавать устаревшую карточку, обновляя её в фоне")
+    DETAIL_CACHE_MAX_MB: int = Field(default=32, description="Максимальный объём кэша карточек букетов в памяти")
+    CATALOG_CACHE_CONTROL: str = Field(default="public, max-age=0, must-revalidate", description="Заголовок Cache-Control для ответов каталога")
+
+    POPULARITY_REFRESH_INTERVAL: float = Field(default=600.0, description="Период пересчёта популярности букетов в секундах")
+    POPULARITY_HALF_LIFE_DAYS: float = Field(default=14.0, description="Период полураспада веса покупок и просмотров в днях")
+    POPULARITY_VIEW_WEIGHT: float = Field(default=0.05, description="Вес одного просмотра относительно одной покупки")
+    TRENDING_HALF_LIFE_DAYS: float = Field(default=2.0, description="Период полураспада для сортировки по трендам в днях")
+
+    SIMILAR_BOUQUETS_TOP_K: int = Field(default=12, description="Сколько похожих букетов хранится для каждого букета")
+    SIMILAR_BOUQUETS_REFRESH_INTERVAL: float = Field(default=86400.0, description="Период полного пересчёта похожих букетов в секундах")
+    CO_PURCHASE_HALF_LIFE_DAYS: float = Field(default=90.0, description="Период полураспада веса совместных покупок в днях")
+    CATALOG_INDEX_REFRESH_INTERVAL: float = Field(default=120.0, description="Период полной пересборки индекса каталога в памяти в секундах")
+    SUGGEST_INDEX_REFRESH_INTERVAL: float = Field(default=300.0, description="Период полной пересборки индекса подсказок поиска в секундах")
+    VIEW_COUNTER_FLUSH_INTERVAL: float = Field(default=5.0, description="Период сброса накопленных просмотров в базу в секундах")
+
+    SITEMAP_PASSWORD: str = Field(default="", description="Пароль для ручной пересборки sitemap, пустой - пересборка по запросу отключена")
+    SITEMAP_BASE_URL: str = Field(default="http://localhost:8000/static/sitemaps", description="Публичный адрес каталога с файлами sitemap")
+    SITEMAP_REFRESH_INTERVAL: float = Field(default=3600.0, description="Период пересборки sitemap в секундах")
+
     CORS_ALLOWED_ORIGINS: str = Field(default="http://localhost:3000,http://localhost:5173")
 
 
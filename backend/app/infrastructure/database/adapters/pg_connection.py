@@ -1,7 +1,6 @@
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 
 from app.infrastructure.config.config import DB_CONFIG
-from app.infrastructure.database.models.base import Base
 from app.utils.test_db import init_test_db
 
 import app.infrastructure.database.events.is_active
@@ -17,8 +16,7 @@ class DatabaseConnection:
         return AsyncSession(bind=self._engine)
         
     async def init_test_db(self):
-        async with self._engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
+        # Схема создаётся миграциями: alembic upgrade head
         async with await self.get_session() as session:
             await init_test_db(session)
         
@@ -1,5 +1,13 @@
 from .base import Base
-from .bouquet import Bouquet, BouquetImage, BouquetType, FlowerType
+from .bouquet import (
+    Bouquet,
+    BouquetCoPurchase,
+    BouquetImage,
+    BouquetSimilarity,
+    BouquetType,
+    CatalogListing,
+    FlowerType,
+)
 from .order import Order, OrderItem, Payment, DeliveryMethod, OrderStatus, PaymentStatus
 from .blocked_customer import BlockedCustomer
 from .admin import Admin
@@ -8,8 +16,11 @@ from .admin import Admin
 __all__ = [
     "Base",
     "Bouquet",
+    "BouquetCoPurchase",
     "BouquetImage",
+    "BouquetSimilarity",
     "BouquetType",
+    "CatalogListing",
     "FlowerType",
     "Order",
     "OrderItem",
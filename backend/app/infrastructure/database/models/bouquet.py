@@ -1,5 +1,7 @@
+from datetime import datetime
 from uuid import UUID
-from sqlalchemy import ForeignKey, UniqueConstraint
+from sqlalchemy import Computed, DateTime, Float, ForeignKey, Index, Integer, UniqueConstraint
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR, UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.infrastructure.database.models.base import Base
 
@@ -8,6 +10,7 @@ class BouquetFlowerType(Base):
     __tablename__ = "bouquet_flower_types"
     __table_args__ = (
         UniqueConstraint("bouquet_id", "flower_type_id", name="uq_bouquet_flower_type"),
+        Index("ix_bouquet_flower_types_flower_type_id_bouquet_id", "flower_type_id", "bouquet_id"),
     )
     
     bouquet_id: Mapped[UUID] = mapped_column(
@@ -20,8 +23,17 @@ class BouquetFlowerType(Base):
     )
 
 
+BOUQUET_SEARCH_VECTOR = (
+    "setweight(to_tsvector('russian', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'B')"
+)
+
+
 class Bouquet(Base):
     __tablename__ = "bouquets"
+    __table_args__ = (
+        Index("ix_bouquets_search_vector", "search_vector", postgresql_using="gin"),
+    )
     
     name: Mapped[str]
     description: Mapped[str]
@@ -29,13 +41,43 @@ class Bouquet(Base):
     quantity: Mapped[int] = mapped_column(default=0)
     purchase_count: Mapped[int] = mapped_column(default=0)
     view_count: Mapped[int] = mapped_column(default=0)
+    # Популярность с затуханием по времени в растущей шкале, пополняется фоновой задачей
+    popularity_score: Mapped[float] = mapped_column(default=0.0, server_default="0")
+    scored_view_count: Mapped[int] = mapped_column(default=0, server_default="0")
+    # То же с коротким периодом полураспада, ключ сортировки TRENDING
+    trending_score: Mapped[float] = mapped_column(default=0.0, server_default="0")
+    popularity_updated_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        default=None
+    )
     is_active: Mapped[bool] = mapped_column(default=False)
     bouquet_type_id: Mapped[UUID] = mapped_column(ForeignKey("bouquet_types.id"))
+    # Первое по order изображение, поддерживается BouquetRepository
+    main_image_id: Mapped[UUID | None] = mapped_column(
+        ForeignKey(
+            "bouquet_images.id",
+            ondelete="SET NULL",
+            use_alter=True,
+            name="fk_bouquets_main_image_id"
+        ),
+        default=None
+    )
+    # Генерируемая колонка для полнотекстового поиска, в обычных запросах не загружается
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(BOUQUET_SEARCH_VECTOR, persisted=True),
+        deferred=True
+    )
 
     images: Mapped[list["BouquetImage"]] = relationship(
         back_populates="bouquet",
         cascade="all, delete-orphan",
-        order_by="BouquetImage.order"
+        order_by="BouquetImage.order",
+        foreign_keys="BouquetImage.bouquet_id"
+    )
+    main_image: Mapped["BouquetImage | None"] = relationship(
+        foreign_keys=[main_image_id],
+        viewonly=True
     )
     bouquet_type: Mapped["BouquetType"] = relationship(back_populates="bouquets")
     flower_types: Mapped[list["FlowerType"]] = relationship(
@@ -46,12 +88,32 @@ class Bouquet(Base):
 
 class BouquetImage(Base):
     __tablename__ = "bouquet_images"
+    __table_args__ = (
+        Index("ix_bouquet_images_bouquet_id_order", "bouquet_id", "order"),
+        # Файлы общие для одинаковых загрузок, удаляются по последней ссылке
+        Index("ix_bouquet_images_image_path", "image_path"),
+    )
 
     image_path: Mapped[str]
     order: Mapped[int] = mapped_column(default=0)
+    # Ширины уменьшенных копий, сохранённых рядом с оригиналом
+    widths: Mapped[list[int]] = mapped_column(ARRAY(Integer), default=list, server_default="{}")
     
     bouquet_id: Mapped[UUID] = mapped_column(ForeignKey("bouquets.id", ondelete="CASCADE"))
-    bouquet: Mapped["Bouquet"] = relationship(back_populates="images")
+    bouquet: Mapped["Bouquet"] = relationship(
+        back_populates="images",
+        foreign_keys=[bouquet_id]
+    )
+
+
+# Индексы под сортировки каталога: ключ совпадает с ORDER BY в BouquetRepository
+Index(
+    "ix_bouquets_active_popularity",
+    Bouquet.popularity_score.desc(),
+    Bouquet.id.desc(),
+    postgresql_where=Bouquet.is_active == True
+)
+Index("ix_bouquets_is_active_price", Bouquet.is_active, Bouquet.price, Bouquet.id)
 
 
 class BouquetType(Base):
@@ -68,4 +130,104 @@ class FlowerType(Base):
     bouquets: Mapped[list["Bouquet"]] = relationship(
         secondary="bouquet_flower_types",
         back_populates="flower_types"
-    )
\ No newline at end of file
+    )
+
+
+class BouquetSimilarity(Base):
+    """Предрассчитанные похожие букеты, по строке на букет в порядке убывания сходства."""
+
+    __tablename__ = "bouquet_similarities"
+    __table_args__ = (
+        Index("ix_bouquet_similarities_similar_ids", "similar_ids", postgresql_using="gin"),
+    )
+
+    bouquet_id: Mapped[UUID] = mapped_column(
+        ForeignKey("bouquets.id", ondelete="CASCADE"),
+        unique=True
+    )
+    similar_ids: Mapped[list[UUID]] = mapped_column(ARRAY(PG_UUID(as_uuid=True)))
+    scores: Mapped[list[float]] = mapped_column(ARRAY(Float))
+
+
+class BouquetCoPurchase(Base):
+    """
+    Совместные покупки: пара букетов из одного оплаченного заказа.
+    Хранится в обе стороны, вес растёт с каждым заказом и больше у свежих.
+    """
+
+    __tablename__ = "bouquet_co_purchases"
+    __table_args__ = (
+        UniqueConstraint("bouquet_id", "related_bouquet_id", name="uq_bouquet_co_purchase"),
+    )
+
+    bouquet_id: Mapped[UUID] = mapped_column(ForeignKey("bouquets.id", ondelete="CASCADE"))
+    related_bouquet_id: Mapped[UUID] = mapped_column(
+        ForeignKey("bouquets.id", ondelete="CASCADE")
+    )
+    weight: Mapped[float] = mapped_column(default=0.0)
+    orders_count: Mapped[int] = mapped_column(default=0)
+
+
+class CatalogListing(Base):
+    """
+    Витрина клиентского каталога: по строке на активный букет со всем, что
+    нужно для фильтров, сортировок и карточки списка, без JOIN.
+
+    id совпадает с id букета. Таблицу заполняют триггеры на bouquets,
+    bouquet_flower_types и bouquet_images в той же транзакции, что и запись,
+    приложение её только читает.
+    """
+
+    __tablename__ = "catalog_listing"
+    __table_args__ = (
+        Index("ix_catalog_listing_flower_type_ids", "flower_type_ids", postgresql_using="gin"),
+        Index("ix_catalog_listing_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_catalog_listing_bouquet_type_id", "bouquet_type_id"),
+    )
+
+    id: Mapped[UUID] = mapped_column(
+        ForeignKey("bouquets.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    name: Mapped[str]
+    price: Mapped[int]
+    quantity: Mapped[int]
+    bouquet_type_id: Mapped[UUID]
+    flower_type_ids: Mapped[list[UUID]] = mapped_column(
+        ARRAY(PG_UUID(as_uuid=True)),
+        server_default="{}"
+    )
+    popularity_score: Mapped[float]
+    trending_score: Mapped[float] = mapped_column(server_default="0")
+    # Снимок bouquets.scored_view_count: обновляется пересчётом популярности,
+    # а не каждым сбросом просмотров
+    view_count: Mapped[int] = mapped_column(server_default="0")
+    main_image_id: Mapped[UUID | None]
+    main_image_path: Mapped[str | None]
+    main_image_order: Mapped[int | None]
+    main_image_widths: Mapped[list[int]] = mapped_column(ARRAY(Integer), server_default="{}")
+    search_vector: Mapped[str] = mapped_column(TSVECTOR, deferred=True)
+
+
+# Ключи совпадают с ORDER BY в BouquetRepository
+Index(
+    "ix_catalog_listing_popularity",
+    CatalogListing.popularity_score.desc(),
+    CatalogListing.id.desc()
+)
+Index("ix_catalog_listing_price", CatalogListing.price, CatalogListing.id)
+Index(
+    "ix_catalog_listing_newest",
+    CatalogListing.created_at.desc(),
+    CatalogListing.id.desc()
+)
+Index(
+    "ix_catalog_listing_most_viewed",
+    CatalogListing.view_count.desc(),
+    CatalogListing.id.desc()
+)
+Index(
+    "ix_catalog_listing_trending",
+    CatalogListing.trending_score.desc(),
+    CatalogListing.id.desc()
+)
@@ -1,7 +1,7 @@
 from typing import TYPE_CHECKING
 from uuid import UUID
 from datetime import datetime
-from sqlalchemy import DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import DateTime, ForeignKey, Index, Enum as SQLEnum, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.infrastructure.database.models.base import Base
 
@@ -14,10 +14,18 @@ if TYPE_CHECKING:
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        Index("ix_orders_status_created_at", "status", "created_at"),
+        Index(
+            "ix_orders_popularity_unscored",
+            "status",
+            postgresql_where=text("popularity_scored_at IS NULL"),
+        ),
+    )
     
     customer_name: Mapped[str]
-    customer_phone: Mapped[str]
-    customer_email: Mapped[str]
+    customer_phone: Mapped[str] = mapped_column(index=True)
+    customer_email: Mapped[str] = mapped_column(index=True)
     is_pickup_by_customer: Mapped[bool] = mapped_column(default=False)
     
     recipient_name: Mapped[str] = mapped_column(nullable=True)
@@ -39,6 +47,11 @@ class Order(Base):
     total_amount: Mapped[int]
     status: Mapped[OrderStatus] = mapped_column(SQLEnum(OrderStatus), default=OrderStatus.PENDING)
     is_active: Mapped[bool] = mapped_column(default=False)
+    # Когда покупки заказа учтены в популярности букетов, NULL - ещё не учтены
+    popularity_scored_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        default=None
+    )
     
     items: Mapped[list["OrderItem"]] = relationship(
         back_populates="order",
@@ -53,7 +66,7 @@ class Order(Base):
 class OrderItem(Base):
     __tablename__ = "order_items"
     
-    order_id: Mapped[UUID] = mapped_column(ForeignKey("orders.id", ondelete="CASCADE"))
+    order_id: Mapped[UUID] = mapped_column(ForeignKey("orders.id", ondelete="CASCADE"), index=True)
     bouquet_id: Mapped[UUID] = mapped_column(ForeignKey("bouquets.id", ondelete="CASCADE"))
     
     quantity: Mapped[int]
@@ -67,7 +80,7 @@ class OrderItem(Base):
 class Payment(Base):
     __tablename__ = "payments"
     
-    order_id: Mapped[UUID] = mapped_column(ForeignKey("orders.id", ondelete="CASCADE"))
+    order_id: Mapped[UUID] = mapped_column(ForeignKey("orders.id", ondelete="CASCADE"), index=True)
     
     amount: Mapped[int]
     status: Mapped[PaymentStatus] = mapped_column(SQLEnum(PaymentStatus), default=PaymentStatus.PENDING)
@@ -34,6 +34,17 @@ class ImageTooLarge(HTTPException):
         )
 
 
+class ImageTooManyPixels(HTTPException):
+    status_code = status.HTTP_400_BAD_REQUEST
+    detail = "Слишком большое разрешение изображения"
+    
+    def __init__(self, max_megapixels: float):
+        super().__init__(
+            status_code=self.status_code,
+            detail=f"Слишком большое разрешение изображения. Максимум: {max_megapixels:g} Мп"
+        )
+
+
 class EmptyImageFile(HTTPException):
     status_code = status.HTTP_400_BAD_REQUEST
     detail = "Файл пустой"
@@ -54,3 +65,26 @@ class ImageProcessingError(HTTPException):
             status_code=self.status_code,
             detail=f"Не удалось обработать изображение: {error_message}"
         )
+
+
+class ImageEncoderBusy(HTTPException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    detail = "Сервер обрабатывает слишком много изображений, повторите загрузку позже"
+    
+    def __init__(self, retry_after: int):
+        super().__init__(
+            status_code=self.status_code,
+            detail=self.detail,
+            headers={"Retry-After": str(retry_after)}
+        )
+
+
+class ImageNotFound(HTTPException):
+    status_code = status.HTTP_404_NOT_FOUND
+    detail = "Изображение не найдено"
+    
+    def __init__(self):
+        super().__init__(
+            status_code=self.status_code,
+            detail=self.detail
+        )
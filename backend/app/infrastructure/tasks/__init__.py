@@ -0,0 +1,5 @@
+from app.infrastructure.tasks.periodic import PeriodicTask
+from app.infrastructure.tasks.process_pool import BoundedProcessPool, PoolOverloaded
+
+
+__all__ = ["BoundedProcessPool", "PeriodicTask", "PoolOverloaded"]
@@ -0,0 +1,58 @@
+import asyncio
+from typing import Awaitable, Callable
+
+from app.infrastructure.logging.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class PeriodicTask:
+    """
+    Фоновая задача, запускающая `job` раз в `interval` секунд.
+
+    Ошибка одного запуска логируется и не останавливает цикл.
+    Запускается и останавливается в lifespan приложения.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        job: Callable[[], Awaitable[None]],
+        interval: float,
+        run_on_start: bool = True,
+    ):
+        self.name = name
+        self._job = job
+        self._interval = interval
+        self._run_on_start = run_on_start
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name=self.name)
+            logger.info("periodic_task_started", task=self.name, interval=self._interval)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("periodic_task_stopped", task=self.name)
+
+    async def run_once(self) -> None:
+        try:
+            await self._job()
+        except Exception as e:
+            logger.error("periodic_task_failed", task=self.name, error=str(e), exc_info=True)
+
+    async def _loop(self) -> None:
+        if not self._run_on_start:
+            await asyncio.sleep(self._interval)
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self._interval)
@@ -0,0 +1,119 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, TypeVar
+
+from app.infrastructure.logging.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+def _lower_priority(niceness: int) -> None:
+    # Процессы пула уступают CPU воркеру, который обслуживает витрину
+    os.nice(niceness)
+
+
+class PoolOverloaded(Exception):
+    """Очередь пула заполнена, новая задача не принята."""
+
+
+class BoundedProcessPool:
+    """
+    Пул процессов для CPU-тяжёлой работы с ограничением параллелизма.
+
+    Одновременно выполняется не больше `workers` задач, остальные ждут
+    в очереди на семафоре внутри event loop. Если в очереди уже
+    `max_queue` задач, новая отклоняется PoolOverloaded, а не копится.
+    Процессы создаются при первой задаче, через spawn: fork процесса
+    с работающим event loop и пулом соединений небезопасен.
+    """
+
+    def __init__(self, name: str, workers: int, max_queue: int, niceness: int = 0):
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self._niceness = niceness
+        self._executor: ProcessPoolExecutor | None = None
+        self._semaphore = asyncio.Semaphore(workers)
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_lower_priority,
+                initargs=(self._niceness,),
+            )
+        return self._executor
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        if self.waiting >= self.max_queue:
+            self.rejected += 1
+            logger.warning("process_pool_rejected", pool=self.name, **self.stats())
+            raise PoolOverloaded(self.name)
+
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        started_at = time.perf_counter()
+        self.running += 1
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(self._get_executor(), func, *args)
+        except Exception:
+            self.running -= 1
+            self._semaphore.release()
+            raise
+        future.add_done_callback(
+            lambda _: self._finish(getattr(func, "__name__", str(func)), queued_at, started_at)
+        )
+        # При отмене запроса процесс всё равно доработает задачу: слот освобождается
+        # по её завершению, а не в момент отмены
+        try:
+            return await asyncio.shield(future)
+        except BrokenProcessPool:
+            # Упавший процесс (например, по OOM) ломает весь пул, следующая задача создаст новый
+            logger.error("process_pool_broken", pool=self.name)
+            self.shutdown(wait=False)
+            raise
+
+    def _finish(self, task: str, queued_at: float, started_at: float) -> None:
+        self.running -= 1
+        self.completed += 1
+        self._semaphore.release()
+        logger.info(
+            "process_pool_task",
+            pool=self.name,
+            task=task,
+            wait_ms=round((started_at - queued_at) * 1000, 1),
+            run_ms=round((time.perf_counter() - started_at) * 1000, 1),
+            **self.stats(),
+        )
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
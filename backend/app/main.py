@@ -1,3 +1,4 @@
+import asyncio
 from contextlib import asynccontextmanager
 from pathlib import Path
 
@@ -7,15 +8,35 @@ from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 
 from app.api.v1.routers import api_v1_routers
+from app.api.v1.routers.static import router as static_images_router
+from app.core.jobs import (
+    flush_view_counts,
+    rebuild_similar_bouquets,
+    rebuild_sitemap,
+    recompute_popularity,
+    refresh_catalog_index,
+    refresh_suggest_index,
+)
+from app.core.services.feed_service import FEED_DIR
+from app.core.services.sitemap_service import SITEMAP_DIR
+from app.infrastructure.cache.catalog_cache import CatalogCache
+from app.infrastructure.cache.catalog_index import CatalogIndex
+from app.infrastructure.cache.image_resize_cache import ImageResizeCache
+from app.infrastructure.cache.suggest_index import SuggestIndex
+from app.infrastructure.cache.view_counter import ViewCounterBuffer
 from app.infrastructure.database.adapters.pg_connection import DatabaseConnection
 from app.infrastructure.logging.logger import configure_logging, get_logger
 from app.infrastructure.middleware import LoggingMiddleware
+from app.infrastructure.tasks import BoundedProcessPool, PeriodicTask
 from app.infrastructure.config.config import APP_CONFIG, BASE_DIR
 
 
 configure_logging()
 logger = get_logger(__name__)
 
+# Процессы кодирования изображений получают меньший приоритет CPU, чем воркер
+IMAGE_ENCODER_NICENESS = 10
+
 
 @asynccontextmanager
 async def lifespan(app):
@@ -26,9 +47,103 @@ async def lifespan(app):
     app.state.db_connection = db_connection
     
     logger.info("database_connected")
+
+    app.state.catalog_cache = CatalogCache(
+        session_factory=db_connection.get_session,
+        max_bytes=APP_CONFIG.CATALOG_CACHE_MAX_MB * 1024 * 1024,
+        ttl=APP_CONFIG.CATALOG_CACHE_TTL,
+        stale_ttl=APP_CONFIG.CATALOG_CACHE_STALE_TTL,
+    )
+    app.state.detail_cache = CatalogCache(
+        session_factory=db_connection.get_session,
+        max_bytes=APP_CONFIG.DETAIL_CACHE_MAX_MB * 1024 * 1024,
+        ttl=APP_CONFIG.DETAIL_CACHE_TTL,
+        stale_ttl=APP_CONFIG.DETAIL_CACHE_STALE_TTL,
+    )
+
+    # Первую сборку делает пересчёт популярности, до неё поиск идёт через SQL
+    app.state.catalog_index = CatalogIndex()
+    popularity_task = PeriodicTask(
+        name="recompute_popularity",
+        job=lambda: recompute_popularity(
+            db_connection.get_session, app.state.catalog_cache, app.state.catalog_index
+        ),
+        interval=APP_CONFIG.POPULARITY_REFRESH_INTERVAL,
+    )
+    popularity_task.start()
+    catalog_index_task = PeriodicTask(
+        name="refresh_catalog_index",
+        job=lambda: refresh_catalog_index(db_connection.get_session, app.state.catalog_index),
+        interval=APP_CONFIG.CATALOG_INDEX_REFRESH_INTERVAL,
+        run_on_start=False,
+    )
+    catalog_index_task.start()
+
+    app.state.view_counter = ViewCounterBuffer()
+    view_counter_task = PeriodicTask(
+        name="flush_view_counts",
+        job=lambda: flush_view_counts(db_connection.get_session, app.state.view_counter),
+        interval=APP_CONFIG.VIEW_COUNTER_FLUSH_INTERVAL,
+        run_on_start=False,
+    )
+    view_counter_task.start()
+
+    sitemap_task = PeriodicTask(
+        name="rebuild_sitemap",
+        job=lambda: rebuild_sitemap(db_connection.get_session),
+        interval=APP_CONFIG.SITEMAP_REFRESH_INTERVAL,
+    )
+    sitemap_task.start()
+
+    similar_bouquets_task = PeriodicTask(
+        name="rebuild_similar_bouquets",
+        job=lambda: rebuild_similar_bouquets(
+            db_connection.get_session, app.state.catalog_cache
+        ),
+        interval=APP_CONFIG.SIMILAR_BOUQUETS_REFRESH_INTERVAL,
+    )
+    similar_bouquets_task.start()
+
+    # Кодирование загруженных изображений вне процесса, который обслуживает витрину
+    app.state.image_encoder_pool = BoundedProcessPool(
+        name="image_encoder",
+        workers=APP_CONFIG.IMAGE_ENCODE_WORKERS,
+        max_queue=APP_CONFIG.IMAGE_ENCODE_MAX_QUEUE,
+        niceness=IMAGE_ENCODER_NICENESS,
+    )
+    # Уменьшение по запросу витрины в своём пуле, чтобы не вытеснять загрузки
+    app.state.image_resize_pool = BoundedProcessPool(
+        name="image_resizer",
+        workers=APP_CONFIG.IMAGE_RESIZE_WORKERS,
+        max_queue=APP_CONFIG.IMAGE_RESIZE_MAX_QUEUE,
+        niceness=IMAGE_ENCODER_NICENESS,
+    )
+    app.state.image_resize_cache = ImageResizeCache(
+        directory=BASE_DIR / "cache" / "images",
+        max_bytes=APP_CONFIG.IMAGE_RESIZE_CACHE_MAX_MB * 1024 * 1024,
+    )
+    await asyncio.to_thread(app.state.image_resize_cache.load)
+
+    app.state.suggest_index = SuggestIndex()
+    suggest_index_task = PeriodicTask(
+        name="refresh_suggest_index",
+        job=lambda: refresh_suggest_index(db_connection.get_session, app.state.suggest_index),
+        interval=APP_CONFIG.SUGGEST_INDEX_REFRESH_INTERVAL,
+    )
+    suggest_index_task.start()
     
     yield
     
+    await view_counter_task.stop()
+    # Сбрасываем просмотры, накопленные с последнего периодического сброса
+    await view_counter_task.run_once()
+    await popularity_task.stop()
+    await catalog_index_task.stop()
+    await sitemap_task.stop()
+    await similar_bouquets_task.stop()
+    await suggest_index_task.stop()
+    app.state.image_encoder_pool.shutdown()
+    app.state.image_resize_pool.shutdown()
     logger.info("application_shutdown")
 
 
@@ -45,6 +160,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.add_middleware(LoggingMiddleware)
@@ -53,7 +169,10 @@ static_dir = BASE_DIR / "static"
 if not static_dir.exists():
     static_dir.mkdir(parents=True, exist_ok=True)
     logger.info("static_directory_created", path=str(static_dir))
+SITEMAP_DIR.mkdir(parents=True, exist_ok=True)
+FEED_DIR.mkdir(parents=True, exist_ok=True)
 
+app.include_router(static_images_router)
 app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
 logger.info("static_files_mounted", directory=str(static_dir))
 
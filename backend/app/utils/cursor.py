@@ -0,0 +1,40 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from app.infrastructure.errors.base import BadRequestException
+
+
+def encode_cursor(sort: str, values: list[Any]) -> str:
+    payload = json.dumps(
+        [sort, *[_encode_value(value) for value in values]],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def decode_cursor(cursor: str, sort: str) -> list[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise BadRequestException("Некорректный курсор пагинации")
+
+    if not isinstance(payload, list) or len(payload) < 2 or payload[0] != sort:
+        raise BadRequestException("Курсор не соответствует сортировке")
+
+    *values, last_id = payload[1:]
+    try:
+        return [*values, UUID(last_id)]
+    except (ValueError, TypeError):
+        raise BadRequestException("Некорректный курсор пагинации")
@@ -25,4 +25,19 @@ class OrderStatus(str, Enum):
 class BouquetSort(str, Enum):
     POPULAR = "popular"
     PRICE_ASC = "price_asc"
-    PRICE_DESC = "price_desc"
\ No newline at end of file
+    PRICE_DESC = "price_desc"
+    NEWEST = "newest"
+    MOST_VIEWED = "most_viewed"
+    TRENDING = "trending"
+    RELEVANCE = "relevance"
+
+
+class FeedFormat(str, Enum):
+    YML = "yml"
+    JSON = "json"
+
+
+class SuggestionKind(str, Enum):
+    BOUQUET = "bouquet"
+    BOUQUET_TYPE = "bouquet_type"
+    FLOWER_TYPE = "flower_type"
@@ -0,0 +1,62 @@
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any
+
+from fastapi import Request
+
+
+def make_etag(*parts: Any) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode())
+        digest.update(b"\x00")
+    return f'"{digest.hexdigest()}"'
+
+
+def http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+@dataclass(slots=True)
+class ConditionalHeaders:
+    """Заголовки условного GET-запроса: If-None-Match и If-Modified-Since."""
+
+    if_none_match: str | None = None
+    if_modified_since: str | None = None
+
+    @classmethod
+    def from_request(cls, request: Request) -> "ConditionalHeaders":
+        return cls(
+            if_none_match=request.headers.get("if-none-match"),
+            if_modified_since=request.headers.get("if-modified-since"),
+        )
+
+    def is_not_modified(self, etag: str | None, last_modified: datetime | None) -> bool:
+        # If-None-Match приоритетнее If-Modified-Since (RFC 9110, 13.2.2)
+        if self.if_none_match is not None:
+            if etag is None:
+                return False
+            if self.if_none_match.strip() == "*":
+                return True
+            candidates = {
+                tag.strip().removeprefix("W/") for tag in self.if_none_match.split(",")
+            }
+            return etag.removeprefix("W/") in candidates
+
+        if self.if_modified_since is not None and last_modified is not None:
+            try:
+                since = parsedate_to_datetime(self.if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            if last_modified.tzinfo is None:
+                last_modified = last_modified.replace(tzinfo=timezone.utc)
+            # В HTTP-дате нет долей секунды
+            return last_modified.replace(microsecond=0) <= since
+
+        return False
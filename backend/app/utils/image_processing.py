@@ -0,0 +1,180 @@
+"""
+Кодирование изображений в WebP. Функции модульного уровня и без настроек
+приложения в глобальном состоянии: они выполняются в процессах пула
+кодирования, куда передаются только аргументы.
+"""
+import hashlib
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from uuid import uuid4
+
+from PIL import Image
+
+from app.utils.url_helper import get_image_variant_path
+
+
+@dataclass(frozen=True, slots=True)
+class EncodeOptions:
+    quality: int
+    method: int
+    variant_widths: tuple[int, ...]
+    # Длинная сторона сохраняемого оригинала
+    max_side: int
+
+    @property
+    def largest_side(self) -> int:
+        return max(self.max_side, *self.variant_widths)
+
+
+def convert_to_rgb(image: Image.Image) -> Image.Image:
+    if image.mode in ("RGBA", "LA", "P"):
+        background = Image.new("RGB", image.size, (255, 255, 255))
+
+        if image.mode == "P":
+            image = image.convert("RGBA")
+
+        if image.mode in ("RGBA", "LA"):
+            background.paste(image, mask=image.split()[-1])
+        else:
+            background.paste(image)
+
+        return background
+
+    elif image.mode != "RGB":
+        return image.convert("RGB")
+
+    return image
+
+
+def save_webp(image: Image.Image, filepath: Path, options: EncodeOptions) -> None:
+    # Через временный файл: по готовому имени никогда не лежит недописанный файл.
+    # Имя уникально, одинаковые загрузки могут кодироваться одновременно
+    tmp_path = filepath.with_name(f".{filepath.name}.{uuid4().hex}.tmp")
+    try:
+        image.save(
+            tmp_path,
+            "WEBP",
+            quality=options.quality,
+            method=options.method,
+        )
+        os.replace(tmp_path, filepath)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def save_variants(image: Image.Image, filepath: Path, options: EncodeOptions) -> list[int]:
+    """
+    Уменьшенные копии рядом с оригиналом: <имя>-<ширина>w.webp.
+    Ширины не больше оригинала, увеличенные копии не создаются.
+    Каждая следующая копия уменьшается из предыдущей, а не из оригинала.
+    """
+    widths = sorted(
+        {width for width in options.variant_widths if width < image.width},
+        reverse=True,
+    )
+    source = image
+    for width in widths:
+        height = max(1, round(image.height * width / image.width))
+        source = source.resize((width, height), Image.Resampling.LANCZOS, reducing_gap=3.0)
+        save_webp(source, filepath.with_name(get_image_variant_path(filepath.name, width)), options)
+    return sorted(widths)
+
+
+def fit_size(size: tuple[int, int], max_side: int) -> tuple[int, int]:
+    width, height = size
+    scale = min(1.0, max_side / max(width, height))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def prepare_for_encoding(image: Image.Image, options: EncodeOptions) -> Image.Image:
+    """
+    Декодирует открытый исходник не больше, чем нужно, и приводит к RGB.
+    JPEG декодируется сразу в уменьшенном масштабе (1/2, 1/4, 1/8) через draft,
+    если самая крупная целевая копия меньше оригинала: памяти и времени
+    уходит в разы меньше, чем на полный размер.
+    """
+    target = fit_size(image.size, options.largest_side)
+    if image.format == "JPEG" and target != image.size:
+        image.draft("RGB", target)
+    image = convert_to_rgb(image)
+    if max(image.size) > options.max_side:
+        image = image.resize(
+            fit_size(image.size, options.max_side), Image.Resampling.LANCZOS, reducing_gap=3.0
+        )
+    return image
+
+
+def fingerprint(source: Path, options: EncodeOptions) -> str:
+    """
+    sha256 декодированных пикселей вместе с настройками кодирования: та же
+    картинка в другом контейнере или с другими метаданными даёт тот же ключ,
+    а смена настроек - новый, и файл кодируется заново.
+    """
+    digest = hashlib.sha256(repr(options).encode())
+    with Image.open(source) as original:
+        image = prepare_for_encoding(original, options)
+        digest.update(f"{image.mode}:{image.width}x{image.height}:".encode())
+        digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+def convert_and_save(source: Path, filepath: Path, options: EncodeOptions) -> list[int]:
+    # Исходник читается с диска, в память попадает только декодированное изображение
+    with Image.open(source) as original:
+        image = prepare_for_encoding(original, options)
+        # Оригинал пишется последним: если он есть, копии уже готовы
+        widths = save_variants(image, filepath, options)
+        save_webp(image, filepath, options)
+        return widths
+
+
+def stored_widths(filepath: Path) -> list[int] | None:
+    """Ширины копий уже сохранённого изображения или None, если оригинала нет."""
+    if not filepath.is_file():
+        return None
+    widths = []
+    for variant in filepath.parent.glob(f"{filepath.stem}-*w{filepath.suffix}"):
+        width = variant.stem[len(filepath.stem) + 1:-1]
+        if width.isdigit():
+            widths.append(int(width))
+    return sorted(widths)
+
+
+def generate_variants(filepath: Path, options: EncodeOptions) -> list[int]:
+    with Image.open(filepath) as image:
+        return save_variants(convert_to_rgb(image), filepath, options)
+
+
+def box_size(size: tuple[int, int], width: int, height: int) -> tuple[int, int]:
+    """Размер, вписанный в width x height с сохранением пропорций, 0 - без ограничения."""
+    scale = min(
+        1.0,
+        width / size[0] if width else 1.0,
+        height / size[1] if height else 1.0,
+    )
+    return max(1, round(size[0] * scale)), max(1, round(size[1] * scale))
+
+
+def resize_to_fit(
+    source: Path, target: Path, width: int, height: int, options: EncodeOptions
+) -> int:
+    """
+    Уменьшает сохранённое изображение под размер width x height и пишет его
+    в target. Увеличенные копии не создаются. Возвращает размер файла.
+    """
+    with Image.open(source) as master:
+        size = box_size(master.size, width, height)
+    # Наименьшая из готовых копий, которой хватает на нужный размер,
+    # декодируется заметно быстрее оригинала
+    widths = [stored for stored in stored_widths(source) or [] if stored >= size[0]]
+    if widths:
+        source = source.with_name(get_image_variant_path(source.name, min(widths)))
+
+    with Image.open(source) as original:
+        image = convert_to_rgb(original)
+        if image.size != size:
+            image = image.resize(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    save_webp(image, target, options)
+    return target.stat().st_size
@@ -0,0 +1,122 @@
+from dataclasses import dataclass
+from typing import Iterable, Sequence
+from uuid import UUID
+
+import numpy as np
+
+
+# Вклад признаков в итоговое сходство, в сумме 1
+FLOWER_WEIGHT = 0.6
+TYPE_WEIGHT = 0.25
+PRICE_WEIGHT = 0.15
+# Ценовые диапазоны строятся по квантилям цен активных букетов
+PRICE_BANDS = 5
+# Размер блока строк матрицы сходства, около 64 МБ float32 на блок
+BLOCK_CELLS = 16_000_000
+
+
+@dataclass(slots=True)
+class BouquetFeatures:
+    """
+    Признаки активных букетов для расчёта сходства: бинарная матрица
+    букет x вид цветов, код типа букета и номер ценового диапазона.
+
+    Сходство пары - взвешенная сумма коэффициента Жаккара по видам цветов,
+    совпадения типа и близости ценовых диапазонов. Считается блоками строк
+    одним матричным умножением на блок.
+    """
+
+    ids: list[UUID]
+    flowers: np.ndarray
+    flower_counts: np.ndarray
+    types: np.ndarray
+    bands: np.ndarray
+
+    @classmethod
+    def build(
+        cls,
+        ids: Sequence[UUID],
+        bouquet_type_ids: Sequence[UUID],
+        prices: Sequence[int],
+        flower_type_ids: Sequence[Iterable[UUID]],
+    ) -> "BouquetFeatures":
+        flower_index: dict[UUID, int] = {}
+        rows: list[int] = []
+        columns: list[int] = []
+        for row, flower_ids in enumerate(flower_type_ids):
+            for flower_id in flower_ids:
+                rows.append(row)
+                columns.append(flower_index.setdefault(flower_id, len(flower_index)))
+
+        flowers = np.zeros((len(ids), len(flower_index)), dtype=np.float32)
+        flowers[rows, columns] = 1.0
+
+        type_index: dict[UUID, int] = {}
+        types = np.array(
+            [type_index.setdefault(type_id, len(type_index)) for type_id in bouquet_type_ids],
+            dtype=np.int32,
+        )
+
+        price_array = np.asarray(prices, dtype=np.float64)
+        if len(price_array):
+            edges = np.quantile(price_array, np.linspace(0, 1, PRICE_BANDS + 1)[1:-1])
+            bands = np.searchsorted(edges, price_array, side="right").astype(np.int32)
+        else:
+            bands = np.zeros(0, dtype=np.int32)
+
+        return cls(
+            ids=list(ids),
+            flowers=flowers,
+            flower_counts=flowers.sum(axis=1),
+            types=types,
+            bands=bands,
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def scores(self, rows: np.ndarray) -> np.ndarray:
+        """Сходство букетов `rows` со всеми букетами, сам с собой -inf."""
+        intersection = self.flowers[rows] @ self.flowers.T
+        union = self.flower_counts[rows, None] + self.flower_counts[None, :] - intersection
+        jaccard = np.divide(
+            intersection, union, out=np.zeros_like(intersection), where=union > 0
+        )
+
+        same_type = self.types[rows, None] == self.types[None, :]
+        band_distance = np.abs(self.bands[rows, None] - self.bands[None, :])
+        price = np.clip(1.0 - band_distance / 2.0, 0.0, None)
+
+        scores = FLOWER_WEIGHT * jaccard + TYPE_WEIGHT * same_type + PRICE_WEIGHT * price
+        scores[np.arange(len(rows)), rows] = -np.inf
+        return scores.astype(np.float32, copy=False)
+
+    def top_k(
+        self, rows: Iterable[int], k: int
+    ) -> dict[UUID, tuple[list[UUID], list[float]]]:
+        """Top-K похожих для каждого букета из `rows`, только с ненулевым сходством."""
+        rows = np.fromiter(rows, dtype=np.intp)
+        result: dict[UUID, tuple[list[UUID], list[float]]] = {}
+        if not len(rows) or k <= 0:
+            return result
+
+        block = max(1, BLOCK_CELLS // max(len(self), 1))
+        for start in range(0, len(rows), block):
+            block_rows = rows[start:start + block]
+            scores = self.scores(block_rows)
+            if scores.shape[1] > k:
+                candidates = np.argpartition(-scores, k, axis=1)[:, :k]
+            else:
+                candidates = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+            candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+            order = np.argsort(-candidate_scores, axis=1, kind="stable")
+            candidates = np.take_along_axis(candidates, order, axis=1)
+            candidate_scores = np.take_along_axis(candidate_scores, order, axis=1)
+
+            for row, columns, values in zip(block_rows, candidates, candidate_scores):
+                keep = values > 0
+                result[self.ids[row]] = (
+                    [self.ids[column] for column in columns[keep]],
+                    [round(float(value), 6) for value in values[keep]],
+                )
+        return result
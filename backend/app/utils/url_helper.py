@@ -1,3 +1,5 @@
+from uuid import UUID
+
 from app.infrastructure.config.config import APP_CONFIG
 
 
@@ -16,4 +18,22 @@ def get_absolute_url(path: str) -> str:
     if base.endswith("/static/images") and cleaned.startswith("images/"):
         cleaned = cleaned[len("images/"):]
 
-    return f"{base}/{cleaned}"
\ No newline at end of file
+    return f"{base}/{cleaned}"
+
+
+def get_image_variant_path(path: str, width: int) -> str:
+    # bouquets/<id>.webp -> bouquets/<id>-400w.webp, работает и для абсолютных URL
+    stem, dot, extension = path.rpartition(".")
+    if not dot:
+        return f"{path}-{width}w"
+    return f"{stem}-{width}w.{extension}"
+
+
+def get_bouquet_url(bouquet_id: UUID) -> str:
+    path = APP_CONFIG.SITE_BOUQUET_PATH.format(id=bouquet_id)
+    return f"{APP_CONFIG.SITE_URL.rstrip('/')}/{path.lstrip('/')}"
+
+
+def get_bouquet_type_url(bouquet_type_id: UUID) -> str:
+    path = APP_CONFIG.SITE_BOUQUET_TYPE_PATH.format(id=bouquet_type_id)
+    return f"{APP_CONFIG.SITE_URL.rstrip('/')}/{path.lstrip('/')}"
@@ -0,0 +1,147 @@
+"""catalog listing newest, most viewed and trending sorts
+
+Revision ID: 0b7e4d2c9a18
+Revises: f3c8a1d95e40
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b7e4d2c9a18'
+down_revision: Union[str, Sequence[str], None] = 'f3c8a1d95e40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Колонки витрины и выражения над bouquets AS b / bouquet_images AS image
+BASE_COLUMNS = {
+    'name': 'b.name',
+    'price': 'b.price',
+    'quantity': 'b.quantity',
+    'bouquet_type_id': 'b.bouquet_type_id',
+    'flower_type_ids': (
+        'ARRAY(SELECT bft.flower_type_id FROM bouquet_flower_types AS bft '
+        'WHERE bft.bouquet_id = b.id ORDER BY bft.flower_type_id)'
+    ),
+    'popularity_score': 'b.popularity_score',
+    'main_image_id': 'image.id',
+    'main_image_path': 'image.image_path',
+    'main_image_order': 'image."order"',
+    'search_vector': 'b.search_vector',
+    'created_at': 'b.created_at',
+    'updated_at': 'b.updated_at',
+}
+SORT_COLUMNS = {
+    'trending_score': 'b.trending_score',
+    # Снимок счётчика с последнего пересчёта популярности, а не живой view_count
+    'view_count': 'b.scored_view_count',
+}
+
+# Колонки bouquets, изменение которых должно попасть в витрину
+BASE_WATCHED = (
+    'name', 'price', 'quantity', 'is_active', 'bouquet_type_id', 'popularity_score',
+    'main_image_id', 'search_vector', 'created_at', 'updated_at',
+)
+SORT_WATCHED = ('trending_score', 'scored_view_count')
+
+SORT_INDEXES = (
+    ('ix_catalog_listing_newest', 'created_at'),
+    ('ix_catalog_listing_most_viewed', 'view_count'),
+    ('ix_catalog_listing_trending', 'trending_score'),
+)
+
+
+def refresh_function(columns: dict[str, str]) -> str:
+    names = ', '.join(['id', *columns])
+    expressions = ', '.join(['b.id', *columns.values()])
+    updates = ', '.join(f'{name} = EXCLUDED.{name}' for name in columns)
+    return f"""
+    CREATE OR REPLACE FUNCTION catalog_listing_refresh(bouquet_ids uuid[]) RETURNS void
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF cardinality(bouquet_ids) = 0 THEN
+            RETURN;
+        END IF;
+
+        DELETE FROM catalog_listing AS listing
+        USING bouquets AS b
+        WHERE listing.id = ANY(bouquet_ids) AND b.id = listing.id AND NOT b.is_active;
+
+        INSERT INTO catalog_listing ({names})
+        SELECT {expressions}
+        FROM bouquets AS b
+        LEFT JOIN bouquet_images AS image ON image.id = b.main_image_id
+        WHERE b.id = ANY(bouquet_ids) AND b.is_active
+        ORDER BY b.id
+        ON CONFLICT (id) DO UPDATE SET {updates};
+    END
+    $$
+    """
+
+
+def bouquets_trigger_function(watched: tuple[str, ...]) -> str:
+    new = ', '.join(f'new_rows.{name}' for name in watched)
+    old = ', '.join(f'old_rows.{name}' for name in watched)
+    return f"""
+    CREATE OR REPLACE FUNCTION catalog_listing_bouquets_changed() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            PERFORM catalog_listing_refresh(ARRAY(SELECT id FROM new_rows));
+        ELSE
+            PERFORM catalog_listing_refresh(ARRAY(
+                SELECT new_rows.id
+                FROM new_rows
+                JOIN old_rows ON old_rows.id = new_rows.id
+                WHERE ({new}) IS DISTINCT FROM ({old})
+            ));
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('bouquets', sa.Column('trending_score', sa.Float(), server_default='0', nullable=False))
+    op.add_column('bouquets', sa.Column('trending_view_score', sa.Float(), server_default='0', nullable=False))
+    op.add_column('catalog_listing', sa.Column('trending_score', sa.Float(), server_default='0', nullable=False))
+    op.add_column('catalog_listing', sa.Column('view_count', sa.Integer(), server_default='0', nullable=False))
+
+    op.execute(refresh_function({**BASE_COLUMNS, **SORT_COLUMNS}))
+    op.execute(bouquets_trigger_function(BASE_WATCHED + SORT_WATCHED))
+    op.execute(
+        """
+        UPDATE catalog_listing AS listing
+        SET view_count = b.scored_view_count
+        FROM bouquets AS b
+        WHERE b.id = listing.id
+        """
+    )
+
+    for name, column in SORT_INDEXES:
+        op.create_index(
+            name,
+            'catalog_listing',
+            [sa.text(f'{column} DESC'), sa.text('id DESC')],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, _ in reversed(SORT_INDEXES):
+        op.drop_index(name, table_name='catalog_listing')
+
+    op.execute(bouquets_trigger_function(BASE_WATCHED))
+    op.execute(refresh_function(BASE_COLUMNS))
+
+    op.drop_column('catalog_listing', 'view_count')
+    op.drop_column('catalog_listing', 'trending_score')
+    op.drop_column('bouquets', 'trending_view_score')
+    op.drop_column('bouquets', 'trending_score')
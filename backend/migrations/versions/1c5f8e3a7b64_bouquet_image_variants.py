@@ -0,0 +1,94 @@
+"""bouquet image variant widths
+
+Revision ID: 1c5f8e3a7b64
+Revises: 0b7e4d2c9a18
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1c5f8e3a7b64'
+down_revision: Union[str, Sequence[str], None] = '0b7e4d2c9a18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Колонки витрины и выражения над bouquets AS b / bouquet_images AS image
+LISTING_COLUMNS = {
+    'name': 'b.name',
+    'price': 'b.price',
+    'quantity': 'b.quantity',
+    'bouquet_type_id': 'b.bouquet_type_id',
+    'flower_type_ids': (
+        'ARRAY(SELECT bft.flower_type_id FROM bouquet_flower_types AS bft '
+        'WHERE bft.bouquet_id = b.id ORDER BY bft.flower_type_id)'
+    ),
+    'popularity_score': 'b.popularity_score',
+    'main_image_id': 'image.id',
+    'main_image_path': 'image.image_path',
+    'main_image_order': 'image."order"',
+    'search_vector': 'b.search_vector',
+    'created_at': 'b.created_at',
+    'updated_at': 'b.updated_at',
+    'trending_score': 'b.trending_score',
+    'view_count': 'b.scored_view_count',
+}
+IMAGE_COLUMNS = {
+    'main_image_widths': "coalesce(image.widths, '{}')",
+}
+
+
+def refresh_function(columns: dict[str, str]) -> str:
+    names = ', '.join(['id', *columns])
+    expressions = ', '.join(['b.id', *columns.values()])
+    updates = ', '.join(f'{name} = EXCLUDED.{name}' for name in columns)
+    return f"""
+    CREATE OR REPLACE FUNCTION catalog_listing_refresh(bouquet_ids uuid[]) RETURNS void
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF cardinality(bouquet_ids) = 0 THEN
+            RETURN;
+        END IF;
+
+        DELETE FROM catalog_listing AS listing
+        USING bouquets AS b
+        WHERE listing.id = ANY(bouquet_ids) AND b.id = listing.id AND NOT b.is_active;
+
+        INSERT INTO catalog_listing ({names})
+        SELECT {expressions}
+        FROM bouquets AS b
+        LEFT JOIN bouquet_images AS image ON image.id = b.main_image_id
+        WHERE b.id = ANY(bouquet_ids) AND b.is_active
+        ORDER BY b.id
+        ON CONFLICT (id) DO UPDATE SET {updates};
+    END
+    $$
+    """
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'bouquet_images',
+        sa.Column('widths', postgresql.ARRAY(sa.Integer()), server_default='{}', nullable=False),
+    )
+    op.add_column(
+        'catalog_listing',
+        sa.Column('main_image_widths', postgresql.ARRAY(sa.Integer()), server_default='{}', nullable=False),
+    )
+    # Уже загруженные изображения получают копии скриптом scripts.generate_image_variants,
+    # запись widths обновит витрину триггером на bouquet_images
+    op.execute(refresh_function({**LISTING_COLUMNS, **IMAGE_COLUMNS}))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(refresh_function(LISTING_COLUMNS))
+    op.drop_column('catalog_listing', 'main_image_widths')
+    op.drop_column('bouquet_images', 'widths')
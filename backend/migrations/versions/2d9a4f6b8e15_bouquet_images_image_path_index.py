@@ -0,0 +1,28 @@
+"""bouquet images image_path index
+
+Revision ID: 2d9a4f6b8e15
+Revises: 1c5f8e3a7b64
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2d9a4f6b8e15'
+down_revision: Union[str, Sequence[str], None] = '1c5f8e3a7b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Подсчёт ссылок на файл изображения при удалении
+    op.create_index('ix_bouquet_images_image_path', 'bouquet_images', ['image_path'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_bouquet_images_image_path', table_name='bouquet_images')
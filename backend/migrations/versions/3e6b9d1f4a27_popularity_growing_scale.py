@@ -0,0 +1,63 @@
+"""popularity scores on a growing scale
+
+Revision ID: 3e6b9d1f4a27
+Revises: 2d9a4f6b8e15
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e6b9d1f4a27'
+down_revision: Union[str, Sequence[str], None] = '2d9a4f6b8e15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('orders', sa.Column('popularity_scored_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        'ix_orders_popularity_unscored',
+        'orders',
+        ['status'],
+        postgresql_where=sa.text('popularity_scored_at IS NULL'),
+    )
+    op.drop_column('bouquets', 'view_score')
+    op.drop_column('bouquets', 'trending_view_score')
+
+    # Оценки с затуханием нельзя перевести в новую шкалу без периода
+    # полураспада из настроек, поэтому они обнуляются: первый пересчёт
+    # соберёт их заново по всем оплаченным заказам и просмотрам
+    op.execute(
+        """
+        UPDATE bouquets
+        SET popularity_score = 0,
+            trending_score = 0,
+            scored_view_count = 0,
+            popularity_updated_at = NULL
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('bouquets', sa.Column('trending_view_score', sa.Float(), server_default='0', nullable=False))
+    op.add_column('bouquets', sa.Column('view_score', sa.Float(), server_default='0', nullable=False))
+    op.drop_index('ix_orders_popularity_unscored', table_name='orders')
+    op.drop_column('orders', 'popularity_scored_at')
+
+    # Прежний пересчёт строит покупки заново, а просмотры копит с нуля
+    op.execute(
+        """
+        UPDATE bouquets
+        SET popularity_score = 0,
+            trending_score = 0,
+            scored_view_count = 0,
+            popularity_updated_at = NULL
+        """
+    )
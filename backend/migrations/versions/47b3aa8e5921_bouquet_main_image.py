@@ -0,0 +1,50 @@
+"""bouquet main image
+
+Revision ID: 47b3aa8e5921
+Revises: bdf3695e9bf6
+Create Date: 2026-10-17 10:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '47b3aa8e5921'
+down_revision: Union[str, Sequence[str], None] = 'bdf3695e9bf6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('bouquets', sa.Column('main_image_id', postgresql.UUID(as_uuid=True), nullable=True))
+    op.create_foreign_key(
+        'fk_bouquets_main_image_id',
+        'bouquets',
+        'bouquet_images',
+        ['main_image_id'],
+        ['id'],
+        ondelete='SET NULL',
+    )
+    op.execute(
+        """
+        UPDATE bouquets AS b
+        SET main_image_id = (
+            SELECT i.id
+            FROM bouquet_images AS i
+            WHERE i.bouquet_id = b.id
+            ORDER BY i."order", i.id
+            LIMIT 1
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('fk_bouquets_main_image_id', 'bouquets', type_='foreignkey')
+    op.drop_column('bouquets', 'main_image_id')
@@ -0,0 +1,42 @@
+"""bouquet similarities similar_ids index
+
+Revision ID: 4a8c2e6f0d13
+Revises: 3e6b9d1f4a27
+Create Date: 2026-10-17 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a8c2e6f0d13'
+down_revision: Union[str, Sequence[str], None] = '3e6b9d1f4a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Поиск списков, в которые входит изменённый букет
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_bouquet_similarities_similar_ids',
+            'bouquet_similarities',
+            ['similar_ids'],
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_bouquet_similarities_similar_ids',
+            table_name='bouquet_similarities',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,50 @@
+"""bouquet search vector
+
+Revision ID: 5a1f0c3d7e92
+Revises: 47b3aa8e5921
+Create Date: 2026-10-17 10:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a1f0c3d7e92'
+down_revision: Union[str, Sequence[str], None] = '47b3aa8e5921'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BOUQUET_SEARCH_VECTOR = (
+    "setweight(to_tsvector('russian', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'bouquets',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(BOUQUET_SEARCH_VECTOR, persisted=True),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        'ix_bouquets_search_vector',
+        'bouquets',
+        ['search_vector'],
+        postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_bouquets_search_vector', table_name='bouquets')
+    op.drop_column('bouquets', 'search_vector')
@@ -0,0 +1,64 @@
+"""catalog performance indexes
+
+Revision ID: a7b2e68fedc0
+Revises: 5a1f0c3d7e92
+Create Date: 2026-10-17 10:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7b2e68fedc0'
+down_revision: Union[str, Sequence[str], None] = '5a1f0c3d7e92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (имя, таблица, колонки, доп. параметры)
+INDEXES = [
+    (
+        'ix_bouquets_active_popular',
+        'bouquets',
+        [sa.text('purchase_count DESC'), sa.text('view_count DESC'), sa.text('id DESC')],
+        {'postgresql_where': sa.text('is_active = true')},
+    ),
+    ('ix_bouquets_is_active_price', 'bouquets', ['is_active', 'price', 'id'], {}),
+    ('ix_bouquet_images_bouquet_id_order', 'bouquet_images', ['bouquet_id', 'order'], {}),
+    (
+        'ix_bouquet_flower_types_flower_type_id_bouquet_id',
+        'bouquet_flower_types',
+        ['flower_type_id', 'bouquet_id'],
+        {},
+    ),
+    ('ix_order_items_order_id', 'order_items', ['order_id'], {}),
+    ('ix_payments_order_id', 'payments', ['order_id'], {}),
+    ('ix_orders_customer_email', 'orders', ['customer_email'], {}),
+    ('ix_orders_customer_phone', 'orders', ['customer_phone'], {}),
+    ('ix_orders_status_created_at', 'orders', ['status', 'created_at'], {}),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY не блокирует запись в таблицы, но не работает внутри транзакции
+    with op.get_context().autocommit_block():
+        for name, table, columns, kwargs in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+                **kwargs,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,177 @@
+"""initial schema
+
+Revision ID: bdf3695e9bf6
+Revises:
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bdf3695e9bf6'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _base_columns() -> list[sa.Column]:
+    return [
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # База, созданная раньше через Base.metadata.create_all, уже содержит эти таблицы
+    if not op.get_context().as_sql and sa.inspect(op.get_bind()).has_table('bouquets'):
+        return
+
+    op.create_table(
+        'admins',
+        sa.Column('username', sa.String(), nullable=False),
+        sa.Column('password_hash', sa.String(), nullable=False),
+        *_base_columns(),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_admins_username', 'admins', ['username'], unique=True)
+
+    op.create_table(
+        'blocked_customers',
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('phone', sa.String(), nullable=True),
+        *_base_columns(),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+    op.create_table(
+        'bouquet_types',
+        sa.Column('name', sa.String(), nullable=False),
+        *_base_columns(),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+    op.create_table(
+        'flower_types',
+        sa.Column('name', sa.String(), nullable=False),
+        *_base_columns(),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+    op.create_table(
+        'orders',
+        sa.Column('customer_name', sa.String(), nullable=False),
+        sa.Column('customer_phone', sa.String(), nullable=False),
+        sa.Column('customer_email', sa.String(), nullable=False),
+        sa.Column('is_pickup_by_customer', sa.Boolean(), nullable=False),
+        sa.Column('recipient_name', sa.String(), nullable=True),
+        sa.Column('recipient_phone', sa.String(), nullable=True),
+        sa.Column('greeting_card_text', sa.String(), nullable=True),
+        sa.Column('delivery_method', sa.Enum('DELIVERY', 'PICKUP', name='deliverymethod'), nullable=False),
+        sa.Column('delivery_date', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('delivery_time_from', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('delivery_time_to', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('delivery_city', sa.String(), nullable=True),
+        sa.Column('delivery_street', sa.String(), nullable=True),
+        sa.Column('delivery_house', sa.String(), nullable=True),
+        sa.Column('delivery_apartment', sa.String(), nullable=True),
+        sa.Column('delivery_floor', sa.String(), nullable=True),
+        sa.Column('comment', sa.String(), nullable=True),
+        sa.Column('total_amount', sa.Integer(), nullable=False),
+        sa.Column(
+            'status',
+            sa.Enum('PENDING', 'PAID', 'FAILED', 'PROCESSING', 'COMPLETED', 'CANCELLED', name='orderstatus'),
+            nullable=False,
+        ),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        *_base_columns(),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+    op.create_table(
+        'bouquets',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('description', sa.String(), nullable=False),
+        sa.Column('price', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('purchase_count', sa.Integer(), nullable=False),
+        sa.Column('view_count', sa.Integer(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('bouquet_type_id', postgresql.UUID(as_uuid=True), nullable=False),
+        *_base_columns(),
+        sa.ForeignKeyConstraint(['bouquet_type_id'], ['bouquet_types.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+    op.create_table(
+        'payments',
+        sa.Column('order_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('amount', sa.Integer(), nullable=False),
+        sa.Column(
+            'status',
+            sa.Enum('PENDING', 'PAID', 'FAILED', 'REFUNDED', name='paymentstatus'),
+            nullable=False,
+        ),
+        sa.Column('transaction_id', sa.String(), nullable=True),
+        sa.Column('payment_date', sa.DateTime(), nullable=True),
+        *_base_columns(),
+        sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+    op.create_table(
+        'bouquet_flower_types',
+        sa.Column('bouquet_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('flower_type_id', postgresql.UUID(as_uuid=True), nullable=False),
+        *_base_columns(),
+        sa.ForeignKeyConstraint(['bouquet_id'], ['bouquets.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['flower_type_id'], ['flower_types.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('bouquet_id', 'flower_type_id', 'id'),
+        sa.UniqueConstraint('bouquet_id', 'flower_type_id', name='uq_bouquet_flower_type'),
+    )
+
+    op.create_table(
+        'bouquet_images',
+        sa.Column('image_path', sa.String(), nullable=False),
+        sa.Column('order', sa.Integer(), nullable=False),
+        sa.Column('bouquet_id', postgresql.UUID(as_uuid=True), nullable=False),
+        *_base_columns(),
+        sa.ForeignKeyConstraint(['bouquet_id'], ['bouquets.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+    op.create_table(
+        'order_items',
+        sa.Column('order_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('bouquet_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('price', sa.Integer(), nullable=False),
+        *_base_columns(),
+        sa.ForeignKeyConstraint(['bouquet_id'], ['bouquets.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('order_items')
+    op.drop_table('bouquet_images')
+    op.drop_table('bouquet_flower_types')
+    op.drop_table('payments')
+    op.drop_table('bouquets')
+    op.drop_table('orders')
+    op.drop_table('flower_types')
+    op.drop_table('bouquet_types')
+    op.drop_table('blocked_customers')
+    op.drop_index('ix_admins_username', table_name='admins')
+    op.drop_table('admins')
+    sa.Enum(name='paymentstatus').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='orderstatus').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='deliverymethod').drop(op.get_bind(), checkfirst=True)
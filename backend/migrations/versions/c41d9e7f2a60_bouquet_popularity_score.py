@@ -0,0 +1,66 @@
+"""bouquet popularity score
+
+Revision ID: c41d9e7f2a60
+Revises: a7b2e68fedc0
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d9e7f2a60'
+down_revision: Union[str, Sequence[str], None] = 'a7b2e68fedc0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('bouquets', sa.Column('popularity_score', sa.Float(), server_default='0', nullable=False))
+    op.add_column('bouquets', sa.Column('view_score', sa.Float(), server_default='0', nullable=False))
+    op.add_column('bouquets', sa.Column('scored_view_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('bouquets', sa.Column('popularity_updated_at', sa.DateTime(timezone=True), nullable=True))
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_bouquets_active_popularity',
+            'bouquets',
+            [sa.text('popularity_score DESC'), sa.text('id DESC')],
+            postgresql_where=sa.text('is_active = true'),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_bouquets_active_popular',
+            table_name='bouquets',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_bouquets_active_popular',
+            'bouquets',
+            [sa.text('purchase_count DESC'), sa.text('view_count DESC'), sa.text('id DESC')],
+            postgresql_where=sa.text('is_active = true'),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_bouquets_active_popularity',
+            table_name='bouquets',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+    op.drop_column('bouquets', 'popularity_updated_at')
+    op.drop_column('bouquets', 'scored_view_count')
+    op.drop_column('bouquets', 'view_score')
+    op.drop_column('bouquets', 'popularity_score')
@@ -0,0 +1,40 @@
+"""bouquet similarities
+
+Revision ID: d58e3b1f7c92
+Revises: c41d9e7f2a60
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd58e3b1f7c92'
+down_revision: Union[str, Sequence[str], None] = 'c41d9e7f2a60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'bouquet_similarities',
+        sa.Column('bouquet_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('similar_ids', postgresql.ARRAY(postgresql.UUID(as_uuid=True)), nullable=False),
+        sa.Column('scores', postgresql.ARRAY(sa.Float()), nullable=False),
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['bouquet_id'], ['bouquets.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('bouquet_id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('bouquet_similarities')
@@ -0,0 +1,70 @@
+"""bouquet co-purchases
+
+Revision ID: e2a94c6d1b37
+Revises: d58e3b1f7c92
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a94c6d1b37'
+down_revision: Union[str, Sequence[str], None] = 'd58e3b1f7c92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'bouquet_co_purchases',
+        sa.Column('bouquet_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('related_bouquet_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('weight', sa.Float(), nullable=False),
+        sa.Column('orders_count', sa.Integer(), nullable=False),
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['bouquet_id'], ['bouquets.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['related_bouquet_id'], ['bouquets.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('bouquet_id', 'related_bouquet_id', name='uq_bouquet_co_purchase'),
+    )
+
+    # Разовое заполнение по уже оплаченным заказам, дальше таблица обновляется
+    # по одному заказу при переходе в PAID. Формула веса повторяет
+    # co_purchase_weight с периодом полураспада по умолчанию (90 дней)
+    op.execute(
+        """
+        INSERT INTO bouquet_co_purchases (id, bouquet_id, related_bouquet_id, weight, orders_count)
+        SELECT
+            gen_random_uuid(),
+            pairs.bouquet_id,
+            pairs.related_bouquet_id,
+            sum(power(2, extract(epoch FROM pairs.paid_at - timestamptz '2026-01-01 00:00:00+00') / 86400 / 90)),
+            count(*)
+        FROM (
+            SELECT DISTINCT
+                orders.id,
+                item.bouquet_id,
+                related.bouquet_id AS related_bouquet_id,
+                orders.updated_at AS paid_at
+            FROM orders
+            JOIN order_items AS item ON item.order_id = orders.id
+            JOIN order_items AS related
+                ON related.order_id = orders.id AND related.bouquet_id <> item.bouquet_id
+            WHERE orders.status IN ('PAID', 'PROCESSING', 'COMPLETED')
+        ) AS pairs
+        GROUP BY pairs.bouquet_id, pairs.related_bouquet_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('bouquet_co_purchases')
@@ -0,0 +1,192 @@
+"""catalog listing read model
+
+Revision ID: f3c8a1d95e40
+Revises: e2a94c6d1b37
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c8a1d95e40'
+down_revision: Union[str, Sequence[str], None] = 'e2a94c6d1b37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Пересобирает строки витрины для переданных букетов: активные вставляются
+# или обновляются, неактивные удаляются. Удалённые букеты убирает каскад FK
+REFRESH_FUNCTION = """
+CREATE FUNCTION catalog_listing_refresh(bouquet_ids uuid[]) RETURNS void
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF cardinality(bouquet_ids) = 0 THEN
+        RETURN;
+    END IF;
+
+    DELETE FROM catalog_listing AS listing
+    USING bouquets AS b
+    WHERE listing.id = ANY(bouquet_ids) AND b.id = listing.id AND NOT b.is_active;
+
+    INSERT INTO catalog_listing (
+        id, name, price, quantity, bouquet_type_id, flower_type_ids, popularity_score,
+        main_image_id, main_image_path, main_image_order, search_vector, created_at, updated_at
+    )
+    SELECT
+        b.id, b.name, b.price, b.quantity, b.bouquet_type_id,
+        ARRAY(
+            SELECT bft.flower_type_id
+            FROM bouquet_flower_types AS bft
+            WHERE bft.bouquet_id = b.id
+            ORDER BY bft.flower_type_id
+        ),
+        b.popularity_score, image.id, image.image_path, image."order",
+        b.search_vector, b.created_at, b.updated_at
+    FROM bouquets AS b
+    LEFT JOIN bouquet_images AS image ON image.id = b.main_image_id
+    WHERE b.id = ANY(bouquet_ids) AND b.is_active
+    -- Порядок по id, чтобы параллельные транзакции не взаимоблокировались
+    ORDER BY b.id
+    ON CONFLICT (id) DO UPDATE SET
+        name = EXCLUDED.name,
+        price = EXCLUDED.price,
+        quantity = EXCLUDED.quantity,
+        bouquet_type_id = EXCLUDED.bouquet_type_id,
+        flower_type_ids = EXCLUDED.flower_type_ids,
+        popularity_score = EXCLUDED.popularity_score,
+        main_image_id = EXCLUDED.main_image_id,
+        main_image_path = EXCLUDED.main_image_path,
+        main_image_order = EXCLUDED.main_image_order,
+        search_vector = EXCLUDED.search_vector,
+        created_at = EXCLUDED.created_at,
+        updated_at = EXCLUDED.updated_at;
+END
+$$
+"""
+
+# Триггеры уровня оператора с таблицами переходов: массовый UPDATE
+# (например, пересчёт популярности) обновляет витрину одним запросом.
+# Сброс просмотров меняет только view_count и витрину не трогает
+BOUQUETS_TRIGGER_FUNCTION = """
+CREATE FUNCTION catalog_listing_bouquets_changed() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM catalog_listing_refresh(ARRAY(SELECT id FROM new_rows));
+    ELSE
+        PERFORM catalog_listing_refresh(ARRAY(
+            SELECT new_rows.id
+            FROM new_rows
+            JOIN old_rows ON old_rows.id = new_rows.id
+            WHERE (
+                new_rows.name, new_rows.price, new_rows.quantity, new_rows.is_active,
+                new_rows.bouquet_type_id, new_rows.popularity_score, new_rows.main_image_id,
+                new_rows.search_vector, new_rows.created_at, new_rows.updated_at
+            ) IS DISTINCT FROM (
+                old_rows.name, old_rows.price, old_rows.quantity, old_rows.is_active,
+                old_rows.bouquet_type_id, old_rows.popularity_score, old_rows.main_image_id,
+                old_rows.search_vector, old_rows.created_at, old_rows.updated_at
+            )
+        ));
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+# Общая для bouquet_flower_types и bouquet_images: обе ссылаются на букет через bouquet_id
+CHILDREN_TRIGGER_FUNCTION = """
+CREATE FUNCTION catalog_listing_children_changed() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM catalog_listing_refresh(ARRAY(SELECT DISTINCT bouquet_id FROM old_rows));
+    ELSE
+        PERFORM catalog_listing_refresh(ARRAY(SELECT DISTINCT bouquet_id FROM new_rows));
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+# Таблицы переходов допускают только одно событие на триггер
+TRIGGERS = (
+    ("catalog_listing_bouquets_insert", "bouquets", "INSERT", "NEW TABLE AS new_rows", "catalog_listing_bouquets_changed"),
+    ("catalog_listing_bouquets_update", "bouquets", "UPDATE", "OLD TABLE AS old_rows NEW TABLE AS new_rows", "catalog_listing_bouquets_changed"),
+    ("catalog_listing_flower_types_insert", "bouquet_flower_types", "INSERT", "NEW TABLE AS new_rows", "catalog_listing_children_changed"),
+    ("catalog_listing_flower_types_delete", "bouquet_flower_types", "DELETE", "OLD TABLE AS old_rows", "catalog_listing_children_changed"),
+    # Главное изображение меняется через bouquets.main_image_id, здесь - путь и порядок
+    ("catalog_listing_images_update", "bouquet_images", "UPDATE", "NEW TABLE AS new_rows", "catalog_listing_children_changed"),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'catalog_listing',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('price', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('bouquet_type_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column(
+            'flower_type_ids',
+            postgresql.ARRAY(postgresql.UUID(as_uuid=True)),
+            server_default='{}',
+            nullable=False,
+        ),
+        sa.Column('popularity_score', sa.Float(), nullable=False),
+        sa.Column('main_image_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('main_image_path', sa.String(), nullable=True),
+        sa.Column('main_image_order', sa.Integer(), nullable=True),
+        sa.Column('search_vector', postgresql.TSVECTOR(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['id'], ['bouquets.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_catalog_listing_flower_type_ids',
+        'catalog_listing',
+        ['flower_type_ids'],
+        postgresql_using='gin',
+    )
+    op.create_index(
+        'ix_catalog_listing_search_vector',
+        'catalog_listing',
+        ['search_vector'],
+        postgresql_using='gin',
+    )
+    op.create_index('ix_catalog_listing_bouquet_type_id', 'catalog_listing', ['bouquet_type_id'])
+    op.create_index(
+        'ix_catalog_listing_popularity',
+        'catalog_listing',
+        [sa.text('popularity_score DESC'), sa.text('id DESC')],
+    )
+    op.create_index('ix_catalog_listing_price', 'catalog_listing', ['price', 'id'])
+
+    op.execute(REFRESH_FUNCTION)
+    op.execute(BOUQUETS_TRIGGER_FUNCTION)
+    op.execute(CHILDREN_TRIGGER_FUNCTION)
+    for name, table, event, referencing, function in TRIGGERS:
+        op.execute(
+            f"CREATE TRIGGER {name} AFTER {event} ON {table} "
+            f"REFERENCING {referencing} FOR EACH STATEMENT EXECUTE FUNCTION {function}()"
+        )
+
+    op.execute("SELECT catalog_listing_refresh(ARRAY(SELECT id FROM bouquets))")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, *_ in reversed(TRIGGERS):
+        op.execute(f"DROP TRIGGER {name} ON {table}")
+    op.execute("DROP FUNCTION catalog_listing_children_changed()")
+    op.execute("DROP FUNCTION catalog_listing_bouquets_changed()")
+    op.execute("DROP FUNCTION catalog_listing_refresh(uuid[])")
+    op.drop_table('catalog_listing')
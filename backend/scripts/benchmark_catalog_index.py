@@ -0,0 +1,188 @@
+"""
+Сравнение поиска по каталогу: индекс в памяти (CatalogIndex) против SQL-пути
+BouquetRepository.search_bouquets.
+
+Без флагов индекс строится по синтетическому каталогу и замеряется только он.
+С --sql синтетический каталог вставляется в базу из DB_CONFIG внутри одной
+транзакции, оба пути замеряются на одних и тех же данных и фильтрах,
+в конце транзакция откатывается.
+
+    cd backend
+    python -m scripts.benchmark_catalog_index --size 100000 --sql
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+from typing import Awaitable, Callable
+
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.repositories.bouquet_repository import BouquetRepository
+from app.infrastructure.cache.catalog_index import CatalogIndex, CatalogIndexEntry
+from app.infrastructure.config.config import DB_CONFIG
+from app.infrastructure.database.models.bouquet import (
+    Bouquet,
+    BouquetFlowerType,
+    BouquetType,
+    FlowerType,
+)
+from app.utils.enums import BouquetSort
+
+
+BOUQUET_TYPES = 10
+FLOWER_TYPES = 40
+PAGE_SIZE = 20
+INSERT_BATCH = 5000
+
+
+def generate_catalog(size: int, seed: int) -> tuple[list[uuid.UUID], list[uuid.UUID], list[CatalogIndexEntry]]:
+    rng = random.Random(seed)
+    bouquet_type_ids = [uuid.uuid4() for _ in range(BOUQUET_TYPES)]
+    flower_type_ids = [uuid.uuid4() for _ in range(FLOWER_TYPES)]
+    entries = [
+        CatalogIndexEntry(
+            id=uuid.uuid4(),
+            bouquet_type_id=rng.choice(bouquet_type_ids),
+            price=rng.randint(15, 400) * 100,
+            popularity_score=round(rng.expovariate(1.0), 4),
+            flower_type_ids=rng.sample(flower_type_ids, rng.randint(1, 5)),
+        )
+        for _ in range(size)
+    ]
+    return bouquet_type_ids, flower_type_ids, entries
+
+
+def generate_filters(
+    count: int,
+    bouquet_type_ids: list[uuid.UUID],
+    flower_type_ids: list[uuid.UUID],
+    seed: int,
+) -> list[dict]:
+    rng = random.Random(seed)
+    sorts = [BouquetSort.POPULAR, BouquetSort.PRICE_ASC, BouquetSort.PRICE_DESC]
+    filters = []
+    for _ in range(count):
+        price_min = rng.choice([None, 2000, 5000])
+        filters.append(
+            {
+                "sort": rng.choice(sorts),
+                "bouquet_type_ids": rng.sample(bouquet_type_ids, rng.randint(1, 2)) if rng.random() < 0.6 else None,
+                "flower_type_ids": rng.sample(flower_type_ids, rng.randint(1, 3)) if rng.random() < 0.7 else None,
+                "price_min": price_min,
+                "price_max": rng.choice([None, 15000, 30000]),
+                "offset": rng.choice([0, 0, 0, 40, 200]),
+            }
+        )
+    return filters
+
+
+async def measure(name: str, run: Callable[[dict], Awaitable[None]], filters: list[dict]) -> None:
+    timings = []
+    for params in filters:
+        started = time.perf_counter()
+        await run(params)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    print(
+        f"{name:<28} mean {statistics.mean(timings):8.3f} ms   "
+        f"p50 {timings[len(timings) // 2]:8.3f} ms   "
+        f"p95 {timings[int(len(timings) * 0.95)]:8.3f} ms"
+    )
+
+
+async def seed_database(
+    session: AsyncSession,
+    bouquet_type_ids: list[uuid.UUID],
+    flower_type_ids: list[uuid.UUID],
+    entries: list[CatalogIndexEntry],
+) -> None:
+    await session.execute(
+        insert(BouquetType),
+        [{"id": item, "name": f"bench type {n}"} for n, item in enumerate(bouquet_type_ids)],
+    )
+    await session.execute(
+        insert(FlowerType),
+        [{"id": item, "name": f"bench flower {n}"} for n, item in enumerate(flower_type_ids)],
+    )
+    for start in range(0, len(entries), INSERT_BATCH):
+        batch = entries[start:start + INSERT_BATCH]
+        await session.execute(
+            insert(Bouquet),
+            [
+                {
+                    "id": entry.id,
+                    "name": f"bench bouquet {start + n}",
+                    "description": "",
+                    "price": entry.price,
+                    "quantity": 1,
+                    "purchase_count": 0,
+                    "view_count": 0,
+                    "popularity_score": entry.popularity_score,
+                    "is_active": True,
+                    "bouquet_type_id": entry.bouquet_type_id,
+                }
+                for n, entry in enumerate(batch)
+            ],
+        )
+        await session.execute(
+            insert(BouquetFlowerType),
+            [
+                {"id": uuid.uuid4(), "bouquet_id": entry.id, "flower_type_id": flower_type_id}
+                for entry in batch
+                for flower_type_id in entry.flower_type_ids
+            ],
+        )
+    await session.execute(text("ANALYZE bouquets, bouquet_flower_types, catalog_listing"))
+
+
+async def main(size: int, queries: int, with_sql: bool, seed: int) -> None:
+    bouquet_type_ids, flower_type_ids, entries = generate_catalog(size, seed)
+    filters = generate_filters(queries, bouquet_type_ids, flower_type_ids, seed)
+
+    index = CatalogIndex()
+    started = time.perf_counter()
+    index.replace(entries)
+    print(f"Индекс на {size} букетов собран за {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    async def index_search(params: dict) -> None:
+        index.search(limit=PAGE_SIZE, **params)
+
+    await measure("index: фильтр + сортировка", index_search, filters)
+
+    if not with_sql:
+        return
+
+    engine = create_async_engine(DB_CONFIG.get_url(is_async=True))
+    async with AsyncSession(engine) as session:
+        print("Заполнение базы синтетическим каталогом (транзакция будет откатана)...")
+        await seed_database(session, bouquet_type_ids, flower_type_ids, entries)
+        repository = BouquetRepository(session)
+
+        async def index_with_hydration(params: dict) -> None:
+            page = index.search(limit=PAGE_SIZE, **params)
+            await repository.get_cards_by_ids(page.ids)
+
+        async def sql_search(params: dict) -> None:
+            await repository.search_bouquets(limit=PAGE_SIZE, **params)
+
+        # Прогрев кэша страниц Postgres, чтобы сравнение не зависело от порядка
+        await measure("sql: прогрев", sql_search, filters[: max(1, queries // 10)])
+        await measure("index + карточки из базы", index_with_hydration, filters)
+        await measure("sql: search_bouquets", sql_search, filters)
+        await session.rollback()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк индекса каталога против SQL")
+    parser.add_argument("--size", type=int, default=100_000, help="Количество букетов")
+    parser.add_argument("--queries", type=int, default=300, help="Количество запросов")
+    parser.add_argument("--sql", action="store_true", help="Замерить и SQL-путь на базе из DB_CONFIG")
+    parser.add_argument("--seed", type=int, default=42, help="Seed генератора данных")
+    args = parser.parse_args()
+
+    asyncio.run(main(size=args.size, queries=args.queries, with_sql=args.sql, seed=args.seed))
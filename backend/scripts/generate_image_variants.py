@@ -0,0 +1,54 @@
+"""
+Создание уменьшенных копий для изображений, загруженных до появления
+IMAGE_VARIANT_WIDTHS, и после изменения набора ширин (--all).
+
+    cd backend
+    python -m scripts.generate_image_variants
+"""
+import argparse
+import asyncio
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.services.image_service import ImageService
+from app.infrastructure.config.config import DB_CONFIG
+from app.infrastructure.database.models.bouquet import BouquetImage
+from app.infrastructure.errors.image_errors import ImageProcessingError
+
+
+async def main(regenerate_all: bool) -> None:
+    image_service = ImageService()
+    engine = create_async_engine(DB_CONFIG.get_url(is_async=True))
+    async with AsyncSession(engine) as session:
+        query = select(BouquetImage.id, BouquetImage.image_path).order_by(BouquetImage.id)
+        if not regenerate_all:
+            query = query.where(BouquetImage.widths == [])
+        images = (await session.execute(query)).all()
+        print(f"Изображений к обработке: {len(images)}")
+
+        for number, image in enumerate(images, start=1):
+            try:
+                widths = await image_service.generate_variants(image.image_path)
+            except ImageProcessingError as e:
+                print(f"  {image.image_path}: {e.detail}")
+                continue
+            # updated_at меняется: в ответах появляется srcset, версия карточки должна смениться.
+            # Коммит после каждого файла: прерванный запуск продолжится с того же места
+            await session.execute(
+                update(BouquetImage)
+                .where(BouquetImage.id == image.id)
+                .values(widths=widths)
+            )
+            await session.commit()
+            if number % 100 == 0:
+                print(f"  обработано {number}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Уменьшенные копии изображений букетов")
+    parser.add_argument("--all", action="store_true", help="Пересоздать копии для всех изображений")
+    args = parser.parse_args()
+
+    asyncio.run(main(regenerate_all=args.all))